@@ -1,4 +1,5 @@
 import React, { useState, useRef, useEffect } from "react";
+import { useAuth, useUser } from "@clerk/clerk-react";
 import API from "@/services/api";
 import { Card } from "@/components/ui/card";
 
@@ -9,7 +10,11 @@ const INITIAL_SYSTEM_MESSAGE = {
 };
 
 export default function AIChatPage() {
+  const { isLoaded, user } = useUser();
+  const { getToken } = useAuth();
   const [messages, setMessages] = useState([INITIAL_SYSTEM_MESSAGE]);
+  // Server-side chat session; the backend keeps the conversation history
+  const [sessionId, setSessionId] = useState(null);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
@@ -24,10 +29,10 @@ export default function AIChatPage() {
     }
   }, [messages, isTyping]);
 
-  // Focus input on mount
+  // Focus input once Clerk has loaded and the input is enabled
   useEffect(() => {
     inputRef.current?.focus();
-  }, []);
+  }, [isLoaded]);
 
   const formatAIResponse = (data) => {
     // Create a comprehensive response from the AI data
@@ -104,7 +109,9 @@ export default function AIChatPage() {
 
   const send = async () => {
     const trimmedInput = input.trim();
-    if (!trimmedInput) return;
+    // Wait for Clerk: every turn goes through the user's server-side session,
+    // which is what carries the conversation's context
+    if (!trimmedInput || !isLoaded || !user) return;
 
     // Clear any previous errors
     setError(null);
@@ -121,28 +128,28 @@ export default function AIChatPage() {
     setIsTyping(true);
 
     try {
-      // Build context from conversation history (last 5 messages for context)
-      const recentMessages = messages.slice(-5);
-      const contextPrompt = recentMessages
-        .filter((m) => m.role !== "system")
-        .map((m) => `${m.role}: ${m.text}`)
-        .join("\n");
-
-      const fullPrompt = contextPrompt
-        ? `${contextPrompt}\nuser: ${trimmedInput}`
-        : trimmedInput;
-
-      console.log("Sending prompt to API:", fullPrompt);
-
-      // Call API
-      const res = await API.post("/api/ai/generate", { prompt: fullPrompt });
-
-      console.log("API response:", res.data);
+      // Send only the new message; the server adds the session's history.
+      // Chat routes always require the user's own session token
+      const auth = { headers: { Authorization: `Bearer ${await getToken()}` } };
+      let id = sessionId;
+      if (!id) {
+        const session = await API.post(
+          `/api/users/${user.id}/chat/sessions`,
+          { title: trimmedInput.slice(0, 80) },
+          auth
+        );
+        id = session.data.id;
+        setSessionId(id);
+      }
+      const res = await API.post(
+        `/api/users/${user.id}/chat/sessions/${id}/messages`,
+        { content: trimmedInput },
+        auth
+      );
+      const data = res.data.reply;
 
       // Format the response
-      const formattedResponse = formatAIResponse(res.data);
-
-      console.log("Formatted response:", formattedResponse);
+      const formattedResponse = formatAIResponse(data);
 
       // Add a small delay to simulate typing
       await new Promise((resolve) => setTimeout(resolve, 500));
@@ -152,8 +159,8 @@ export default function AIChatPage() {
         role: "assistant",
         text: formattedResponse,
         timestamp: Date.now(),
-        cached: res.data.cached || false,
-        generationTime: res.data.generation_time_ms || null,
+        cached: data.cached || false,
+        generationTime: data.generation_time_ms || null,
       };
 
       setMessages((m) => [...m, assistantMsg]);
@@ -172,6 +179,11 @@ export default function AIChatPage() {
             errorMessage +=
               "The AI service is temporarily unavailable. Please try again later.";
             break;
+          case 404:
+            // Session no longer exists; start a new one next time
+            setSessionId(null);
+            errorMessage += "Your chat session expired. Please send your message again.";
+            break;
           case 400:
             errorMessage +=
               "There was an issue with your request. Please try rephrasing your question.";
@@ -212,6 +224,8 @@ export default function AIChatPage() {
   };
 
   const clearChat = () => {
+    // Start a fresh session on the next message
+    setSessionId(null);
     setMessages([INITIAL_SYSTEM_MESSAGE]);
     setError(null);
     inputRef.current?.focus();
@@ -332,13 +346,13 @@ export default function AIChatPage() {
               onChange={(e) => setInput(e.target.value)}
               onKeyPress={handleKeyPress}
               placeholder="Ask about career paths, salaries, learning resources..."
-              disabled={loading}
+              disabled={loading || !isLoaded}
               maxLength={2000}
             />
             <button
               className="btn btn-primary px-4"
               onClick={send}
-              disabled={loading || !input.trim()}
+              disabled={loading || !isLoaded || !user || !input.trim()}
             >
               {loading ? (
                 <span
@@ -4,42 +4,44 @@ import os
 import logging
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
-
 # Load environment variables from .env if present
 load_dotenv()
 
-# Import database functions
-from .database import create_tables, check_database_connection
+# Configure logging: records are queued and formatted off the request path
+from .logging_config import configure_logging
+configure_logging()
+logger = logging.getLogger(__name__)
 
-# Try to import Clerk SDK; if it's not installed, continue without it.
-try:
-    from clerk_backend_api import Clerk
-    _has_clerk = True
-except Exception:
-    Clerk = None
-    _has_clerk = False
+# Import database functions
+from .database import create_tables, check_database_connection, dispose_async_engine, get_pool_stats
+from .services.clerk_auth import get_clerk_verifier
+from .services.genai_client import close_genai_client
+from .services.write_behind import get_write_behind
+from .utils.access_log import AccessLogMiddleware
+from .utils.lazy_imports import STARTUP_MODE, is_available
+from .utils.serialization import FastJSONResponse
+from .warmup import readiness, warm_up_worker
+
+# Clerk is enabled when the SDK is installed and the secret key is set. The SDK
+# itself is heavy and only imported where it's used (see utils/lazy_imports.py);
+# session tokens are verified locally (services/clerk_auth.py).
+clerk_enabled = False
+if not is_available("clerk_backend_api"):
     logger.warning(
         "clerk_backend_api is not installed; Clerk features will be disabled"
     )
-
-# Initialize clerk_sdk only when the package is available and the env var is set.
-clerk_sdk = None
-if _has_clerk:
-    clerk_key = os.getenv("CLERK_SECRET_KEY")
-    if clerk_key:
-        clerk_sdk = Clerk(bearer_auth=clerk_key)
-    else:
-        logger.warning(
-            "CLERK_SECRET_KEY is not set; Clerk features will be disabled"
-        )
+elif not os.getenv("CLERK_SECRET_KEY"):
+    logger.warning(
+        "CLERK_SECRET_KEY is not set; Clerk features will be disabled"
+    )
+else:
+    clerk_enabled = True
 
 app = FastAPI(
     title="Career Path AI API",
     description="AI-powered career guidance and recommendations",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 # =======================
@@ -72,8 +74,8 @@ if ENVIRONMENT == "production":
     ]
     origins.extend(production_origins)
 
-logger.info(f"CORS Configuration - Environment: {ENVIRONMENT}")
-logger.info(f"CORS Allowed Origins: {origins}")
+logger.info("CORS Configuration - Environment: %s", ENVIRONMENT)
+logger.info("CORS Allowed Origins: %s", origins)
 
 # Add CORS middleware
 app.add_middleware(
@@ -86,6 +88,9 @@ app.add_middleware(
     max_age=3600,  # Cache preflight for 1 hour
 )
 
+# Outermost, so it times the whole request (sampled; see utils/access_log.py)
+app.add_middleware(AccessLogMiddleware)
+
 # =======================
 # Register Routers
 # =======================
@@ -95,21 +100,35 @@ try:
     app.include_router(roadmaps_router)
     logger.info("✓ Roadmaps router registered")
 except Exception as e:
-    logger.warning(f"Failed to include roadmaps router: {e}")
+    logger.warning("Failed to include roadmaps router: %s", e)
 
 try:
     from .routes.users import router as users_router
     app.include_router(users_router)
     logger.info("✓ Users router registered")
 except Exception as e:
-    logger.warning(f"Failed to include users router: {e}")
+    logger.warning("Failed to include users router: %s", e)
+
+try:
+    from .routes.saved_roadmaps import router as saved_roadmaps_router
+    app.include_router(saved_roadmaps_router)
+    logger.info("✓ Saved roadmaps router registered")
+except Exception as e:
+    logger.warning("Failed to include saved roadmaps router: %s", e)
+
+try:
+    from .routes.chat import router as chat_router
+    app.include_router(chat_router)
+    logger.info("✓ Chat router registered")
+except Exception as e:
+    logger.warning("Failed to include chat router: %s", e)
 
 try:
     from .routes.ai import router as ai_router
     app.include_router(ai_router)
     logger.info("✓ AI router registered")
 except Exception as e:
-    logger.warning(f"Failed to include ai router: {e}")
+    logger.warning("Failed to include ai router: %s", e)
 
 # =======================
 # Root Endpoints
@@ -136,10 +155,17 @@ async def health_check():
         "environment": ENVIRONMENT,
         "cors_enabled": True,
         "allowed_origins_count": len(origins),
-        "clerk_enabled": clerk_sdk is not None,
+        "clerk_enabled": clerk_enabled,
+        "auth": get_clerk_verifier().stats(),
         "database_connected": db_connected
     }
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness probe: 503 until this worker has finished warming up"""
+    state = readiness()
+    return FastJSONResponse(state, status_code=200 if state["ready"] else 503)
+
 # =======================
 # Startup Event
 # =======================
@@ -162,26 +188,52 @@ async def _startup():
         else:
             logger.warning("⚠ Database connection issue - check DATABASE_URL")
         
-        logger.info(f"Environment: {ENVIRONMENT}")
-        logger.info(f"CORS Origins: {origins}")
-        logger.info(f"Clerk SDK: {'Enabled' if clerk_sdk else 'Disabled'}")
-        logger.info("-" * 60)
-        logger.info("Registered Routes:")
+        # Persist chat turns and saved generations off the request path
+        write_behind = get_write_behind()
+        if write_behind is not None:
+            write_behind.start()
+        
+        # Load Clerk signing keys so session tokens verify without network calls
+        await get_clerk_verifier().jwks.start()
+        
+        # DB pool ping, model handshake and cache prefill before taking traffic
+        # (and, unless preloaded by the gunicorn master, eager SDK imports)
+        report = await warm_up_worker()
+        logger.info("Worker warmed up in %.1f ms: %s", report["ms"], report["steps"])
         
-        for route in app.routes:
-            methods = getattr(route, "methods", None)
-            path = getattr(route, "path", "-")
-            name = getattr(route, "name", "-")
-            
-            if methods:
-                methods_str = ", ".join(sorted(methods))
-                logger.info(f"  {methods_str:15} {path:40} ({name})")
-            else:
-                logger.info(f"  {'MOUNT':15} {path:40} ({name})")
+        logger.info("Environment: %s", ENVIRONMENT)
+        logger.info("CORS Origins: %s", origins)
+        logger.info("Clerk SDK: %s", "Enabled" if clerk_enabled else "Disabled")
+        logger.info("Startup mode: %s", STARTUP_MODE)
+        
+        # The route table is available at /debug/routes; only dump it when debugging
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("-" * 60)
+            logger.debug("Registered Routes:")
+            for route in app.routes:
+                methods = getattr(route, "methods", None)
+                path = getattr(route, "path", "-")
+                name = getattr(route, "name", "-")
+                
+                if methods:
+                    methods_str = ", ".join(sorted(methods))
+                    logger.debug("  %-15s %-40s (%s)", methods_str, path, name)
+                else:
+                    logger.debug("  %-15s %-40s (%s)", "MOUNT", path, name)
         
         logger.info("=" * 60)
     except Exception as e:
-        logger.exception(f"Failed to list routes: {e}")
+        logger.exception("Failed to list routes: %s", e)
+
+@app.on_event("shutdown")
+async def _shutdown():
+    """Flush pending writes and release pooled database and model connections"""
+    write_behind = get_write_behind()
+    if write_behind is not None:
+        await write_behind.stop()
+    await get_clerk_verifier().jwks.stop()
+    close_genai_client()
+    await dispose_async_engine()
 
 # =======================
 # Debug Endpoints
@@ -205,7 +257,7 @@ async def _debug_ai_status():
     try:
         from .services.ai_generator import check_genai_client
     except Exception as imp:
-        logger.exception(f"Failed to import ai_generator for debug: {imp}")
+        logger.exception("Failed to import ai_generator for debug: %s", imp)
         return {
             "ok": False,
             "message": "Failed to import ai_generator",
@@ -215,6 +267,11 @@ async def _debug_ai_status():
     status = check_genai_client()
     return status
 
+@app.get("/debug/db-pool")
+async def _debug_db_pool():
+    """Show database connection pool statistics"""
+    return get_pool_stats()
+
 @app.get("/debug/cors")
 async def _debug_cors():
     """Show current CORS configuration"""
@@ -237,7 +294,7 @@ from fastapi.exceptions import RequestValidationError
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Handle validation errors gracefully"""
-    logger.error(f"Validation error on {request.url}: {exc.errors()}")
+    logger.error("Validation error on %s: %s", request.url, exc.errors())
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
@@ -249,7 +306,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
 @app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """Catch-all exception handler"""
-    logger.exception(f"Unhandled exception on {request.url}: {exc}")
+    logger.exception("Unhandled exception on %s: %s", request.url, exc)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
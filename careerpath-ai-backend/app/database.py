@@ -3,16 +3,25 @@ Database connection and session management.
 
 This module handles database connections with support for both PostgreSQL (production)
 and SQLite (development). It provides session management and dependency injection
-for FastAPI routes.
+for FastAPI routes, with both a synchronous engine (`get_db`) and an asyncio engine
+(`get_async_db`, aiosqlite locally / asyncpg in production) built from the same
+configuration.
 """
 import os
 import logging
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import StaticPool
-from typing import Generator
+from typing import Any, AsyncGenerator, Dict, Generator, Optional
 from datetime import datetime, timedelta
 
+try:
+    from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+    _has_asyncio = True
+except ImportError:
+    _has_asyncio = False
+
 from .models import models
 from .models.models import Base
 
@@ -28,41 +37,198 @@ DATABASE_URL = os.getenv(
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
-logger.info(f"Using database: {DATABASE_URL.split('@')[0] if '@' in DATABASE_URL else 'SQLite'}...")
+logger.info("Using database: %s", make_url(DATABASE_URL).render_as_string(hide_password=True))
+
+# Connection pool sizing (PostgreSQL and file-backed SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds before a connection is replaced
+
+# SQLite pragmas applied to every new connection
+SQLITE_WAL = os.getenv("SQLITE_WAL", "1") == "1"
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_CACHE_SIZE = int(os.getenv("SQLITE_CACHE_SIZE", "-65536"))  # negative = KiB, i.e. 64MB
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+_url = make_url(DATABASE_URL)
+IS_SQLITE = _url.get_backend_name() == "sqlite"
+IS_SQLITE_MEMORY = IS_SQLITE and (
+    _url.database in (None, "", ":memory:") or "mode=memory" in str(_url)
+)
 
-# SQLite-specific configuration
 connect_args = {}
 engine_kwargs = {}
 
-if DATABASE_URL.startswith("sqlite"):
+if IS_SQLITE_MEMORY:
+    # An in-memory database only exists on its one connection
     connect_args = {"check_same_thread": False}
     engine_kwargs = {
         "connect_args": connect_args,
-        "poolclass": StaticPool,  # Required for SQLite with FastAPI
+        "poolclass": StaticPool,
     }
-    logger.info("Using SQLite database (local development)")
+    logger.info("Using in-memory SQLite database")
+elif IS_SQLITE:
+    # Each pooled connection is used by one thread at a time, so sharing across
+    # threadpool threads is safe; WAL lets readers proceed alongside the writer.
+    connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    engine_kwargs = {
+        "connect_args": connect_args,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+    logger.info("Using SQLite database (WAL=%s, pool_size=%d)", SQLITE_WAL, DB_POOL_SIZE)
 else:
     engine_kwargs = {
         "pool_pre_ping": True,  # Verify connections before using
-        "pool_size": 5,
-        "max_overflow": 10,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
     }
-    logger.info("Using PostgreSQL database (production)")
+    logger.info("Using PostgreSQL database (pool_size=%d, max_overflow=%d)", DB_POOL_SIZE, DB_MAX_OVERFLOW)
+
+# Pool activity counters, shared by the sync and async engines
+_pool_counters = {"connects": 0, "checkouts": 0, "checkins": 0, "invalidations": 0}
+
+
+def _set_sqlite_pragmas(dbapi_conn, connection_record):
+    cursor = dbapi_conn.cursor()
+    try:
+        if SQLITE_WAL and not IS_SQLITE_MEMORY:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    finally:
+        cursor.close()
+
+
+def _count(name):
+    def listener(*args):
+        _pool_counters[name] += 1
+    return listener
+
+
+def _instrument_engine(sync_engine):
+    """Attach SQLite pragmas and pool counters to an engine (or an async engine's sync_engine)."""
+    if IS_SQLITE:
+        event.listen(sync_engine, "connect", _set_sqlite_pragmas)
+    event.listen(sync_engine, "connect", _count("connects"))
+    event.listen(sync_engine, "checkout", _count("checkouts"))
+    event.listen(sync_engine, "checkin", _count("checkins"))
+    event.listen(sync_engine, "invalidate", _count("invalidations"))
+
 
 # Create engine
 engine = create_engine(DATABASE_URL, **engine_kwargs)
+_instrument_engine(engine)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def _async_database_url(url: str) -> str:
+    """Map the sync DATABASE_URL onto its asyncio driver (aiosqlite / asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend == "sqlite":
+        return parsed.set(drivername="sqlite+aiosqlite").render_as_string(hide_password=False)
+    if backend == "postgresql":
+        parsed = parsed.set(drivername="postgresql+asyncpg")
+        # asyncpg takes `ssl` instead of libpq's `sslmode`
+        if "sslmode" in parsed.query:
+            query = dict(parsed.query)
+            query["ssl"] = query.pop("sslmode")
+            parsed = parsed.set(query=query)
+        return parsed.render_as_string(hide_password=False)
+    return url
+
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _async_database_url(DATABASE_URL)
+
+# Created on first use so the app still starts without aiosqlite/asyncpg installed
+async_engine: Optional["AsyncEngine"] = None
+AsyncSessionLocal: Optional["async_sessionmaker"] = None
+
+
+def get_async_engine() -> "AsyncEngine":
+    """Return the asyncio engine, creating it with the same pool settings as `engine`."""
+    global async_engine, AsyncSessionLocal
+    if async_engine is None:
+        if not _has_asyncio:
+            raise RuntimeError("SQLAlchemy asyncio support is not installed (pip install 'SQLAlchemy[asyncio]')")
+        async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_kwargs)
+        _instrument_engine(async_engine.sync_engine)
+        AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+        logger.info("Async database engine created (%s)", async_engine.dialect.driver)
+    return async_engine
+
+
+async def dispose_async_engine():
+    """Close pooled async connections. Call this on app shutdown."""
+    if async_engine is not None:
+        await async_engine.dispose()
+
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ALEMBIC_INI = os.path.join(BASE_DIR, "alembic.ini")
+
+# Serializes concurrent `upgrade head` runs (several workers starting at once)
+MIGRATION_LOCK_FILE = os.getenv("MIGRATION_LOCK_FILE", os.path.join(BASE_DIR, "data", ".migrate.lock"))
+_PG_MIGRATION_LOCK_KEY = 0x63706169  # arbitrary, app-wide advisory lock id
+
+
+def _run_migrations(connection):
+    from alembic import command
+    from alembic.config import Config
+
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("script_location", os.path.join(BASE_DIR, "migrations"))
+    # keep the app's logging setup; run on our connection and engine settings
+    config.attributes["configure_logger"] = False
+    config.attributes["connection"] = connection
+    command.upgrade(config, "head")
+
+
 def create_tables():
-    """Create all database tables. Call this on app startup."""
+    """Bring the database schema up to date. Call this on app startup.
+
+    Runs the Alembic migrations in `migrations/` (`alembic upgrade head`).
+    Databases created before migrations existed are adopted by the baseline
+    revision. Falls back to `create_all` when Alembic isn't installed.
+    """
     try:
+        import alembic  # noqa: F401
+    except ImportError:
+        logger.warning("alembic is not installed; creating tables without migrations")
         Base.metadata.create_all(bind=engine)
-        logger.info("✓ Database tables created successfully")
+        return
+
+    try:
+        if IS_SQLITE:
+            if IS_SQLITE_MEMORY:
+                with engine.begin() as conn:
+                    _run_migrations(conn)
+            else:
+                import fcntl
+                os.makedirs(os.path.dirname(MIGRATION_LOCK_FILE), exist_ok=True)
+                with open(MIGRATION_LOCK_FILE, "w") as lock:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                    with engine.begin() as conn:
+                        _run_migrations(conn)
+        else:
+            with engine.begin() as conn:
+                if conn.dialect.name == "postgresql":
+                    # released automatically when the transaction ends
+                    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _PG_MIGRATION_LOCK_KEY})
+                _run_migrations(conn)
+        logger.info("✓ Database schema up to date")
     except Exception as e:
-        logger.error(f"Failed to create database tables: {e}")
+        logger.error("Failed to migrate database: %s", e)
         raise
 
 
@@ -83,13 +249,55 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator["AsyncSession", None]:
+    """
+    FastAPI dependency that provides an asyncio database session.
+
+    Use this in async routes so DB I/O doesn't block the event loop or
+    occupy a threadpool thread.
+
+    Usage in routes:
+        @router.get("/example")
+        async def example(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(User))
+            return result.scalars().all()
+    """
+    get_async_engine()
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def _pool_stats(pool) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"pool_class": type(pool).__name__, "status": pool.status()}
+    for name in ("size", "checkedin", "checkedout", "overflow"):
+        fn = getattr(pool, name, None)
+        if callable(fn):
+            stats[name] = fn()
+    return stats
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Connection pool configuration, activity counters and per-engine pool state."""
+    return {
+        "config": {
+            "pool_size": engine_kwargs.get("pool_size"),
+            "max_overflow": engine_kwargs.get("max_overflow"),
+            "pool_timeout": engine_kwargs.get("pool_timeout"),
+            "sqlite_wal": SQLITE_WAL if IS_SQLITE else None,
+        },
+        "counters": dict(_pool_counters),
+        "sync": _pool_stats(engine.pool),
+        "async": _pool_stats(async_engine.sync_engine.pool) if async_engine is not None else None,
+    }
+
+
 def check_database_connection() -> bool:
     """Check if database connection is working."""
     try:
         with engine.connect() as conn:
-            conn.execute("SELECT 1")
+            conn.execute(text("SELECT 1"))
         logger.info("✓ Database connection successful")
         return True
     except Exception as e:
-        logger.error(f"Database connection failed: {e}")
+        logger.error("Database connection failed: %s", e)
         return False
\ No newline at end of file
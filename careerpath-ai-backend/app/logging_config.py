@@ -0,0 +1,137 @@
+"""
+Non-blocking, structured logging.
+
+``configure_logging`` routes every record through a ``QueueHandler`` on the
+root logger: the logging call only enqueues the record, and a
+``QueueListener`` thread does the formatting (``%`` interpolation, JSON
+encoding, tracebacks) and writes to stdout. Request handlers never block
+on log I/O.
+
+Output is one JSON object per line (``LOG_FORMAT=json``, the default) with
+``ts``, ``level``, ``logger`` and ``msg``, any ``extra=`` fields, and
+``exc`` for exceptions; ``LOG_FORMAT=text`` prints plain lines for local
+development. Uvicorn's loggers are routed through the same queue, and its
+access log is replaced by the sampled one in ``utils/access_log.py``.
+
+Env vars:
+
+- ``LOG_LEVEL`` (default ``INFO``)
+- ``LOG_FORMAT`` (default ``json``): ``json`` or ``text``
+"""
+import atexit
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime, timezone
+from typing import Mapping, Optional
+
+from .utils.serialization import dumps
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+
+# LogRecord attributes that aren't user-supplied ``extra`` fields
+_RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_registered = False
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per record, including ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc"] = record.exc_text
+        try:
+            return dumps(entry).decode("utf-8")
+        except TypeError:
+            return dumps({k: v if isinstance(v, (str, int, float, bool, type(None))) else repr(v)
+                          for k, v in entry.items()}).decode("utf-8")
+
+
+# Log args that can be formatted later and still say what they said when logged
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records as they are; the listener thread formats them.
+
+    The stock ``prepare`` formats the message (and traceback) in the calling
+    thread so records can be pickled; an in-process queue doesn't need that.
+    Formatting later is only safe for immutable args, though: a dict or list
+    logged now could have changed by the time the listener gets to it, so
+    those messages are rendered here.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args:
+            values = args.values() if isinstance(args, Mapping) else args
+            if not all(isinstance(v, _IMMUTABLE_ARGS) for v in values):
+                record.msg = record.getMessage()
+                record.args = None
+        return record
+
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT) -> None:
+    """Install the queue-based pipeline on the root logger (idempotent)."""
+    global _listener, _registered
+    if _listener is not None:
+        return
+
+    output = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        output.setFormatter(JSONFormatter())
+    else:
+        output.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(_DeferredQueueHandler(records))
+    root.setLevel(level)
+
+    # uvicorn installs its own stream handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+    # superseded by the sampled access log middleware
+    logging.getLogger("uvicorn.access").disabled = True
+
+    _listener = logging.handlers.QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    if not _registered:
+        atexit.register(stop_logging)
+        # the listener thread doesn't survive fork() (gunicorn preload): give each worker its own
+        os.register_at_fork(after_in_child=_reinit_after_fork)
+        _registered = True
+
+
+def _reinit_after_fork() -> None:
+    global _listener
+    _listener = None
+    configure_logging()
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -1,3 +1,3 @@
-from .models import Base, User, Roadmap, ChatMessage
+from .models import Base, User, Profile, Roadmap, RoadmapPayload, ChatSession, ChatMessage
 
-__all__ = ["Base", "User", "Roadmap", "ChatMessage"]
+__all__ = ["Base", "User", "Profile", "Roadmap", "RoadmapPayload", "ChatSession", "ChatMessage"]
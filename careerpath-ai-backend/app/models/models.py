@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, JSON, Boolean, Index, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -21,22 +21,48 @@ class User(Base):
     # Relationships
     roadmaps = relationship("Roadmap", back_populates="user", cascade="all, delete-orphan")
     chat_messages = relationship("ChatMessage", back_populates="user", cascade="all, delete-orphan")
+    chat_sessions = relationship("ChatSession", back_populates="user", cascade="all, delete-orphan")
+    profile = relationship("Profile", back_populates="user", uselist=False, cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<User(id={self.id}, email={self.email})>"
 
 
+class Profile(Base):
+    """Profile model for storing user-editable profile fields"""
+    __tablename__ = "user_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), unique=True, nullable=False)
+
+    # Profile document as sent by the frontend (fullName, location, ...)
+    data = Column(JSON, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    # Relationships
+    user = relationship("User", back_populates="profile")
+
+    def __repr__(self):
+        return f"<Profile(id={self.id}, user_id={self.user_id})>"
+
+
 class Roadmap(Base):
     """Roadmap model for storing AI-generated career paths"""
     __tablename__ = "roadmaps"
+    __table_args__ = (
+        # per-user listing, newest first (keyset pagination)
+        Index("ix_roadmaps_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     title = Column(String(500), nullable=False)
     career_type = Column(String(200))
     
-    # Store full AI response as JSON
-    career_data = Column(JSON, nullable=False)
+    # Full AI response, stored once per distinct content in roadmap_payloads.
+    # career_data only holds rows saved inline (NULL when payload_hash is set).
+    payload_hash = Column(String(64), ForeignKey("roadmap_payloads.hash"), nullable=True, index=True)
+    career_data = Column(JSON(none_as_null=True), nullable=True)
     
     # Metadata
     prompt = Column(Text)  # Original user prompt
@@ -51,12 +77,59 @@ class Roadmap(Base):
         return f"<Roadmap(id={self.id}, title={self.title})>"
 
 
+class RoadmapPayload(Base):
+    """Content-addressed, compressed career_data shared by identical roadmaps"""
+    __tablename__ = "roadmap_payloads"
+
+    hash = Column(String(64), primary_key=True)  # sha256 of the canonical JSON
+    data = Column(LargeBinary, nullable=False)  # zlib-compressed canonical JSON
+    size = Column(Integer, nullable=False)  # uncompressed size in bytes
+    refcount = Column(Integer, nullable=False, default=1)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self):
+        return f"<RoadmapPayload(hash={self.hash[:12]}, refcount={self.refcount})>"
+
+
+class ChatSession(Base):
+    """Chat session (conversation) owning a sequence of chat messages"""
+    __tablename__ = "chat_sessions"
+    __table_args__ = (
+        # per-user session list, most recently active first
+        Index("ix_chat_sessions_user_id_updated_at", "user_id", "updated_at"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    title = Column(String(200), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False)  # last message
+
+    # Rolling summary of messages older than the verbatim context window
+    summary = Column(Text, nullable=True)
+    summarized_messages = Column(Integer, default=0, server_default="0", nullable=False)
+
+    # Relationships
+    user = relationship("User", back_populates="chat_sessions")
+    messages = relationship("ChatMessage", back_populates="session", cascade="all, delete-orphan")
+
+    def __repr__(self):
+        return f"<ChatSession(id={self.id}, user_id={self.user_id})>"
+
+
 class ChatMessage(Base):
     """Chat message model for storing AI chat history"""
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        # per-user history, newest first (keyset pagination)
+        Index("ix_chat_messages_user_id_timestamp", "user_id", "timestamp"),
+        # per-session history
+        Index("ix_chat_messages_session_id_timestamp", "session_id", "timestamp"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    session_id = Column(Integer, ForeignKey("chat_sessions.id", ondelete="CASCADE"), nullable=True)
     role = Column(String(20), nullable=False)  # 'user' or 'assistant' or 'system'
     content = Column(Text, nullable=False)
     
@@ -67,6 +140,7 @@ class ChatMessage(Base):
 
     # Relationships
     user = relationship("User", back_populates="chat_messages")
+    session = relationship("ChatSession", back_populates="messages")
 
     def __repr__(self):
         return f"<ChatMessage(id={self.id}, role={self.role}, user_id={self.user_id})>"
\ No newline at end of file
@@ -1,28 +1,82 @@
-from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Request, HTTPException, BackgroundTasks, Header, Response
 from pydantic import BaseModel, Field, validator
+import math
 import time
-import hashlib
+import json
 import logging
-from typing import Any, Dict, Optional, Tuple
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
 from collections import defaultdict
+from dataclasses import dataclass
 import asyncio
 from functools import wraps
 
+from ..schemas import AIResponse
+from ..services.admission import (
+    AI_REQUEST_DEADLINE,
+    Overloaded,
+    fairness_key,
+    get_admission_controller,
+    request_deadline,
+)
+from ..services.answer_normalizer import normalize_answer
+from ..services.chat_sessions import get_session_windows
+from ..services.profile_store import InvalidUserId, validate_user_id
+from ..services.write_behind import get_write_behind
+from ..utils.serialization import dumps
+from ..utils.utils import authenticate_and_get_user_details
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/ai", tags=["ai"])
 
 # Configuration
-CACHE_TTL = 60 * 5  # 5 minutes
+# Answers are fresh for CACHE_TTL; until CACHE_HARD_TTL a stale answer is
+# still served while one background regeneration replaces it
+CACHE_TTL = int(os.getenv("AI_CACHE_TTL", str(60 * 5)))  # 5 minutes
+CACHE_HARD_TTL = int(os.getenv("AI_CACHE_HARD_TTL", str(60 * 30)))  # 30 minutes
+# Hot entries (decayed hit count >= CACHE_HOT_HITS) are regenerated this many
+# seconds before they go stale, so popular prompts never serve stale answers
+CACHE_REFRESH_AHEAD = int(os.getenv("AI_CACHE_REFRESH_AHEAD", "30"))
+CACHE_HOT_HITS = float(os.getenv("AI_CACHE_HOT_HITS", "3"))
 RATE_LIMIT_WINDOW = 60  # seconds
 RATE_LIMIT_MAX = 10  # max requests per window per IP
 MAX_PROMPT_LENGTH = 2000
 CACHE_MAX_SIZE = 1000  # Maximum number of cached items
 
-# In-memory storage
-_CACHE: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+# Serialized answers start with the ``cached`` flag, so a cached copy of
+# the body is made by swapping this prefix instead of re-encoding
+_CACHED_FALSE = b'{"cached":false,'
+_CACHED_TRUE = b'{"cached":true,'
+
+# Background regenerations share one slice of the admission queue
+_REFRESH_KEY = "ai-cache-refresh"
+
+
+@dataclass
+class _CacheEntry:
+    """A cached answer and its serialized body, both marked cached."""
+    stored_at: float
+    answer: Dict[str, Any]
+    body: bytes
+    # hit count decaying with time constant CACHE_TTL, and when it was last updated
+    heat: float = 0.0
+    touched_at: float = 0.0
+    refreshing: bool = False
+
+
+# In-memory storage: prompt -> cache entry
+_CACHE: Dict[str, _CacheEntry] = {}
 _RATE_LIMIT: Dict[str, list[float]] = defaultdict(list)
 _CACHE_LOCK = asyncio.Lock()
+_CACHE_STATS = {"hits": 0, "stale_hits": 0, "misses": 0, "refreshes": 0, "refresh_ahead": 0, "refresh_failures": 0}
+# keeps running refresh tasks referenced until they finish
+_REFRESH_TASKS: Set[asyncio.Task] = set()
+
+# How shed generations are answered: reject (503), curated (closest curated
+# roadmap, else 503) or fallback (curated, else the generic fallback answer)
+ADMISSION_SHED_MODE = os.getenv("ADMISSION_SHED_MODE", "curated")
+_SHED_ANSWERS = {"curated": 0, "fallback": 0, "rejected": 0}
 
 
 class AIPrompt(BaseModel):
@@ -33,6 +87,7 @@ class AIPrompt(BaseModel):
         max_length=MAX_PROMPT_LENGTH,
         description="Career-related query for AI generation"
     )
+    save: bool = Field(False, description="Also save the result to the signed-in user's roadmaps")
     
     @validator('prompt')
     def validate_prompt(cls, v):
@@ -43,18 +98,6 @@ class AIPrompt(BaseModel):
         return v
 
 
-class AIResponse(BaseModel):
-    """Response model for AI generation."""
-    title: str
-    explanation: str
-    average_salary: str
-    job_openings: str
-    youtube_video_recommendation: str
-    learning_resources: list[Dict[str, str]]
-    cached: bool = False
-    generation_time_ms: Optional[float] = None
-
-
 class ErrorResponse(BaseModel):
     """Error response model."""
     detail: str
@@ -111,8 +154,8 @@ def _evict_old_cache_entries():
     """Evict expired cache entries to prevent unbounded growth."""
     now = time.time()
     expired_keys = [
-        key for key, (ts, _) in _CACHE.items()
-        if now - ts >= CACHE_TTL
+        key for key, entry in _CACHE.items()
+        if now - entry.stored_at >= CACHE_HARD_TTL
     ]
     
     for key in expired_keys:
@@ -121,48 +164,228 @@ def _evict_old_cache_entries():
     # Also enforce max size by removing oldest entries
     if len(_CACHE) > CACHE_MAX_SIZE:
         # Sort by timestamp and keep only the newest entries
-        sorted_items = sorted(_CACHE.items(), key=lambda x: x[1][0], reverse=True)
+        sorted_items = sorted(_CACHE.items(), key=lambda x: x[1].stored_at, reverse=True)
         _CACHE.clear()
         _CACHE.update(dict(sorted_items[:CACHE_MAX_SIZE]))
         logger.info("Cache size limit reached. Evicted %d entries", 
                    len(sorted_items) - CACHE_MAX_SIZE)
 
 
-async def _get_cached_response(prompt: str, now: float) -> Optional[Dict[str, Any]]:
-    """Check cache for a valid response.
+async def _get_cached_response(prompt: str, now: float) -> Optional[Tuple[Dict[str, Any], bytes]]:
+    """Check cache for a servable response.
+    
+    A fresh entry is served as is. A stale one (older than ``CACHE_TTL``,
+    younger than ``CACHE_HARD_TTL``) is served too, and triggers a single
+    background regeneration; so does a hot entry about to go stale.
     
     Args:
         prompt: The prompt to check
         now: Current timestamp
         
     Returns:
-        Cached response if valid, None otherwise
+        ``(answer, body)`` if servable, None otherwise. Both are shared with the
+        cache and already marked cached; callers must not mutate the answer.
     """
     async with _CACHE_LOCK:
-        cached = _CACHE.get(prompt)
-        if cached:
-            ts, resp = cached
-            if now - ts < CACHE_TTL:
-                logger.info("Cache hit for prompt: %s", prompt[:50])
-                return {**resp, "cached": True}
-        return None
+        entry = _CACHE.get(prompt)
+        if entry is None:
+            _CACHE_STATS["misses"] += 1
+            return None
+        age = now - entry.stored_at
+        if age >= CACHE_HARD_TTL:
+            del _CACHE[prompt]
+            _CACHE_STATS["misses"] += 1
+            return None
+        entry.heat = entry.heat * math.exp(-(now - entry.touched_at) / CACHE_TTL) + 1
+        entry.touched_at = now
+        if age >= CACHE_TTL:
+            _CACHE_STATS["stale_hits"] += 1
+            _schedule_refresh(prompt, entry)
+        else:
+            _CACHE_STATS["hits"] += 1
+            if entry.heat >= CACHE_HOT_HITS and age >= CACHE_TTL - CACHE_REFRESH_AHEAD:
+                if _schedule_refresh(prompt, entry):
+                    _CACHE_STATS["refresh_ahead"] += 1
+        # never log the prompt itself (may contain PII)
+        logger.debug("Cache hit (prompt_len: %d)", len(prompt))
+        return entry.answer, entry.body
 
 
-async def _set_cache(prompt: str, response: Dict[str, Any], now: float):
+async def _set_cache(prompt: str, response: Dict[str, Any], body: bytes, now: float):
     """Set a response in the cache.
     
     Args:
         prompt: The prompt key
-        response: The response to cache
+        response: The validated response to cache
+        body: ``response`` serialized by ``serialize_answer``
         now: Current timestamp
     """
     async with _CACHE_LOCK:
-        _CACHE[prompt] = (now, response)
+        previous = _CACHE.get(prompt)
+        entry = _CacheEntry(now, {**response, "cached": True}, _CACHED_TRUE + body[len(_CACHED_FALSE):])
+        if previous is not None:
+            # a regenerated entry stays as hot as the one it replaces
+            entry.heat, entry.touched_at = previous.heat, previous.touched_at
+        else:
+            entry.touched_at = now
+        _CACHE[prompt] = entry
         # Periodically clean up old entries
         if len(_CACHE) % 50 == 0:  # Every 50 additions
             _evict_old_cache_entries()
 
 
+def _schedule_refresh(prompt: str, entry: _CacheEntry) -> bool:
+    """Start a background regeneration of ``prompt`` unless one is running (call under ``_CACHE_LOCK``)."""
+    if entry.refreshing:
+        return False
+    entry.refreshing = True
+    task = asyncio.get_running_loop().create_task(_refresh_entry(prompt, entry))
+    _REFRESH_TASKS.add(task)
+    task.add_done_callback(_REFRESH_TASKS.discard)
+    return True
+
+
+async def _refresh_entry(prompt: str, entry: _CacheEntry) -> None:
+    """Regenerate a cached answer through admission control and replace the entry."""
+    from ..services import ai_generator  # type: ignore
+
+    start_time = time.time()
+    try:
+        result = await get_admission_controller().run(
+            _REFRESH_KEY, time.monotonic() + AI_REQUEST_DEADLINE, ai_generator.generate_career_path_with_ai, prompt
+        )
+        result["generation_time_ms"] = round((time.time() - start_time) * 1000, 2)
+        result["cached"] = False
+        await _set_cache(prompt, result, serialize_answer(result), time.time())
+        _CACHE_STATS["refreshes"] += 1
+    except Exception as exc:
+        # keep serving the current entry until its hard TTL; a later hit retries
+        _CACHE_STATS["refresh_failures"] += 1
+        logger.warning("Background refresh of a cached answer failed: %s", exc)
+    finally:
+        entry.refreshing = False
+
+
+def _get_curated_response(prompt: str, relaxed: bool = False) -> Optional[Dict[str, Any]]:
+    """Return a curated catalog answer for the prompt, if one matches confidently.
+    
+    Args:
+        prompt: The user prompt
+        relaxed: Accept a weaker match (used when generation was shed)
+        
+    Returns:
+        A fresh AIResponse-shaped dict, or None to fall through to the model
+    """
+    try:
+        from ..services import curated_match  # type: ignore
+        record = curated_match.match_prompt(prompt, relaxed=relaxed)
+    except Exception as exc:
+        logger.warning("Curated matching failed: %s", exc)
+        return None
+    return {**record, "cached": False} if record else None
+
+
+def serialize_answer(response: Dict[str, Any]) -> bytes:
+    """Serialize a validated answer with ``cached`` as its first key."""
+    body = dumps({"cached": False, **{k: v for k, v in response.items() if k != "cached"}})
+    return _CACHED_TRUE + body[len(_CACHED_FALSE):] if response.get("cached") else body
+
+
+def answer_content(response: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of an answer stored in chat history (drops per-request metadata)."""
+    return {k: v for k, v in response.items() if k not in ("cached", "generation_time_ms")}
+
+
+def record_chat_turn(
+    user_id: str,
+    prompt: str,
+    response: Dict[str, Any],
+    session_id: Optional[int] = None,
+) -> bool:
+    """Queue a prompt/answer pair for write-behind persistence.
+
+    Never touches the database on the request path; see services/write_behind.py.
+
+    Returns:
+        False if write-behind is disabled and nothing was queued
+    """
+    queue = get_write_behind()
+    if queue is None:
+        return False
+    queue.add_chat_message(user_id, "user", prompt, session_id=session_id)
+    queue.add_chat_message(
+        user_id,
+        "assistant",
+        json.dumps(answer_content(response), ensure_ascii=False, separators=(",", ":")),
+        cached=bool(response.get("cached")),
+        generation_time_ms=response.get("generation_time_ms"),
+        session_id=session_id,
+    )
+    return True
+
+
+def _history_user(request: Request, x_user_id: Optional[str], save: bool) -> Optional[str]:
+    """The verified user whose history a ``/generate`` call writes to, or None.
+
+    Recording is opt-in (``X-User-Id`` or ``save``) and always needs a valid
+    session token, whatever ``CLERK_AUTH_REQUIRED`` says: the header alone
+    would let anyone write into any account.
+
+    Raises:
+        HTTPException: 400 for a malformed header, 401/503 without a verified
+            session, 403 if the header names another user
+    """
+    if x_user_id is None and not save:
+        return None
+    if x_user_id is not None:
+        try:
+            validate_user_id(x_user_id)
+        except InvalidUserId:
+            raise HTTPException(status_code=400, detail="Invalid X-User-Id header")
+    user_id = authenticate_and_get_user_details(request)["user_id"]
+    if x_user_id is not None and x_user_id != user_id:
+        raise HTTPException(status_code=403, detail="X-User-Id does not match the session")
+    return user_id
+
+
+def _record_turn(user_id: Optional[str], body: "AIPrompt", response: Dict[str, Any]):
+    """Queue the chat turn (and the roadmap, if requested) for the verified user."""
+    if not user_id or not record_chat_turn(user_id, body.prompt, response):
+        return
+    if body.save:
+        get_write_behind().add_roadmap(
+            user_id, response.get("title") or body.prompt[:100], answer_content(response), prompt=body.prompt
+        )
+
+
+def _answer_shed(prompt: str, ip: str, shed: Overloaded, start_time: float) -> Tuple[Dict[str, Any], bytes]:
+    """Answer a request whose generation was shed, per ``ADMISSION_SHED_MODE``.
+
+    Raises:
+        HTTPException: 503 with ``Retry-After`` when no cheaper answer is allowed or found
+    """
+    logger.warning("AI generation shed for IP: %s (%s)", ip, shed.reason)
+    answer = None
+    if ADMISSION_SHED_MODE in ("curated", "fallback"):
+        answer = _get_curated_response(prompt, relaxed=True)
+        if answer is not None:
+            _SHED_ANSWERS["curated"] += 1
+    if answer is None and ADMISSION_SHED_MODE == "fallback":
+        from ..services.ai_generator import fallback_answer
+        answer = {**fallback_answer(prompt), "cached": False}
+        _SHED_ANSWERS["fallback"] += 1
+    if answer is None:
+        _SHED_ANSWERS["rejected"] += 1
+        raise HTTPException(
+            status_code=503,
+            detail="AI service is busy. Please try again shortly.",
+            headers={"Retry-After": str(math.ceil(shed.retry_after))},
+        )
+    answer["generation_time_ms"] = round((time.time() - start_time) * 1000, 2)
+    answer = normalize_answer(answer)
+    return answer, serialize_answer(answer)
+
+
 def _cleanup_rate_limits():
     """Background task to clean up old rate limit entries."""
     now = time.time()
@@ -182,66 +405,53 @@ def _cleanup_rate_limits():
         logger.debug("Cleaned up rate limit data for %d IPs", len(ips_to_remove))
 
 
-@router.post(
-    "/generate",
-    response_model=AIResponse,
-    responses={
-        200: {"description": "Successfully generated career path"},
-        400: {"model": ErrorResponse, "description": "Invalid request"},
-        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
-        500: {"model": ErrorResponse, "description": "AI generation failed"},
-        503: {"model": ErrorResponse, "description": "AI service unavailable"}
-    },
-    summary="Generate AI Career Path",
-    description="Generate a comprehensive career roadmap using AI. Results are cached for 5 minutes."
-)
-async def generate(
-    request: Request,
-    body: AIPrompt,
-    background_tasks: BackgroundTasks
-):
-    """Generate a career path roadmap using AI.
+async def answer_prompt(
+    prompt: str,
+    ip: str,
+    context: Optional[List[Dict[str, str]]] = None,
+    user_key: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> Tuple[Dict[str, Any], bytes]:
+    """Answer a prompt from the response cache, the curated catalog or the model.
     
-    This endpoint:
-    - Rate limits requests to 10 per minute per IP
-    - Caches responses for 5 minutes
-    - Returns comprehensive career information including salary, resources, and recommendations
+    Model calls go through admission control (see services/admission.py);
+    a shed call is answered per ``ADMISSION_SHED_MODE``.
     
     Args:
-        request: FastAPI request object
-        body: Request body containing the prompt
-        background_tasks: FastAPI background tasks for cleanup
+        prompt: The new user message
+        ip: Client IP, for logging
+        context: Earlier conversation turns assembled by the server. Answers
+            that depend on context are neither read from nor written to the
+            cache, nor taken from the curated catalog.
+        user_key: Whose share of the generation queue to use, from
+            ``admission.fairness_key`` (defaults to ``ip``)
+        deadline: ``time.monotonic()`` deadline (defaults to ``AI_REQUEST_DEADLINE`` from now)
         
     Returns:
-        AIResponse with career path information
+        ``(answer, body)``: the validated AIResponse-shaped dict and its
+        serialized JSON. Cached answers are shared; don't mutate them.
         
     Raises:
         HTTPException: Various HTTP errors for different failure scenarios
     """
     start_time = time.time()
-    ip = _get_client_ip(request)
-    now = time.time()
-    
-    # Avoid logging user prompt plaintext (may contain PII). Log a short hash and length instead.
-    prompt_hash = hashlib.sha256(body.prompt.encode('utf-8')).hexdigest()[:8]
-    logger.info("Received AI generation request from IP: %s, prompt_hash: %s, prompt_len: %d", 
-               ip, prompt_hash, len(body.prompt))
-    
-    # Rate limiting check
-    if _check_rate_limit(ip, now):
-        logger.warning("Rate limit exceeded for IP: %s", ip)
-        raise HTTPException(
-            status_code=429,
-            detail=f"Rate limit exceeded. Maximum {RATE_LIMIT_MAX} requests per {RATE_LIMIT_WINDOW} seconds."
-        )
-    
-    # Schedule cleanup in background
-    background_tasks.add_task(_cleanup_rate_limits)
+    now = start_time
     
     # Check cache
-    cached_response = await _get_cached_response(body.prompt, now)
-    if cached_response:
-        return cached_response
+    if not context:
+        cached_response = await _get_cached_response(prompt, now)
+        if cached_response:
+            return cached_response
+
+    # Answer prompts the curated catalog already covers without calling the
+    # model; a follow-up in a conversation ("what about salaries there?")
+    # needs the model to read the context
+    curated = None if context else _get_curated_response(prompt)
+    if curated:
+        curated["generation_time_ms"] = round((time.time() - start_time) * 1000, 2)
+        logger.debug("Curated match for IP: %s (%s)", ip, curated["title"])
+        curated = normalize_answer(curated)
+        return curated, serialize_answer(curated)
     
     # Import AI generator lazily to avoid import-time failures
     try:
@@ -259,23 +469,32 @@ async def generate(
             detail="AI generator service configuration error."
         )
     
+    if deadline is None:
+        deadline = time.monotonic() + AI_REQUEST_DEADLINE
+    
     # Call AI generator
     try:
-        result = ai_generator.generate_career_path_with_ai(body.prompt)
+        result = await get_admission_controller().run(
+            user_key or ip, deadline, ai_generator.generate_career_path_with_ai, prompt, context=context
+        )
         
         # Calculate generation time
         generation_time_ms = (time.time() - start_time) * 1000
         result["generation_time_ms"] = round(generation_time_ms, 2)
         result["cached"] = False
+        body = serialize_answer(result)
         
         logger.info("AI generation successful for IP: %s (%.2fms)", 
                    ip, generation_time_ms)
         
         # Cache the result
-        await _set_cache(body.prompt, result, now)
+        if not context:
+            await _set_cache(prompt, result, body, now)
         
-        return result
+        return result, body
         
+    except Overloaded as shed:
+        return _answer_shed(prompt, ip, shed, start_time)
     except ValueError as val_err:
         # Handle validation errors from AI generator (e.g., invalid prompt)
         logger.warning("Validation error in AI generation: %s", val_err)
@@ -313,6 +532,103 @@ async def generate(
         )
 
 
+async def generate_response(
+    prompt: str,
+    ip: str,
+    context: Optional[List[Dict[str, str]]] = None,
+    user_key: Optional[str] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Like ``answer_prompt``, for callers that only need the answer dict."""
+    answer, _ = await answer_prompt(prompt, ip, context=context, user_key=user_key, deadline=deadline)
+    return answer
+
+
+def enforce_rate_limit(request: Request) -> str:
+    """Apply the per-IP rate limit and return the client IP.
+    
+    Raises:
+        HTTPException: 429 if the IP has exceeded the limit
+    """
+    ip = _get_client_ip(request)
+    if _check_rate_limit(ip, time.time()):
+        logger.warning("Rate limit exceeded for IP: %s", ip)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded. Maximum {RATE_LIMIT_MAX} requests per {RATE_LIMIT_WINDOW} seconds."
+        )
+    return ip
+
+
+@router.post(
+    "/generate",
+    response_model=AIResponse,
+    responses={
+        200: {"description": "Successfully generated career path"},
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        401: {"model": ErrorResponse, "description": "History requested without a valid session token"},
+        403: {"model": ErrorResponse, "description": "X-User-Id does not match the session"},
+        429: {"model": ErrorResponse, "description": "Rate limit exceeded"},
+        500: {"model": ErrorResponse, "description": "AI generation failed"},
+        503: {"model": ErrorResponse, "description": "AI service unavailable or overloaded"}
+    },
+    summary="Generate AI Career Path",
+    description="Generate a comprehensive career roadmap using AI. Results are cached for 5 minutes, then refreshed in the background."
+)
+async def generate(
+    request: Request,
+    body: AIPrompt,
+    background_tasks: BackgroundTasks,
+    x_user_id: Optional[str] = Header(None),
+):
+    """Generate a career path roadmap using AI.
+    
+    This endpoint:
+    - Rate limits requests to 10 per minute per IP
+    - Caches responses for 5 minutes; popular answers are regenerated in the
+      background instead of expiring
+    - Returns comprehensive career information including salary, resources, and recommendations
+    
+    For multi-turn conversations use the chat session endpoints
+    (``/api/users/{user_id}/chat/sessions``), which keep the history server-side.
+    
+    Args:
+        request: FastAPI request object
+        body: Request body containing the prompt
+        background_tasks: FastAPI background tasks for cleanup
+        x_user_id: Optional Clerk user id; when set, the turn is stored in their
+            chat history. Must match the session token's subject
+        
+    Returns:
+        AIResponse with career path information
+        
+    Raises:
+        HTTPException: Various HTTP errors for different failure scenarios
+    """
+    ip = _get_client_ip(request)
+    deadline = request_deadline(request)
+    
+    # Rate limiting check
+    enforce_rate_limit(request)
+    
+    user_id = _history_user(request, x_user_id, body.save)
+    
+    # Schedule cleanup in background
+    background_tasks.add_task(_cleanup_rate_limits)
+    
+    result, payload = await answer_prompt(
+        body.prompt, ip, user_key=fairness_key(request, user_id), deadline=deadline
+    )
+    _record_turn(user_id, body, result)
+    # already validated and serialized; skip response_model handling
+    return Response(
+        payload,
+        media_type="application/json",
+        headers={"X-Cache": "HIT" if result.get("cached") else "MISS"},
+    )
+
+
+
 @router.get(
     "/health",
     summary="Check AI Service Health",
@@ -331,6 +647,7 @@ async def health_check():
             **status,
             "cache_size": len(_CACHE),
             "cache_max_size": CACHE_MAX_SIZE,
+            "cache_refreshing": len(_REFRESH_TASKS),
             "rate_limit_tracked_ips": len(_RATE_LIMIT)
         }
     except Exception as exc:
@@ -359,6 +676,11 @@ async def clear_cache():
     async with _CACHE_LOCK:
         cache_size = len(_CACHE)
         _CACHE.clear()
+        try:
+            from ..services.ai_generator import part_cache
+            part_cache.clear()
+        except ImportError:
+            pass
         logger.info("Cache cleared: %d entries removed", cache_size)
         return {
             "message": "Cache cleared successfully",
@@ -366,6 +688,14 @@ async def clear_cache():
         }
 
 
+def _generation_stats() -> Dict[str, Any]:
+    try:
+        from ..services.ai_generator import generation_stats
+    except ImportError as exc:
+        return {"error": str(exc)}
+    return generation_stats()
+
+
 @router.get(
     "/stats",
     summary="Get API Statistics",
@@ -377,15 +707,28 @@ async def get_stats():
     Returns:
         Dictionary with current statistics
     """
+    queue = get_write_behind()
     return {
         "cache": {
+            **_CACHE_STATS,
             "size": len(_CACHE),
             "max_size": CACHE_MAX_SIZE,
-            "ttl_seconds": CACHE_TTL
+            "ttl_seconds": CACHE_TTL,
+            "hard_ttl_seconds": CACHE_HARD_TTL,
+            "refresh_ahead_seconds": CACHE_REFRESH_AHEAD,
+            "refreshing": len(_REFRESH_TASKS),
         },
         "rate_limit": {
             "tracked_ips": len(_RATE_LIMIT),
             "window_seconds": RATE_LIMIT_WINDOW,
             "max_requests_per_window": RATE_LIMIT_MAX
-        }
+        },
+        "admission": {
+            **get_admission_controller().stats(),
+            "shed_mode": ADMISSION_SHED_MODE,
+            "shed_answers": dict(_SHED_ANSWERS),
+        },
+        "write_behind": queue.stats() if queue is not None else {"enabled": False},
+        "chat_sessions": get_session_windows().stats(),
+        "generation": _generation_stats(),
     }
\ No newline at end of file
@@ -0,0 +1,200 @@
+from datetime import datetime
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+import json
+import logging
+
+from ..database import get_async_db
+from ..models import ChatMessage, ChatSession
+from ..schemas import (
+    ChatHistoryPage,
+    ChatMessageCreate,
+    ChatMessageResponse,
+    ChatSessionCreate,
+    ChatSessionListPage,
+    ChatSessionResponse,
+    ChatTurnRequest,
+    ChatTurnResponse,
+    MessageResponse,
+)
+from ..services.admission import fairness_key, request_deadline
+from ..services.chat_sessions import get_session_windows, render_turn
+from ..services.profile_store import InvalidUserId, validate_user_id
+from ..services.user_lookup import get_user_pk
+from .ai import answer_content, enforce_rate_limit, generate_response, record_chat_turn
+from ..utils.pagination import next_page_cursor, seek_newest_first
+from ..utils.utils import require_owner
+
+router = APIRouter(prefix="/api/users/{user_id}/chat", tags=["chat"], dependencies=[Depends(require_owner)])
+_logger = logging.getLogger(__name__)
+
+
+@router.get("/messages", response_model=ChatHistoryPage)
+async def list_chat_messages(
+    user_id: str,
+    cursor: str | None = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Return a user's chat history, newest first.
+
+    Uses keyset pagination on ``(timestamp, id)``, so scrolling back through
+    a long history costs the same per page as the first one.
+    """
+    user_pk = await get_user_pk(db, user_id)
+    if user_pk is None:
+        return ChatHistoryPage(messages=[], next_cursor=None)
+
+    stmt = seek_newest_first(
+        select(ChatMessage).where(ChatMessage.user_id == user_pk),
+        ChatMessage.timestamp, ChatMessage.id, cursor, limit,
+    )
+    rows = (await db.scalars(stmt)).all()
+    messages, next_cursor = next_page_cursor(rows, limit, "timestamp")
+    return ChatHistoryPage(messages=messages, next_cursor=next_cursor)
+
+
+@router.post("/messages", response_model=ChatMessageResponse, status_code=201)
+async def add_chat_message(user_id: str, body: ChatMessageCreate, db: AsyncSession = Depends(get_async_db)):
+    """Append a message to the user's chat history."""
+    user_pk = await get_user_pk(db, user_id, create=True)
+    message = ChatMessage(user_id=user_pk, **body.model_dump())
+    db.add(message)
+    await db.commit()
+    await db.refresh(message)
+    return message
+
+
+# ============ Chat sessions ============
+
+async def _get_owned_session(db: AsyncSession, user_id: str, session_id: int) -> ChatSession:
+    user_pk = await get_user_pk(db, user_id)
+    session = None
+    if user_pk is not None:
+        session = await db.scalar(
+            select(ChatSession).where(ChatSession.id == session_id, ChatSession.user_id == user_pk)
+        )
+    if session is None:
+        raise HTTPException(status_code=404, detail="Chat session not found")
+    return session
+
+
+@router.post("/sessions", response_model=ChatSessionResponse, status_code=201)
+async def create_chat_session(user_id: str, body: ChatSessionCreate, db: AsyncSession = Depends(get_async_db)):
+    """Start a chat session. Send turns to ``/sessions/{session_id}/messages``."""
+    user_pk = await get_user_pk(db, user_id, create=True)
+    session = ChatSession(user_id=user_pk, title=(body.title or "").strip() or "New chat")
+    db.add(session)
+    await db.commit()
+    await db.refresh(session)
+    get_session_windows().create(session.id, user_id)
+    return session
+
+
+@router.get("/sessions", response_model=ChatSessionListPage)
+async def list_chat_sessions(
+    user_id: str,
+    cursor: str | None = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List a user's chat sessions, most recently active first (keyset paginated)."""
+    user_pk = await get_user_pk(db, user_id)
+    if user_pk is None:
+        return ChatSessionListPage(sessions=[], next_cursor=None)
+
+    stmt = seek_newest_first(
+        select(ChatSession).where(ChatSession.user_id == user_pk),
+        ChatSession.updated_at, ChatSession.id, cursor, limit,
+    )
+    rows = (await db.scalars(stmt)).all()
+    sessions, next_cursor = next_page_cursor(rows, limit, "updated_at")
+    return ChatSessionListPage(sessions=sessions, next_cursor=next_cursor)
+
+
+@router.delete("/sessions/{session_id}", response_model=MessageResponse)
+async def delete_chat_session(user_id: str, session_id: int, db: AsyncSession = Depends(get_async_db)):
+    session = await _get_owned_session(db, user_id, session_id)
+    await db.execute(delete(ChatMessage).where(ChatMessage.session_id == session.id))
+    await db.delete(session)
+    await db.commit()
+    get_session_windows().discard(session_id)
+    return MessageResponse(message="Chat session deleted")
+
+
+@router.get("/sessions/{session_id}/messages", response_model=ChatHistoryPage)
+async def list_chat_session_messages(
+    user_id: str,
+    session_id: int,
+    cursor: str | None = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(50, ge=1, le=200),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Return a session's messages, newest first (keyset paginated)."""
+    session = await _get_owned_session(db, user_id, session_id)
+    stmt = seek_newest_first(
+        select(ChatMessage).where(ChatMessage.session_id == session.id),
+        ChatMessage.timestamp, ChatMessage.id, cursor, limit,
+    )
+    rows = (await db.scalars(stmt)).all()
+    messages, next_cursor = next_page_cursor(rows, limit, "timestamp")
+    return ChatHistoryPage(messages=messages, next_cursor=next_cursor)
+
+
+@router.post("/sessions/{session_id}/messages", response_model=ChatTurnResponse)
+async def send_chat_message(
+    user_id: str,
+    session_id: int,
+    body: ChatTurnRequest,
+    request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """Answer a new message in a chat session.
+
+    The client sends only the new message; the server adds the session's
+    rolling summary and recent turns as context, capped at
+    ``CHAT_CONTEXT_MAX_TOKENS``. For an active session those come from the
+    in-memory window, and both messages are persisted through the
+    write-behind queue, so the turn itself needs no database round trip.
+    Folding older turns into the summary happens after the response is sent.
+    """
+    try:
+        validate_user_id(user_id)
+    except InvalidUserId:
+        raise HTTPException(status_code=400, detail="Invalid user id")
+    ip = enforce_rate_limit(request)
+    deadline = request_deadline(request)
+
+    windows = get_session_windows()
+    window = await windows.get(db, user_id, session_id)
+    reply = await generate_response(
+        body.content,
+        ip,
+        context=window.context(),
+        user_key=fairness_key(request, user_id),
+        deadline=deadline,
+    )
+    stored_reply = json.dumps(answer_content(reply), ensure_ascii=False, separators=(",", ":"))
+
+    if not record_chat_turn(user_id, body.content, reply, session_id=session_id):
+        # write-behind disabled: persist synchronously
+        user_pk = await get_user_pk(db, user_id)
+        now = datetime.utcnow()
+        db.add_all([
+            ChatMessage(user_id=user_pk, session_id=session_id, role="user", content=body.content, timestamp=now),
+            ChatMessage(
+                user_id=user_pk, session_id=session_id, role="assistant",
+                content=stored_reply,
+                cached=bool(reply.get("cached")),
+                generation_time_ms=int(reply.get("generation_time_ms") or 0),
+                timestamp=now,
+            ),
+        ])
+        await db.execute(update(ChatSession).where(ChatSession.id == session_id).values(updated_at=now))
+        await db.commit()
+
+    if windows.append(window, [render_turn("user", body.content), render_turn("assistant", stored_reply)]):
+        background_tasks.add_task(windows.refresh_summary, window)
+    return ChatTurnResponse(session_id=session_id, reply=reply)
@@ -1,73 +1,198 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 from fastapi.responses import JSONResponse
 import json
+import os
 from pathlib import Path
+from typing import Any, List, Optional
 import logging
 
-import importlib
-
-_md_mod = importlib.util.find_spec("markdown")
-if _md_mod:
-    markdown = importlib.import_module("markdown")
-    _has_markdown = True
-else:
-    markdown = None
-    _has_markdown = False
+from ..services.catalog_bundle import (
+    BundleLoader,
+    content_digest,
+    list_item,
+    render_entry,
+    render_payloads,
+)
+from ..services.catalog_index import SORT_FIELDS, CatalogIndex
+from ..services.catalog_sync import CatalogDelta, load_changelog, payload_hashes, record_version
+from ..utils.pagination import decode_cursor, encode_cursor
+from ..utils.lazy_imports import optional_module
+from ..utils.serialization import dumps
 
 router = APIRouter(prefix="/api/roadmaps", tags=["roadmaps"])
 
 DATA_DIR = Path(__file__).resolve().parents[1].parent / "data"
 DOCS_DIR = Path(__file__).resolve().parents[1].parent / "docs" / "roadmaps"
 
+# Compiled catalog bundle (see scripts/build_catalog_bundle.py). When present it
+# is mmapped and served directly; otherwise we fall back to roadmaps.json.
+CATALOG_BUNDLE = Path(os.getenv("CATALOG_BUNDLE", str(DATA_DIR / "catalog.bundle")))
+CATALOG_BUNDLE_CHECK_INTERVAL = float(os.getenv("CATALOG_BUNDLE_CHECK_INTERVAL", "5"))
+
 _logger = logging.getLogger(__name__)
 
-# Load metadata once at startup
-_metadata = []
-try:
-    with open(DATA_DIR / "roadmaps.json", "r", encoding="utf-8") as f:
-        _metadata = json.load(f)
-except Exception as e:
-    _logger.warning("Failed to load roadmaps metadata: %s", e)
-    _metadata = []
+_bundle_loader = BundleLoader(CATALOG_BUNDLE, CATALOG_BUNDLE_CHECK_INTERVAL)
+
+# Metadata is only parsed when no bundle is available
+_metadata = None
+
+# (bundle identity or None, delta) for the catalog currently served
+_delta = None
+
+# (catalog version, index) kept up to date from sync deltas
+_index = None
+
+
+def _get_metadata() -> list:
+    global _metadata
+    if _metadata is None:
+        try:
+            with open(DATA_DIR / "roadmaps.json", "r", encoding="utf-8") as f:
+                _metadata = json.load(f)
+        except Exception as e:
+            _logger.warning("Failed to load roadmaps metadata: %s", e)
+            _metadata = []
+    return _metadata
+
+
+def _markdown_renderer():
+    """``markdown.markdown`` if installed, imported on first use (only needed without a bundle)."""
+    markdown = optional_module("markdown")
+    return markdown.markdown if markdown is not None else None
+
+
+def _get_delta(bundle) -> CatalogDelta:
+    global _delta
+    identity = bundle.identity if bundle is not None else None
+    if _delta is None or _delta[0] != identity:
+        if bundle is not None:
+            delta = CatalogDelta(bundle.changelog(), json.loads(bundle.list_bytes()))
+        else:
+            # No build step ran: version the live files against the committed changelog
+            metadata = _get_metadata()
+            hashes = payload_hashes(render_payloads(metadata, DOCS_DIR, _markdown_renderer()))
+            changelog = record_version(load_changelog(DATA_DIR / "catalog_changelog.json"), hashes)
+            delta = CatalogDelta(changelog, metadata)
+        _delta = (identity, delta)
+    return _delta[1]
+
+
+def _get_index(bundle) -> CatalogIndex:
+    global _index
+    delta = _get_delta(bundle)
+    if _index is None:
+        _index = (delta.version, CatalogIndex(delta.items()))
+    elif _index[0] != delta.version:
+        changes = delta.delta(_index[0])
+        index = _index[1]
+        if changes["full"]:
+            index = CatalogIndex(delta.items())
+        else:
+            for entry in changes["added"] + changes["changed"]:
+                index.upsert({k: v for k, v in entry.items() if k != "hash"})
+            for ident in changes["removed"]:
+                index.remove(ident)
+        _index = (delta.version, index)
+    return _index[1]
+
+
+def _detail_response(request: Request, body: bytes, digest: bytes) -> Response:
+    etag = f'"{digest.hex()}"'
+    headers = {"ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
+
 
 @router.get("/", response_class=JSONResponse)
 async def list_roadmaps():
+    bundle = _bundle_loader.get()
+    if bundle is not None:
+        return Response(bundle.list_bytes(), media_type="application/json")
+
     # return metadata without the doc path
-    return [
-        {k: v for k, v in item.items() if k != "doc"}
-        for item in _metadata
-    ]
+    return [list_item(item) for item in _get_metadata()]
+
+
+def _valid_sort_key(key: Any, sort: str) -> bool:
+    """Whether ``key`` has the shape of a ``catalog_index.sort_key`` for ``sort``."""
+    if not isinstance(key, list) or len(key) != 2 or not isinstance(key[1], str):
+        return False
+    if sort == "level":
+        # level sorts by rank; bool is an int subclass but never a rank
+        return isinstance(key[0], int) and not isinstance(key[0], bool)
+    return isinstance(key[0], str)
+
+
+@router.get("/browse")
+async def browse_roadmaps(
+    tags: Optional[List[str]] = Query(None),
+    level: Optional[List[str]] = Query(None),
+    source: Optional[List[str]] = Query(None),
+    sort: str = Query("title", pattern=f"^({'|'.join(SORT_FIELDS)})$"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Cursor-paginated catalog listing with facet filters and counts.
+
+    Values within one filter are OR-ed, different filters are AND-ed. Facet
+    counts cover the whole catalog and are maintained incrementally.
+    """
+    index = _get_index(_bundle_loader.get())
+    descending = order == "desc"
+
+    after = None
+    state = decode_cursor(cursor)
+    if state is not None:
+        if not isinstance(state, dict) or state.get("sort") != sort or state.get("desc") != descending:
+            raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+        after = state.get("after")
+        if not _valid_sort_key(after, sort):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    items, next_key, total = index.query(
+        filters={"tags": tags, "level": level, "source": source},
+        sort=sort,
+        descending=descending,
+        after=after,
+        limit=limit,
+    )
+    next_cursor = None
+    if next_key is not None:
+        next_cursor = encode_cursor({"sort": sort, "desc": descending, "after": next_key})
+
+    return {
+        "items": items,
+        "next_cursor": next_cursor,
+        "total": total,
+        "facets": index.facet_counts(),
+    }
+
+
+@router.get("/sync")
+async def sync_roadmaps(since: Optional[int] = Query(None, ge=0)):
+    """Return catalog entries added, changed or removed since a catalog version.
+
+    Clients store the returned ``version`` and pass it back as ``since``; a
+    ``full`` response means the client should replace its copy entirely.
+    """
+    delta = _get_delta(_bundle_loader.get())
+    return Response(delta.delta_bytes(since), media_type="application/json")
+
 
 @router.get("/{roadmap_id}")
-async def get_roadmap(roadmap_id: str):
-    item = next((r for r in _metadata if r.get("id") == roadmap_id or r.get("slug") == roadmap_id), None)
+async def get_roadmap(roadmap_id: str, request: Request):
+    bundle = _bundle_loader.get()
+    if bundle is not None:
+        body = bundle.detail_bytes(roadmap_id)
+        if body is None:
+            raise HTTPException(status_code=404, detail="Roadmap not found")
+        return _detail_response(request, body, bundle.digest(roadmap_id))
+
+    item = next((r for r in _get_metadata() if r.get("id") == roadmap_id or r.get("slug") == roadmap_id), None)
     if not item:
         raise HTTPException(status_code=404, detail="Roadmap not found")
 
-    doc_path = item.get("doc") or f"{roadmap_id}.md"
-    # doc_path in metadata is relative to the backend docs folder (e.g. docs/roadmaps/frontend.md)
-    # normalize
-    doc_file = DOCS_DIR / Path(doc_path).name
-
-    content = ""
-    html = ""
-    if doc_file.exists():
-        try:
-            content = doc_file.read_text(encoding="utf-8")
-            if _has_markdown:
-                html = markdown.markdown(content)
-        except Exception as e:
-            _logger.exception("Failed to read roadmap doc %s: %s", doc_file, e)
-    else:
-        _logger.warning("Roadmap doc not found: %s", doc_file)
-
-    response = {
-        "id": item.get("id"),
-        "title": item.get("title"),
-        "slug": item.get("slug"),
-        "summary": item.get("summary"),
-        "source": item.get("source"),
-        "doc": content,
-        "html": html,
-    }
-    return JSONResponse(response)
+    body = dumps(render_entry(item, DOCS_DIR, _markdown_renderer()))
+    return _detail_response(request, body, content_digest(body))
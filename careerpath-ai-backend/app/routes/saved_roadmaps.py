@@ -0,0 +1,127 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+import logging
+
+from ..database import get_async_db
+from ..models import Roadmap
+from ..schemas import MessageResponse, RoadmapCreate, RoadmapListPage, RoadmapResponse, RoadmapUpdate
+from ..services.payload_store import career_data_for, put_payload, release_payload
+from ..services.user_lookup import get_user_pk
+from ..utils.pagination import next_page_cursor, seek_newest_first
+from ..utils.utils import authorize_user
+
+router = APIRouter(
+    prefix="/api/users/{user_id}/roadmaps", tags=["saved-roadmaps"], dependencies=[Depends(authorize_user)]
+)
+_logger = logging.getLogger(__name__)
+
+# Columns needed by RoadmapListResponse. Lists select only these, so the
+# career_data JSON (and prompt text) is never read or decoded for a list page.
+LIST_COLUMNS = (
+    Roadmap.id,
+    Roadmap.title,
+    Roadmap.career_type,
+    Roadmap.is_favorite,
+    Roadmap.created_at,
+)
+
+
+def list_query(user_pk: int, cursor: str | None = None, limit: int = 20, favorites: bool = False):
+    """Build the projected, keyset-paginated list query for one user's roadmaps."""
+    stmt = select(*LIST_COLUMNS).where(Roadmap.user_id == user_pk)
+    if favorites:
+        stmt = stmt.where(Roadmap.is_favorite.is_(True))
+    return seek_newest_first(stmt, Roadmap.created_at, Roadmap.id, cursor, limit)
+
+
+async def _get_owned_roadmap(db: AsyncSession, user_id: str, roadmap_id: int) -> Roadmap:
+    user_pk = await get_user_pk(db, user_id)
+    roadmap = None
+    if user_pk is not None:
+        roadmap = await db.scalar(
+            select(Roadmap).where(Roadmap.id == roadmap_id, Roadmap.user_id == user_pk)
+        )
+    if roadmap is None:
+        raise HTTPException(status_code=404, detail="Roadmap not found")
+    return roadmap
+
+
+@router.get("", response_model=RoadmapListPage)
+async def list_saved_roadmaps(
+    user_id: str,
+    cursor: str | None = Query(None, description="Cursor from the previous page"),
+    limit: int = Query(20, ge=1, le=100),
+    favorites: bool = Query(False, description="Only favorite roadmaps"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """List a user's saved roadmaps, newest first.
+
+    Uses keyset pagination on ``(created_at, id)``: every page is an index
+    seek plus ``limit`` rows, however deep the cursor is. Only the list
+    columns are selected; fetch ``/{roadmap_id}`` for the full roadmap.
+    """
+    user_pk = await get_user_pk(db, user_id)
+    if user_pk is None:
+        return RoadmapListPage(items=[], next_cursor=None)
+
+    rows = (await db.execute(list_query(user_pk, cursor, limit, favorites))).all()
+    items, next_cursor = next_page_cursor(rows, limit, "created_at")
+    return RoadmapListPage(items=items, next_cursor=next_cursor)
+
+
+async def _detail(db: AsyncSession, roadmap: Roadmap) -> RoadmapResponse:
+    return RoadmapResponse(
+        id=roadmap.id,
+        user_id=roadmap.user_id,
+        title=roadmap.title,
+        career_type=roadmap.career_type,
+        prompt=roadmap.prompt,
+        career_data=await career_data_for(db, roadmap),
+        is_favorite=roadmap.is_favorite,
+        created_at=roadmap.created_at,
+        updated_at=roadmap.updated_at,
+    )
+
+
+@router.post("", response_model=RoadmapResponse, status_code=201)
+async def save_roadmap(user_id: str, body: RoadmapCreate, db: AsyncSession = Depends(get_async_db)):
+    """Save a generated roadmap for the user.
+
+    ``career_data`` goes to the content-addressed payload table, so saving
+    a roadmap someone already saved only adds a reference.
+    """
+    user_pk = await get_user_pk(db, user_id, create=True)
+    payload_hash = await put_payload(db, body.career_data)
+    roadmap = Roadmap(user_id=user_pk, payload_hash=payload_hash, **body.model_dump(exclude={"career_data"}))
+    db.add(roadmap)
+    await db.commit()
+    await db.refresh(roadmap)
+    return await _detail(db, roadmap)
+
+
+@router.get("/{roadmap_id}", response_model=RoadmapResponse)
+async def get_saved_roadmap(user_id: str, roadmap_id: int, db: AsyncSession = Depends(get_async_db)):
+    return await _detail(db, await _get_owned_roadmap(db, user_id, roadmap_id))
+
+
+@router.patch("/{roadmap_id}", response_model=RoadmapResponse)
+async def update_saved_roadmap(
+    user_id: str, roadmap_id: int, body: RoadmapUpdate, db: AsyncSession = Depends(get_async_db)
+):
+    roadmap = await _get_owned_roadmap(db, user_id, roadmap_id)
+    for field, value in body.model_dump(exclude_unset=True).items():
+        setattr(roadmap, field, value)
+    await db.commit()
+    await db.refresh(roadmap)
+    return await _detail(db, roadmap)
+
+
+@router.delete("/{roadmap_id}", response_model=MessageResponse)
+async def delete_saved_roadmap(user_id: str, roadmap_id: int, db: AsyncSession = Depends(get_async_db)):
+    roadmap = await _get_owned_roadmap(db, user_id, roadmap_id)
+    await db.delete(roadmap)
+    await db.flush()  # the row must be gone before its payload can be
+    await release_payload(db, roadmap.payload_hash)
+    await db.commit()
+    return MessageResponse(message="Roadmap deleted")
@@ -1,14 +1,23 @@
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel
-from pathlib import Path
-import json
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Optional
+import hmac
 import logging
+import os
+
+from ..services.profile_cache import get_profile_cache
+from ..services.profile_store import InvalidUserId, get_profile_store, validate_user_id
+from ..utils.serialization import dumps
+from ..utils.utils import authorize_user
 
 router = APIRouter(prefix="/api/users", tags=["users"])
 _logger = logging.getLogger(__name__)
-DATA_DIR = Path(__file__).resolve().parents[1].parent / "data" / "users"
-DATA_DIR.mkdir(parents=True, exist_ok=True)
+
+BATCH_GET_MAX = int(os.getenv("PROFILE_BATCH_GET_MAX", "1000"))
+EXPORT_CHUNK_BYTES = 64 * 1024
+# Bulk endpoints (batch-get, export) require a matching X-Admin-Token header; unset disables them
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN")
 
 class UserProfile(BaseModel):
     fullName: str | None = None
@@ -19,31 +28,134 @@ class UserProfile(BaseModel):
     joined: str | None = None
 
 
-def _user_file(user_id: str) -> Path:
-    return DATA_DIR / f"{user_id}.json"
+class BatchGetRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=BATCH_GET_MAX)
+
+
+def _require_admin_token(x_admin_token: Optional[str] = Header(None)):
+    # fail closed: without a configured token nobody may read profiles in bulk
+    if not ADMIN_API_TOKEN or not x_admin_token or not hmac.compare_digest(
+        x_admin_token.encode("utf-8"), ADMIN_API_TOKEN.encode("utf-8")
+    ):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.post("/batch-get", dependencies=[Depends(_require_admin_token)])
+async def batch_get_profiles(body: BatchGetRequest):
+    """Return profiles for many users in one round trip, in request order.
+
+    Each entry has the same shape as ``GET /api/users/{user_id}``.
+    """
+    user_ids = list(dict.fromkeys(body.ids))
+    try:
+        for user_id in user_ids:
+            validate_user_id(user_id)
+    except InvalidUserId:
+        raise HTTPException(status_code=400, detail="Invalid user id")
+
+    cache = get_profile_cache()
+    bodies = {}
+    versions = {}
+    for user_id in user_ids:
+        cached = cache.get(user_id) if cache is not None else None
+        if cached is not None:
+            bodies[user_id] = cached
+        elif cache is not None:
+            versions[user_id] = cache.version(user_id)
+
+    misses = [u for u in user_ids if u not in bodies]
+    if misses:
+        try:
+            found = await get_profile_store().aget_many(misses)
+        except Exception as e:
+            _logger.exception("Failed to batch read %d user profiles: %s", len(misses), e)
+            raise HTTPException(status_code=500, detail="Failed to read user profiles")
+        for user_id in misses:
+            bodies[user_id] = dumps({"userId": user_id, "profile": found.get(user_id) or {}})
+            if cache is not None:
+                cache.fill(user_id, bodies[user_id], versions[user_id])
+
+    # entries are already serialized; splice them into the envelope
+    payload = b'{"profiles":[' + b",".join(bodies[u] for u in user_ids) + b"]}"
+    return Response(payload, media_type="application/json")
 
 
-@router.get("/{user_id}")
+def _export_lines():
+    """Yield every stored profile as NDJSON, batched into ~64KB chunks."""
+    chunk = []
+    size = 0
+    for user_id, profile in get_profile_store().iter_profiles():
+        line = dumps({"userId": user_id, "profile": profile}) + b"\n"
+        chunk.append(line)
+        size += len(line)
+        if size >= EXPORT_CHUNK_BYTES:
+            yield b"".join(chunk)
+            chunk = []
+            size = 0
+    if chunk:
+        yield b"".join(chunk)
+
+
+@router.get("/export", dependencies=[Depends(_require_admin_token)])
+async def export_profiles():
+    """Stream all profiles as NDJSON (one ``{"userId", "profile"}`` object per line).
+
+    The store is iterated lazily in the threadpool and each chunk is only
+    produced once the previous one was sent, so memory stays constant and a
+    slow client slows the export down instead of buffering it.
+    """
+    return StreamingResponse(
+        _export_lines(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="profiles.ndjson"'},
+    )
+
+
+@router.get("/cache/stats")
+async def get_profile_cache_stats():
+    """Profile cache hit rate, staleness and eviction counters for this worker."""
+    cache = get_profile_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/{user_id}", dependencies=[Depends(authorize_user)])
 async def get_user_profile(user_id: str):
-    f = _user_file(user_id)
-    if not f.exists():
-        # return empty profile
-        return JSONResponse({"userId": user_id, "profile": {}})
+    cache = get_profile_cache()
+    if cache is not None:
+        body = cache.get(user_id)
+        if body is not None:
+            return Response(body, media_type="application/json")
+        version = cache.version(user_id)
+
     try:
-        data = json.loads(f.read_text(encoding="utf-8"))
-        return JSONResponse({"userId": user_id, "profile": data})
+        data = await get_profile_store().aget(user_id)
+    except InvalidUserId:
+        raise HTTPException(status_code=400, detail="Invalid user id")
     except Exception as e:
         _logger.exception("Failed to read user profile %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Failed to read user profile")
 
+    # return empty profile when none is stored
+    body = dumps({"userId": user_id, "profile": data or {}})
+    if cache is not None:
+        cache.fill(user_id, body, version)
+    return Response(body, media_type="application/json")
 
-@router.put("/{user_id}")
+
+@router.put("/{user_id}", dependencies=[Depends(authorize_user)])
 async def put_user_profile(user_id: str, profile: UserProfile):
-    f = _user_file(user_id)
     try:
         data = profile.dict()
-        f.write_text(json.dumps(data, indent=2), encoding="utf-8")
-        return JSONResponse({"userId": user_id, "profile": data})
+        await get_profile_store().aput(user_id, data)
+    except InvalidUserId:
+        raise HTTPException(status_code=400, detail="Invalid user id")
     except Exception as e:
         _logger.exception("Failed to write user profile %s: %s", user_id, e)
         raise HTTPException(status_code=500, detail="Failed to write user profile")
+
+    cache = get_profile_cache()
+    if cache is not None:
+        cache.invalidate(user_id)
+    return Response(dumps({"userId": user_id, "profile": data}), media_type="application/json")
@@ -11,12 +11,24 @@ from .schemas import (
     RoadmapUpdate,
     RoadmapResponse,
     RoadmapListResponse,
+    RoadmapListPage,
     
     # Chat schemas
     ChatMessageBase,
     ChatMessageCreate,
     ChatMessageResponse,
     ChatHistoryResponse,
+    ChatHistoryPage,
+    
+    # Chat session schemas
+    ChatSessionCreate,
+    ChatSessionResponse,
+    ChatSessionListPage,
+    ChatTurnRequest,
+    ChatTurnResponse,
+    
+    # AI schemas
+    AIResponse,
     
     # Generic schemas
     MessageResponse,
@@ -25,7 +37,9 @@ from .schemas import (
 
 __all__ = [
     "UserBase", "UserCreate", "UserUpdate", "UserResponse",
-    "RoadmapBase", "RoadmapCreate", "RoadmapUpdate", "RoadmapResponse", "RoadmapListResponse",
-    "ChatMessageBase", "ChatMessageCreate", "ChatMessageResponse", "ChatHistoryResponse",
+    "RoadmapBase", "RoadmapCreate", "RoadmapUpdate", "RoadmapResponse", "RoadmapListResponse", "RoadmapListPage",
+    "ChatMessageBase", "ChatMessageCreate", "ChatMessageResponse", "ChatHistoryResponse", "ChatHistoryPage",
+    "ChatSessionCreate", "ChatSessionResponse", "ChatSessionListPage", "ChatTurnRequest", "ChatTurnResponse",
+    "AIResponse",
     "MessageResponse", "ErrorResponse",
 ]
@@ -84,6 +84,12 @@ class RoadmapListResponse(BaseModel):
         from_attributes = True
 
 
+class RoadmapListPage(BaseModel):
+    """One page of a user's saved roadmaps, newest first"""
+    items: List[RoadmapListResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
 # ============ Chat Message Schemas ============
 
 class ChatMessageBase(BaseModel):
@@ -116,6 +122,62 @@ class ChatHistoryResponse(BaseModel):
     total: int
 
 
+class ChatHistoryPage(BaseModel):
+    """One page of a user's chat history, newest first"""
+    messages: List[ChatMessageResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch older messages")
+
+
+# ============ Chat Session Schemas ============
+
+class ChatSessionCreate(BaseModel):
+    """Schema for starting a chat session"""
+    title: Optional[str] = Field(None, max_length=200)
+
+
+class ChatSessionResponse(BaseModel):
+    """Schema for chat session responses"""
+    id: int
+    title: str
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ChatSessionListPage(BaseModel):
+    """One page of a user's chat sessions, most recently active first"""
+    sessions: List[ChatSessionResponse]
+    next_cursor: Optional[str] = Field(None, description="Pass as `cursor` to fetch the next page")
+
+
+class ChatTurnRequest(BaseModel):
+    """A new user message in a chat session; earlier turns are kept server-side"""
+    content: str = Field(..., min_length=1, max_length=2000)
+
+
+class ChatTurnResponse(BaseModel):
+    """The assistant's answer to a chat turn"""
+    session_id: int
+    reply: Dict[str, Any] = Field(..., description="AIResponse-shaped answer")
+
+
+# ============ AI Schemas ============
+
+class AIResponse(BaseModel):
+    """A generated (or curated) career answer"""
+    title: str
+    explanation: str
+    average_salary: str
+    job_openings: str
+    youtube_video_recommendation: str
+    learning_resources: List[Dict[str, str]]
+    cached: bool = False
+    generation_time_ms: Optional[float] = None
+    source: str = "model"  # "model", "curated" or "fallback"
+
+
 # ============ Generic Response Schemas ============
 
 class MessageResponse(BaseModel):
@@ -0,0 +1,295 @@
+"""
+Deadline-aware admission control in front of AI generation.
+
+Model calls run in the threadpool, at most ``ADMISSION_MAX_CONCURRENCY``
+answers at a time per worker (in ``AI_GENERATION_MODE=decomposed`` each
+answer makes one call per part, so three times as many model calls). Requests beyond that wait in a queue that is fair per
+user: each user has their own FIFO and slots are handed out round-robin
+across users, so one heavy user only delays their own requests. Users are
+keyed by ``fairness_key``: the verified Clerk id, else the client address
+as recorded by the proxy in front, never a value the client picks.
+
+Every request carries a deadline (``request_deadline``). The controller
+keeps a moving average of generation time and sheds work that can no
+longer finish in time instead of letting it time out in the queue:
+
+- ``queue_full`` / ``user_queue_full``: the queue (or the user's share of
+  it) is full on arrival.
+- ``deadline``: the predicted queue wait plus generation time already
+  overshoots the deadline on arrival.
+- ``expired``: the request waited in the queue until it could no longer
+  finish in time.
+
+A shed request raises ``Overloaded``; the caller answers it from a cheaper
+path or rejects it (see ``routes/ai.py``). ``stats()`` exports shed counts,
+queue depth and queue wait percentiles.
+
+The controller lives on the event loop thread and needs no locks.
+"""
+import asyncio
+import ipaddress
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Optional
+
+from fastapi import Request
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+ADMISSION_MAX_CONCURRENCY = int(os.getenv("ADMISSION_MAX_CONCURRENCY", "8"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+ADMISSION_MAX_QUEUED_PER_USER = int(os.getenv("ADMISSION_MAX_QUEUED_PER_USER", "4"))
+# Longest a generation request may take end to end; clients can ask for less
+AI_REQUEST_DEADLINE = float(os.getenv("AI_REQUEST_DEADLINE", "30"))  # seconds
+DEADLINE_HEADER = "x-deadline-ms"
+
+_EWMA_ALPHA = 0.2
+_WAIT_SAMPLES = 1024
+
+
+class Overloaded(Exception):
+    """Raised when a request is shed instead of admitted."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(f"Generation shed: {reason}")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass
+class _Waiter:
+    key: str
+    deadline: float
+    enqueued_at: float
+    future: asyncio.Future
+
+
+def request_deadline(request: Request, now: Optional[float] = None) -> float:
+    """Monotonic deadline for a request: ``AI_REQUEST_DEADLINE`` or the client's shorter ``X-Deadline-Ms``."""
+    now = time.monotonic() if now is None else now
+    budget = AI_REQUEST_DEADLINE
+    header = request.headers.get(DEADLINE_HEADER)
+    if header:
+        try:
+            budget = min(budget, max(0.0, float(header) / 1000))
+        except ValueError:
+            pass
+    return now + budget
+
+
+def _client_address(request: Request) -> str:
+    """The caller's address, as seen by the proxy in front of us if there is one.
+
+    When the server resolves the proxy itself (``FORWARDED_ALLOW_IPS``),
+    ``request.client`` already is the caller. Otherwise a connection from a
+    private address is a platform proxy (Render's, say), and the last
+    ``X-Forwarded-For`` entry is the address that proxy saw; earlier entries
+    are whatever the client sent, so they are never used.
+    """
+    host = request.client.host if request.client else "unknown"
+    forwarded = request.headers.get("x-forwarded-for")
+    if not forwarded:
+        return host
+    try:
+        behind_proxy = ipaddress.ip_address(host).is_private
+    except ValueError:
+        return host
+    if not behind_proxy:
+        return host
+    return forwarded.rsplit(",", 1)[-1].strip() or host
+
+
+def fairness_key(request: Request, verified_user: Optional[str] = None) -> str:
+    """Queue key for a request: the authenticated user, else the caller's address.
+
+    Only pass a user id that was verified against a session token; headers
+    and path parameters can be set to anything, and a new value per request
+    would dodge ``ADMISSION_MAX_QUEUED_PER_USER``. For the same reason the
+    address is the one the nearest proxy recorded (see ``_client_address``),
+    not the first ``X-Forwarded-For`` entry.
+    """
+    if verified_user:
+        return f"user:{verified_user}"
+    return f"ip:{_client_address(request)}"
+
+
+class AdmissionController:
+    """Bounded concurrency with a per-user fair, deadline-aware queue."""
+
+    def __init__(
+        self,
+        max_concurrency: int = ADMISSION_MAX_CONCURRENCY,
+        max_queue: int = ADMISSION_MAX_QUEUE,
+        max_queued_per_user: int = ADMISSION_MAX_QUEUED_PER_USER,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_queued_per_user = max_queued_per_user
+        self._active = 0
+        self._queued = 0
+        # user -> their waiters; the first user is served next
+        self._queues: "OrderedDict[str, Deque[_Waiter]]" = OrderedDict()
+        self._service_time: Optional[float] = None  # EWMA, seconds
+        self._waits: Deque[float] = deque(maxlen=_WAIT_SAMPLES)
+        self._stats = {"admitted": 0, "queued": 0, "completed": 0, "failed": 0}
+        self._shed = {"queue_full": 0, "user_queue_full": 0, "deadline": 0, "expired": 0}
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def _expected_wait(self, ahead: int) -> float:
+        service = self._service_time or 0.0
+        return math.ceil((ahead + 1) / self.max_concurrency) * service
+
+    def _reject(self, reason: str, retry_after: Optional[float] = None) -> Overloaded:
+        self._shed[reason] += 1
+        if retry_after is None:
+            retry_after = self._expected_wait(self._queued)
+        return Overloaded(reason, max(1.0, retry_after))
+
+    async def run(self, key: str, deadline: float, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Run ``fn(*args, **kwargs)`` in the threadpool once admitted.
+
+        Raises:
+            Overloaded: If the request was shed
+        """
+        now = time.monotonic()
+        if self._active < self.max_concurrency and not self._queued:
+            self._active += 1
+            wait = 0.0
+        else:
+            await self._wait(key, deadline, now)
+            wait = time.monotonic() - now
+        self._stats["admitted"] += 1
+        self._waits.append(wait)
+        self._wait_total += wait
+        self._wait_max = max(self._wait_max, wait)
+
+        start = time.monotonic()
+        try:
+            result = await run_in_threadpool(fn, *args, **kwargs)
+            self._stats["completed"] += 1
+            return result
+        except BaseException:
+            self._stats["failed"] += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            if self._service_time is None:
+                self._service_time = elapsed
+            else:
+                self._service_time += _EWMA_ALPHA * (elapsed - self._service_time)
+            self._active -= 1
+            self._dispatch()
+
+    async def _wait(self, key: str, deadline: float, now: float) -> None:
+        if self._queued >= self.max_queue:
+            raise self._reject("queue_full")
+        queue = self._queues.get(key)
+        if queue is not None and len(queue) >= self.max_queued_per_user:
+            raise self._reject("user_queue_full")
+        service = self._service_time or 0.0
+        expected_wait = self._expected_wait(self._queued)
+        if now + expected_wait + service > deadline:
+            raise self._reject("deadline", expected_wait)
+
+        waiter = _Waiter(key, deadline, now, asyncio.get_running_loop().create_future())
+        if queue is None:
+            queue = self._queues[key] = deque()
+        queue.append(waiter)
+        self._queued += 1
+        self._stats["queued"] += 1
+        try:
+            # give up once the request could no longer finish in time
+            await asyncio.wait({waiter.future}, timeout=max(0.0, deadline - service - now))
+        except BaseException:
+            # cancelled (client went away): hand back a slot granted meanwhile
+            if self._abandon(waiter):
+                self._active -= 1
+                self._dispatch()
+            raise
+        if not waiter.future.done():
+            self._abandon(waiter)
+            raise self._reject("expired")
+        waiter.future.result()  # raises Overloaded if the dispatcher dropped it
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Take ``waiter`` out of the queue; True if it had already been granted a slot."""
+        if waiter.future.done():
+            return not waiter.future.cancelled() and waiter.future.exception() is None
+        waiter.future.cancel()
+        queue = self._queues.get(waiter.key)
+        if queue is not None:
+            try:
+                queue.remove(waiter)
+                self._queued -= 1
+            except ValueError:
+                pass
+            if not queue:
+                del self._queues[waiter.key]
+        return False
+
+    def _dispatch(self) -> None:
+        """Hand free slots to queued requests, round-robin across users."""
+        now = time.monotonic()
+        service = self._service_time or 0.0
+        while self._active < self.max_concurrency and self._queues:
+            key, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            self._queued -= 1
+            if queue:
+                self._queues.move_to_end(key)
+            else:
+                del self._queues[key]
+            if waiter.future.done():
+                continue
+            if now + service > waiter.deadline:
+                waiter.future.set_exception(self._reject("expired"))
+                continue
+            self._active += 1
+            waiter.future.set_result(None)
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+        admitted = self._stats["admitted"]
+
+        def percentile(p: float) -> float:
+            return round(waits[min(len(waits) - 1, int(len(waits) * p))] * 1000, 2) if waits else 0.0
+
+        return {
+            **self._stats,
+            "active": self._active,
+            "queue_depth": self._queued,
+            "queued_users": len(self._queues),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "shed": dict(self._shed),
+            "shed_total": sum(self._shed.values()),
+            "service_time_ms": round(self._service_time * 1000, 2) if self._service_time is not None else None,
+            "queue_wait_ms": {
+                "avg": round(self._wait_total / admitted * 1000, 2) if admitted else 0.0,
+                "p50": percentile(0.5),
+                "p95": percentile(0.95),
+                "p99": percentile(0.99),
+                "max": round(self._wait_max * 1000, 2),
+            },
+        }
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide admission controller."""
+    global _controller
+    if _controller is None:
+        with _controller_lock:
+            if _controller is None:
+                _controller = AdmissionController()
+    return _controller
@@ -3,48 +3,49 @@ import logging
 import os
 import json
 import ast
+import copy
 import threading
-from typing import Dict, Any, List, Optional
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple
 from functools import lru_cache
 
+from .answer_normalizer import normalize_answer, snake_key
+from .genai_client import genai_client_stats, get_genai_client
+
 logger = logging.getLogger(__name__)
 
 # Configure via env vars for Gemini (Google GenAI)
 GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 MAX_PROMPT_LENGTH = int(os.getenv("MAX_PROMPT_LENGTH", "2000"))
-
-# Thread-local storage for client instances
-_thread_local = threading.local()
+# gemini, or stub for an offline stand-in (see ai_stub.py)
+AI_BACKEND = os.getenv("AI_BACKEND", "gemini")
+# monolithic: one call per answer; decomposed: concurrent calls per part.
+# Admission control counts answers, not calls: in decomposed mode up to
+# len(GENERATION_PARTS) (3) times ADMISSION_MAX_CONCURRENCY model calls run at
+# once per worker, so size the model quota (and ADMISSION_MAX_CONCURRENCY) for that
+AI_GENERATION_MODE = os.getenv("AI_GENERATION_MODE", "monolithic")
+# threads for the parts beyond the first, which runs on the admitted thread
+AI_PART_WORKERS = int(os.getenv("AI_PART_WORKERS", "16"))
+AI_PART_CACHE_SIZE = int(os.getenv("AI_PART_CACHE_SIZE", "2000"))
+AI_PART_CACHE_TTL = float(os.getenv("AI_PART_CACHE_TTL", "1800"))  # seconds
+
+# Words that don't change which career a prompt is about
+_QUERY_FILLER = frozenset(
+    "a about an and are as be become becoming career careers do does for how i in into is it "
+    "me my of on path please roadmap tell the to what with".split()
+)
 
 
 def _get_client():
-    """Lazily import and return a google.genai Client instance (thread-safe).
+    """Return the process-wide google.genai Client (see genai_client.py).
 
-    This reads `GEMINI_API_KEY` at call time (not import time) so runtime
-    environment updates (e.g. on hosted services) are respected.
+    The client is shared by all threads and reuses pooled connections; it is
+    created on first use, normally by the startup warm-up.
     """
-    # Check if this thread already has a client
-    if hasattr(_thread_local, 'client') and _thread_local.client is not None:
-        return _thread_local.client
-
     try:
-        # Read the key at runtime so we don't depend on import-time envs
-        gemini_key = os.getenv("GEMINI_API_KEY")
-        if not gemini_key:
-            raise ValueError("GEMINI_API_KEY environment variable not set")
-
-        # import lazily so this module can be imported without google-genai
-        from google import genai  # type: ignore
-
-        # Try to initialize client with explicit key if supported by SDK,
-        # otherwise fall back to default constructor.
-        try:
-            _thread_local.client = genai.Client(api_key=gemini_key)  # type: ignore
-        except TypeError:
-            # Older/newer SDK variants may not accept api_key kwarg
-            _thread_local.client = genai.Client()  # type: ignore
-
-        return _thread_local.client
+        return get_genai_client().client
     except Exception as exc:
         # Avoid leaking sensitive env values in logs
         logger.error("Failed to initialize GenAI (Gemini) client: %s", str(exc))
@@ -122,23 +123,6 @@ def _extract_json_blob(text: str) -> str:
     return m.group(0) if m else text
 
 
-def _normalize_keys(d: Dict[str, Any]) -> Dict[str, Any]:
-    """Normalize dictionary keys to snake_case."""
-    def to_snake(s: str) -> str:
-        # Handle camelCase and spaces/special chars
-        s = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', s)
-        return re.sub(r"[^0-9a-zA-Z]+", "_", s.strip()).lower().strip('_')
-
-    def recurse(obj: Any) -> Any:
-        if isinstance(obj, dict):
-            return {to_snake(k): recurse(v) for k, v in obj.items()}
-        if isinstance(obj, list):
-            return [recurse(i) for i in obj]
-        return obj
-
-    return recurse(d)
-
-
 def _parse_json_safely(blob: str) -> Dict[str, Any]:
     """Attempt to parse JSON with multiple fallback strategies.
     
@@ -263,19 +247,204 @@ def _get_fallback_data(career_type: str = "Software Engineer") -> Dict[str, Any]
                 "type": "course"
             }
         ],
+        "source": "fallback",
     }
 
 
+def fallback_answer(prompt: str) -> Dict[str, Any]:
+    """Validated fallback answer for ``prompt``, named after the career it mentions if any."""
+    # Extract potential career name from prompt for better fallback
+    career_match = re.search(r'(?:career|job|role|position)[\s:]+([a-zA-Z\s]+)', prompt, re.IGNORECASE)
+    career_name = career_match.group(1).strip() if career_match else "Software Engineer"
+    return normalize_answer(_get_fallback_data(career_name))
+
+
+def _format_context(context: List[Dict[str, str]]) -> str:
+    """Render earlier conversation turns for the combined prompt."""
+    lines = []
+    for turn in context:
+        text = re.sub(r'[\x00-\x08\x0B-\x0C\x0E-\x1F\x7F]', '', turn.get("content") or "").strip()
+        if not text:
+            continue
+        if turn.get("role") == "summary":
+            lines.append(f"(Summary of earlier messages)\n{text}")
+        else:
+            lines.append(f"{turn.get('role', 'user')}: {text}")
+    return "\n".join(lines)
+
+
+_SYSTEM_HEADER = (
+    "You are a career counseling AI. Return EXACTLY one valid JSON object "
+    "(no markdown fences, no additional text) with these keys:\n"
+)
+
+# Output fields as described to the model
+_FIELD_SPECS = {
+    "title": "- title: string (career title)\n",
+    "explanation": "- explanation: string (comprehensive description, 2-3 paragraphs)\n",
+    "average_salary": "- average_salary: string (salary range with currency)\n",
+    "job_openings": "- job_openings: string (current job market status)\n",
+    "youtube_video_recommendation": "- youtube_video_recommendation: string (valid YouTube URL)\n",
+    "learning_resources": (
+        "- learning_resources: array of objects, each with:\n"
+        "  * title: string\n"
+        "  * url: string (valid URL)\n"
+        "  * type: string (one of: 'article', 'course', 'youtube', 'book')\n"
+    ),
+}
+
+# Independent parts of an answer, requested concurrently in decomposed mode
+GENERATION_PARTS = {
+    "overview": ("title", "explanation"),
+    "market": ("average_salary", "job_openings"),
+    "resources": ("youtube_video_recommendation", "learning_resources"),
+}
+
+
+def _build_prompt(fields, sanitized_prompt: str, history: str) -> str:
+    """Assemble the prompt asking for ``fields`` about the user's query."""
+    prompt = _SYSTEM_HEADER + "".join(_FIELD_SPECS[f] for f in fields)
+    prompt += "\nEnsure all URLs are valid and all fields are properly filled."
+    if history:
+        prompt += f"\n\nConversation so far:\n{history}"
+    return prompt + f"\n\nUser Query: {sanitized_prompt}"
+
+
+def _call_model(prompt: str) -> str:
+    """Send one prompt to the configured backend and return its text."""
+    if AI_BACKEND == "stub":
+        from . import ai_stub
+        return ai_stub.generate(prompt)
+    response = _get_client().models.generate_content(model=GEMINI_MODEL, contents=prompt)
+    return getattr(response, "text", None) or str(response)
+
+
+def _parse_model_output(content: str) -> Dict[str, Any]:
+    if not content:
+        raise ValueError("No content returned from model")
+    parsed = _parse_json_safely(_extract_json_blob(content))
+    if not isinstance(parsed, dict):
+        raise ValueError("Model did not return a JSON object")
+    return parsed
+
+
+class PartCache:
+    """Bounded LRU of generated answer parts, keyed by part and query signature.
+
+    Parts don't depend on the filler words of a prompt, so "data scientist
+    career" and "career as a data scientist" share cached parts. Word order
+    is kept: "from nursing to software engineering" and "from software
+    engineering to nursing" ask about different moves.
+    """
+
+    def __init__(self, max_size: int = AI_PART_CACHE_SIZE, ttl: float = AI_PART_CACHE_TTL):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {part: {"hits": 0, "misses": 0} for part in GENERATION_PARTS}
+
+    @staticmethod
+    def signature(prompt: str) -> str:
+        """The prompt's words in order, lowercased, without filler."""
+        return " ".join(w for w in re.findall(r"[a-z0-9+#]+", prompt.lower()) if w not in _QUERY_FILLER)
+
+    def get(self, part: str, signature: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((part, signature))
+            if entry is None or now - entry[0] >= self.ttl:
+                self._stats[part]["misses"] += 1
+                return None
+            self._entries.move_to_end((part, signature))
+            self._stats[part]["hits"] += 1
+            return entry[1]
+
+    def put(self, part: str, signature: str, fields: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[(part, signature)] = (time.monotonic(), fields)
+            self._entries.move_to_end((part, signature))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"size": len(self._entries), "max_size": self.max_size, "parts": copy.deepcopy(self._stats)}
+
+
+part_cache = PartCache()
+
+_part_executor: Optional[ThreadPoolExecutor] = None
+_part_executor_lock = threading.Lock()
+
+
+def _get_part_executor() -> ThreadPoolExecutor:
+    global _part_executor
+    if _part_executor is None:
+        with _part_executor_lock:
+            if _part_executor is None:
+                _part_executor = ThreadPoolExecutor(max_workers=AI_PART_WORKERS, thread_name_prefix="ai-part")
+    return _part_executor
+
+
+def _generate_part(part: str, sanitized_prompt: str, history: str, signature: Optional[str]) -> Dict[str, Any]:
+    fields = GENERATION_PARTS[part]
+    if signature is not None:
+        cached = part_cache.get(part, signature)
+        if cached is not None:
+            return cached
+    parsed = _parse_model_output(_call_model(_build_prompt(fields, sanitized_prompt, history)))
+    # models drift to averageSalary / "Job Openings"; the full-answer path
+    # normalizes those too, so a part mustn't drop them
+    parsed = {snake_key(k): v for k, v in parsed.items()}
+    result = {f: parsed[f] for f in fields if f in parsed}
+    # only complete parts are reused; a partial one fails validation below anyway
+    if signature is not None and len(result) == len(fields):
+        part_cache.put(part, signature, result)
+    return result
+
+
+def _generate_decomposed(sanitized_prompt: str, history: str) -> Dict[str, Any]:
+    """Request the independent parts concurrently and merge them.
+
+    Latency is that of the slowest part instead of the whole answer. Parts
+    are cached per query signature unless the answer depends on history.
+    """
+    signature = None if history else part_cache.signature(sanitized_prompt)
+    parts = list(GENERATION_PARTS)
+    futures = [
+        _get_part_executor().submit(_generate_part, part, sanitized_prompt, history, signature)
+        for part in parts[1:]
+    ]
+    # the calling thread generates the first part itself
+    merged = dict(_generate_part(parts[0], sanitized_prompt, history, signature))
+    for future in futures:
+        merged.update(future.result())
+    return merged
+
+
 def generate_career_path_with_ai(
-    prompt: str = "Generate a comprehensive roadmap for the selected career"
+    prompt: str = "Generate a comprehensive roadmap for the selected career",
+    context: Optional[List[Dict[str, str]]] = None,
+    mode: Optional[str] = None,
 ) -> Dict[str, Any]:
     """Generate a structured career roadmap using the Google GenAI (Gemini) API.
 
     Args:
         prompt: User's career-related query
+        context: Earlier conversation turns (``{"role", "content"}``, oldest
+            first) assembled by the server; not counted against MAX_PROMPT_LENGTH
+        mode: ``monolithic`` (one call for the whole answer) or ``decomposed``
+            (concurrent calls per part); defaults to ``AI_GENERATION_MODE``
         
     Returns:
-        Dictionary with normalized keys (snake_case) containing:
+        Validated ``AIResponse``-shaped dictionary containing:
         - title: Career title
         - explanation: Detailed description
         - average_salary: Salary range
@@ -293,102 +462,46 @@ def generate_career_path_with_ai(
     except ValueError as e:
         logger.error("Invalid prompt: %s", e)
         raise
-    
-    system_prompt = (
-        "You are a career counseling AI. Return EXACTLY one valid JSON object "
-        "(no markdown fences, no additional text) with these keys:\n"
-        "- title: string (career title)\n"
-        "- explanation: string (comprehensive description, 2-3 paragraphs)\n"
-        "- average_salary: string (salary range with currency)\n"
-        "- job_openings: string (current job market status)\n"
-        "- youtube_video_recommendation: string (valid YouTube URL)\n"
-        "- learning_resources: array of objects, each with:\n"
-        "  * title: string\n"
-        "  * url: string (valid URL)\n"
-        "  * type: string (one of: 'article', 'course', 'youtube', 'book')\n\n"
-        "Ensure all URLs are valid and all fields are properly filled."
-    )
 
+    mode = mode or AI_GENERATION_MODE
     try:
-        # Build the combined prompt
-        combined_prompt = f"{system_prompt}\n\nUser Query: {sanitized_prompt}"
-
-        # Get the client
-        try:
-            client = _get_client()
-        except Exception as e:
-            if os.getenv("AI_FALLBACK", "0") == "1":
-                logger.warning("GenAI unavailable, returning fallback: %s", e)
-                # Extract potential career name from prompt for better fallback
-                career_match = re.search(r'(?:career|job|role|position)[\s:]+([a-zA-Z\s]+)', 
-                                        sanitized_prompt, re.IGNORECASE)
-                career_name = career_match.group(1).strip() if career_match else "Software Engineer"
-                return _get_fallback_data(career_name)
-            raise
-
-        # Call the GenAI API
+        history = _format_context(context) if context else ""
+
+        # Make sure the client is usable before fanning out
+        if AI_BACKEND != "stub":
+            try:
+                _get_client()
+            except Exception as e:
+                if os.getenv("AI_FALLBACK", "0") == "1":
+                    logger.warning("GenAI unavailable, returning fallback: %s", e)
+                    return fallback_answer(sanitized_prompt)
+                raise
+
+        # Call the model
         try:
-            response = client.models.generate_content(
-                model=GEMINI_MODEL,
-                contents=combined_prompt,
-            )
-            content = getattr(response, "text", None) or str(response)
+            if mode == "decomposed":
+                parsed = _generate_decomposed(sanitized_prompt, history)
+            else:
+                parsed = _parse_model_output(_call_model(_build_prompt(_FIELD_SPECS, sanitized_prompt, history)))
         except Exception as api_error:
             logger.exception("GenAI model request failed: %s", api_error)
             if os.getenv("AI_FALLBACK", "0") == "1":
-                return _get_fallback_data()
+                return normalize_answer(_get_fallback_data())
             raise
 
-        if not content:
-            raise ValueError("No content returned from model")
-
-        # Extract and parse JSON
-        blob = _extract_json_blob(content)
-        parsed = _parse_json_safely(blob)
-
-        if not isinstance(parsed, dict):
-            raise ValueError("Model did not return a JSON object")
-
-        # Normalize keys
-        normalized = _normalize_keys(parsed)
-
-        # Ensure learning_resources is a list
-        if "learning_resources" in normalized:
-            if not isinstance(normalized["learning_resources"], list):
-                normalized["learning_resources"] = [normalized["learning_resources"]]
-        else:
-            normalized["learning_resources"] = []
-
-        # Validate required fields
-        required = [
-            "title",
-            "explanation",
-            "average_salary",
-            "job_openings",
-            "youtube_video_recommendation"
-        ]
-        missing = [r for r in required if r not in normalized or not normalized[r]]
-        
-        if missing:
-            raise ValueError(f"Missing required fields from model output: {missing}")
-
-        # Validate URLs in learning resources
-        for resource in normalized.get("learning_resources", []):
-            if not isinstance(resource, dict):
-                logger.warning("Invalid learning resource format: %s", resource)
-                continue
-            if "url" in resource and resource["url"]:
-                # Basic URL validation
-                if not re.match(r'https?://', resource["url"], re.IGNORECASE):
-                    logger.warning("Invalid URL in learning resource: %s", resource["url"])
-
-        return normalized
+        # Normalize keys, coerce and validate in one pass (see answer_normalizer.py)
+        return normalize_answer(parsed)
 
     except Exception as exc:
         logger.exception("Failed to generate career path with AI: %s", exc)
         raise
 
 
+def generation_stats() -> Dict[str, Any]:
+    """Generation mode, backend and part cache statistics."""
+    return {"mode": AI_GENERATION_MODE, "backend": AI_BACKEND, "part_cache": part_cache.stats()}
+
+
 def check_genai_client() -> Dict[str, Any]:
     """Check whether the GenAI client can be initialized.
 
@@ -398,6 +511,7 @@ def check_genai_client() -> Dict[str, Any]:
         - message: str (status message)
         - model: str (model name if successful)
         - fallback_enabled: bool (whether fallback mode is enabled)
+        - connections: dict (request, connection and TLS handshake counts)
     """
     result = {
         "ok": False,
@@ -414,4 +528,5 @@ def check_genai_client() -> Dict[str, Any]:
         result["message"] = f"GenAI initialization failed: {str(exc)}"
         logger.error("Health check failed: %s", exc)
     
+    result["connections"] = genai_client_stats()
     return result
\ No newline at end of file
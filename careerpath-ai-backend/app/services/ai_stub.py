@@ -0,0 +1,79 @@
+"""
+Offline stand-in for the model (``AI_BACKEND=stub``).
+
+Answers a generation prompt with plausible JSON for exactly the keys the
+prompt asks for (its ``- key: ...`` lines), after a simulated latency of a
+fixed time to first token plus a per-character streaming cost. Longer
+outputs take longer, as with the real model, so monolithic and decomposed
+generation (see ``ai_generator``) can be compared without network access or
+an API key.
+
+Env vars:
+
+- ``AI_STUB_FIRST_TOKEN_MS`` (default ``400``): fixed latency per call.
+- ``AI_STUB_MS_PER_CHAR`` (default ``0.4``): latency per output character.
+"""
+import json
+import os
+import re
+import time
+from typing import Any, Callable, Dict
+from urllib.parse import quote_plus
+
+AI_STUB_FIRST_TOKEN_MS = float(os.getenv("AI_STUB_FIRST_TOKEN_MS", "400"))
+AI_STUB_MS_PER_CHAR = float(os.getenv("AI_STUB_MS_PER_CHAR", "0.4"))
+
+_KEY_RE = re.compile(r"^- (\w+):", re.MULTILINE)
+_QUERY_RE = re.compile(r"User Query:\s*(.*)", re.DOTALL)
+_WORD_RE = re.compile(r"[A-Za-z]+")
+_FILLER = frozenset("a an and as be become career do does for how i in is me my of on path roadmap the to what".split())
+
+
+def _career(query: str) -> str:
+    words = [w for w in _WORD_RE.findall(query) if w.lower() not in _FILLER]
+    return " ".join(w.capitalize() for w in words[:3]) or "Software Engineer"
+
+
+def _explanation(career: str) -> str:
+    paragraphs = [
+        f"A {career} applies specialised knowledge to solve problems for teams and customers. "
+        "Day to day the work mixes hands-on delivery, collaboration with neighbouring roles and "
+        "continuous learning as tools and practices change. " * 3,
+        f"Most people enter {career} roles through a degree, a bootcamp or a lateral move, then "
+        "build a portfolio of real projects that shows they can deliver end to end. " * 3,
+        f"Progression leads from junior to senior {career} positions and on to leadership or "
+        "deep specialist tracks, with compensation rising accordingly. " * 3,
+    ]
+    return "\n\n".join(paragraphs)
+
+
+_FIELDS: Dict[str, Callable[[str], Any]] = {
+    "title": lambda career: career,
+    "explanation": _explanation,
+    "average_salary": lambda career: "$75,000 - $135,000 per year (USD)",
+    "job_openings": lambda career: f"Steady demand for {career} roles, strongest in larger metro areas",
+    "youtube_video_recommendation": lambda career: (
+        "https://www.youtube.com/results?search_query=" + quote_plus(f"{career} career roadmap")
+    ),
+    "learning_resources": lambda career: [
+        {
+            "title": f"{career} {topic}",
+            "url": f"https://example.com/{quote_plus(career.lower())}/{i}",
+            "type": kind,
+        }
+        for i, (topic, kind) in enumerate([
+            ("Fundamentals", "course"), ("Handbook", "book"), ("Interview Guide", "article"),
+            ("Crash Course", "youtube"), ("Projects for Beginners", "article"), ("Advanced Topics", "course"),
+        ])
+    ],
+}
+
+
+def generate(prompt: str) -> str:
+    """Return the model's text for ``prompt``, after the simulated latency."""
+    match = _QUERY_RE.search(prompt)
+    career = _career(match.group(1) if match else "")
+    fields = {key: _FIELDS[key](career) for key in _KEY_RE.findall(prompt) if key in _FIELDS}
+    text = json.dumps(fields)
+    time.sleep((AI_STUB_FIRST_TOKEN_MS + AI_STUB_MS_PER_CHAR * len(text)) / 1000)
+    return text
@@ -0,0 +1,153 @@
+"""
+Compiled normalization and validation of generated answers.
+
+Model output is loosely shaped JSON: camelCase or spaced keys, numbers
+where strings are expected, a single resource instead of a list.
+``AnswerNormalizer`` is compiled once from a Pydantic model (``AIResponse``):
+it picks a coercer per field from the field's annotation and memoizes key
+spellings, then normalizes keys, coerces values and checks required fields
+in a single pass over the parsed output. The result is the final response
+dict, shaped like ``AIResponse.model_validate(data).model_dump()``, without
+building a model instance; keys the schema doesn't know are skipped rather
+than rewritten.
+"""
+import logging
+import re
+import types
+import typing
+from typing import Any, Callable, Dict, List, Type
+
+from pydantic import BaseModel, TypeAdapter
+
+from ..schemas import AIResponse
+
+logger = logging.getLogger(__name__)
+
+# Distinct key spellings remembered; model output only uses a handful
+_KEY_CACHE_SIZE = 4096
+
+_CAMEL_BOUNDARY = re.compile(r"([a-z0-9])([A-Z])")
+_NON_ALNUM = re.compile(r"[^0-9a-zA-Z]+")
+
+_key_cache: Dict[str, str] = {}
+
+Coercer = Callable[[Any, str], Any]
+
+
+def snake_key(key: Any) -> str:
+    """Normalize a key to snake_case (``averageSalary``, ``Average Salary`` -> ``average_salary``)."""
+    snake = _key_cache.get(key)
+    if snake is None:
+        text = str(key)
+        snake = _NON_ALNUM.sub("_", _CAMEL_BOUNDARY.sub(r"\1_\2", text).strip()).lower().strip("_")
+        if len(_key_cache) < _KEY_CACHE_SIZE:
+            _key_cache[key] = snake
+    return snake
+
+
+def _coerce_str(value: Any, field: str) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"Field {field!r} must be a string, got {type(value).__name__}")
+
+
+def _coerce_bool(value: Any, field: str) -> bool:
+    if isinstance(value, bool):
+        return value
+    raise ValueError(f"Field {field!r} must be a boolean, got {type(value).__name__}")
+
+
+def _coerce_float(value: Any, field: str) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raise ValueError(f"Field {field!r} must be a number, got {type(value).__name__}")
+
+
+def _coerce_str_map_list(value: Any, field: str) -> List[Dict[str, str]]:
+    """A list of flat string maps (``learning_resources``); a lone map becomes a list."""
+    items = value if isinstance(value, list) else [value]
+    result = []
+    for item in items:
+        if not isinstance(item, dict):
+            logger.warning("Skipping invalid %s entry: %.100r", field, item)
+            continue
+        entry = {}
+        for key, val in item.items():
+            if val is not None:
+                entry[snake_key(key)] = val if isinstance(val, str) else _coerce_str(val, field)
+        url = entry.get("url")
+        if url and not url[:8].lower().startswith(("http://", "https://")):
+            logger.warning("Invalid URL in %s: %s", field, url)
+        result.append(entry)
+    return result
+
+
+def _optional(coerce: Coercer) -> Coercer:
+    return lambda value, field: None if value is None else coerce(value, field)
+
+
+def _compile_field(annotation: Any) -> Coercer:
+    """Pick a coercer for a field annotation, falling back to a Pydantic ``TypeAdapter``."""
+    if annotation is str:
+        return _coerce_str
+    if annotation is bool:
+        return _coerce_bool
+    if annotation is float:
+        return _coerce_float
+    origin, args = typing.get_origin(annotation), typing.get_args(annotation)
+    if origin in (typing.Union, types.UnionType) and len(args) == 2 and type(None) in args:
+        return _optional(_compile_field(next(a for a in args if a is not type(None))))
+    if origin is list and args and typing.get_origin(args[0]) is dict and typing.get_args(args[0]) == (str, str):
+        return _coerce_str_map_list
+    adapter = TypeAdapter(annotation)
+    return lambda value, field: adapter.validate_python(value)
+
+
+class AnswerNormalizer:
+    """Normalizer/validator compiled from a Pydantic model's fields.
+
+    Required string fields must be present and non-empty; required list
+    fields default to an empty list (models often leave them out).
+    """
+
+    def __init__(self, model: Type[BaseModel] = AIResponse):
+        self.model = model
+        self._coercers: Dict[str, Coercer] = {}
+        self._defaults: Dict[str, Callable[[], Any]] = {}
+        self._required: List[str] = []
+        for name, info in model.model_fields.items():
+            coerce = _compile_field(info.annotation)
+            self._coercers[name] = coerce
+            if not info.is_required():
+                default = info.get_default(call_default_factory=True)
+                self._defaults[name] = lambda default=default: default
+            elif coerce is _coerce_str_map_list:
+                self._defaults[name] = list
+            else:
+                self._required.append(name)
+
+    def __call__(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        """Normalize parsed model output into a response dict.
+
+        Raises:
+            ValueError: If required fields are missing or a value has the wrong type
+        """
+        coercers = self._coercers
+        values = {}
+        for key, value in data.items():
+            name = snake_key(key)
+            coerce = coercers.get(name)
+            if coerce is not None and value is not None:
+                values[name] = coerce(value, name)
+        missing = [name for name in self._required if not values.get(name)]
+        if missing:
+            raise ValueError(f"Missing required fields from model output: {missing}")
+        return {
+            name: values[name] if name in values else self._defaults[name]()
+            for name in coercers
+        }
+
+
+normalize_answer = AnswerNormalizer(AIResponse)
@@ -0,0 +1,276 @@
+"""
+Compiled roadmap catalog bundle.
+
+The catalog (``data/roadmaps.json``) and its pre-rendered docs are compiled
+into a single read-only binary file with a fixed-width offset index. Workers
+mmap the file instead of parsing JSON and rendering markdown themselves, so
+the pages are shared between processes through the OS page cache and every
+response body is already serialized.
+
+Layout (little-endian)::
+
+    header   magic, format version, entry count, list blob offset/length,
+             index offset, changelog blob offset/length
+    index    one fixed-width record per entry: id, slug and detail blob
+             offsets/lengths plus a 16-byte content digest
+    blobs    list payload (JSON array), changelog (JSON object, see
+             ``catalog_sync``), then per-entry id, slug and detail payload
+             (JSON object)
+
+Bundles are written to a temporary file and moved into place with
+``os.replace``, so a deploy swaps the whole catalog atomically and readers
+never see a half-written file.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"CPCB"
+FORMAT_VERSION = 2
+
+# magic, format version, flags, entry count, list offset, list length, index offset,
+# changelog offset, changelog length
+_HEADER = struct.Struct("<4sHHIQQQQQ")
+# id offset/length, slug offset/length, detail offset/length, digest
+_RECORD = struct.Struct("<QHQHQI16s")
+
+
+def content_digest(payload: bytes) -> bytes:
+    """Return the 16-byte digest used to identify a detail payload."""
+    return hashlib.sha256(payload).digest()[:16]
+
+
+def list_item(item: Dict[str, Any]) -> Dict[str, Any]:
+    """Return catalog metadata as exposed by the list endpoint (without the doc path)."""
+    return {k: v for k, v in item.items() if k != "doc"}
+
+
+def render_entry(
+    item: Dict[str, Any],
+    docs_dir: Path,
+    render_html: Optional[Callable[[str], str]] = None,
+) -> Dict[str, Any]:
+    """Build the detail response for a catalog entry.
+
+    Args:
+        item: Catalog metadata entry from ``roadmaps.json``
+        docs_dir: Directory holding the markdown docs
+        render_html: Optional markdown-to-HTML renderer
+
+    Returns:
+        Dictionary in the shape returned by ``GET /api/roadmaps/{id}``
+    """
+    doc_path = item.get("doc") or f"{item.get('id')}.md"
+    # doc_path in metadata is relative to the backend docs folder (e.g. docs/roadmaps/frontend.md)
+    doc_file = docs_dir / Path(doc_path).name
+
+    content = ""
+    html = ""
+    if doc_file.exists():
+        try:
+            content = doc_file.read_text(encoding="utf-8")
+            if render_html is not None:
+                html = render_html(content)
+        except Exception as e:
+            logger.exception("Failed to read roadmap doc %s: %s", doc_file, e)
+    else:
+        logger.warning("Roadmap doc not found: %s", doc_file)
+
+    return {
+        "id": item.get("id"),
+        "title": item.get("title"),
+        "slug": item.get("slug"),
+        "summary": item.get("summary"),
+        "source": item.get("source"),
+        "doc": content,
+        "html": html,
+    }
+
+
+def render_payloads(
+    metadata: List[Dict[str, Any]],
+    docs_dir: Path,
+    render_html: Optional[Callable[[str], str]] = None,
+) -> List[Tuple[Dict[str, Any], bytes]]:
+    """Render every catalog entry to its serialized detail payload.
+
+    Returns:
+        List of ``(item, detail_bytes)`` pairs in catalog order
+    """
+    return [(item, dumps(render_entry(item, docs_dir, render_html))) for item in metadata]
+
+
+def build_bundle(
+    payloads: List[Tuple[Dict[str, Any], bytes]],
+    out_path: Path,
+    changelog: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Compile the catalog into a bundle file and atomically move it into place.
+
+    Args:
+        payloads: Output of ``render_payloads``
+        out_path: Destination bundle path
+        changelog: Catalog changelog to embed (see ``catalog_sync``)
+
+    Returns:
+        Dictionary with build statistics (entries, bytes, path)
+    """
+    list_blob = dumps([list_item(item) for item, _ in payloads])
+    changelog_blob = dumps(changelog or {})
+
+    entries: List[Tuple[bytes, bytes, bytes]] = []
+    for item, detail in payloads:
+        entries.append((
+            str(item.get("id") or "").encode("utf-8"),
+            str(item.get("slug") or "").encode("utf-8"),
+            detail,
+        ))
+
+    index_off = _HEADER.size
+    list_off = index_off + _RECORD.size * len(entries)
+    changelog_off = list_off + len(list_blob)
+    cursor = changelog_off + len(changelog_blob)
+
+    records = []
+    blobs = [list_blob, changelog_blob]
+    for id_b, slug_b, detail in entries:
+        id_off = cursor
+        slug_off = id_off + len(id_b)
+        detail_off = slug_off + len(slug_b)
+        cursor = detail_off + len(detail)
+        records.append(_RECORD.pack(
+            id_off, len(id_b), slug_off, len(slug_b),
+            detail_off, len(detail), content_digest(detail),
+        ))
+        blobs.extend((id_b, slug_b, detail))
+
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, 0, len(entries), list_off, len(list_blob), index_off,
+        changelog_off, len(changelog_blob),
+    )
+
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f".{out_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header)
+            f.write(b"".join(records))
+            f.write(b"".join(blobs))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, out_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    return {"entries": len(entries), "bytes": cursor, "path": str(out_path)}
+
+
+class CatalogBundle:
+    """Read-only, mmap-backed view of a compiled catalog bundle."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            st = os.fstat(f.fileno())
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        (magic, version, _flags, count, list_off, list_len, index_off,
+         changelog_off, changelog_len) = _HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a catalog bundle")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog bundle version {version}")
+
+        self._list = (list_off, list_len)
+        self._changelog_span = (changelog_off, changelog_len)
+        self._changelog: Optional[Dict[str, Any]] = None
+        self._records: List[Tuple[int, int, bytes]] = []
+        self._keys: Dict[str, int] = {}
+        for i in range(count):
+            id_off, id_len, slug_off, slug_len, detail_off, detail_len, digest = _RECORD.unpack_from(
+                self._mm, index_off + i * _RECORD.size
+            )
+            self._records.append((detail_off, detail_len, digest))
+            self._keys[self._mm[id_off:id_off + id_len].decode("utf-8")] = i
+            if slug_len:
+                self._keys.setdefault(self._mm[slug_off:slug_off + slug_len].decode("utf-8"), i)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def list_bytes(self) -> bytes:
+        """Return the pre-serialized list payload."""
+        off, length = self._list
+        return self._mm[off:off + length]
+
+    def changelog(self) -> Dict[str, Any]:
+        """Return the embedded changelog, parsed on first use."""
+        if self._changelog is None:
+            off, length = self._changelog_span
+            self._changelog = loads(self._mm[off:off + length]) if length else {}
+        return self._changelog
+
+    def detail_bytes(self, key: str) -> Optional[bytes]:
+        """Return the pre-serialized detail payload for an id or slug."""
+        i = self._keys.get(key)
+        if i is None:
+            return None
+        off, length, _ = self._records[i]
+        return self._mm[off:off + length]
+
+    def digest(self, key: str) -> Optional[bytes]:
+        """Return the content digest for an id or slug."""
+        i = self._keys.get(key)
+        return None if i is None else self._records[i][2]
+
+
+class BundleLoader:
+    """Keeps the current bundle mapped and picks up atomically swapped files.
+
+    The bundle path is re-checked at most every ``check_interval`` seconds;
+    when its inode, mtime or size changes the new file is mapped and the old
+    mapping is released once no longer referenced.
+    """
+
+    def __init__(self, path: Path, check_interval: float = 5.0):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self._bundle: Optional[CatalogBundle] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def get(self) -> Optional[CatalogBundle]:
+        """Return the current bundle, or None when no valid bundle exists."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._bundle
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._bundle
+            self._checked_at = now
+            try:
+                st = os.stat(self.path)
+            except FileNotFoundError:
+                self._bundle = None
+                return None
+            identity = (st.st_ino, st.st_mtime_ns, st.st_size)
+            if self._bundle is None or self._bundle.identity != identity:
+                try:
+                    self._bundle = CatalogBundle(self.path)
+                    logger.info("Mapped catalog bundle %s (%d entries)", self.path, len(self._bundle))
+                except Exception as e:
+                    logger.warning("Failed to load catalog bundle %s: %s", self.path, e)
+            return self._bundle
@@ -0,0 +1,165 @@
+"""
+In-memory index for filtered, sorted and cursor-paginated catalog listings.
+
+The index keeps, per facet field, a posting set of ids for each value and a
+running count, plus one pre-sorted key list per sort field. Entries are
+added and removed incrementally (e.g. from a catalog sync delta), so facet
+counts never need a full recount and a page is served by a bisect into the
+sorted keys followed by a scan of at most the matching entries.
+"""
+import logging
+from bisect import bisect_left, bisect_right, insort
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+FACET_FIELDS = ("tags", "level", "source")
+SORT_FIELDS = ("title", "id", "level")
+
+# Levels sort in learning order rather than alphabetically; unknown levels last
+LEVEL_ORDER = {"beginner": 0, "intermediate": 1, "advanced": 2}
+
+# Below this fraction of the catalog, sort the matches directly instead of
+# scanning the pre-sorted list
+_DIRECT_SORT_RATIO = 0.25
+
+
+def facet_values(item: Dict[str, Any], field: str) -> List[str]:
+    """Return the facet values an entry contributes for ``field``."""
+    value = item.get(field)
+    if not value:
+        return []
+    if field == "source":
+        # facet on the publisher host, e.g. "roadmap.sh"
+        return [urlparse(value).netloc or value]
+    if isinstance(value, list):
+        return [str(v) for v in value]
+    return [str(value)]
+
+
+def sort_key(item: Dict[str, Any], field: str) -> Tuple[Any, str]:
+    """Return a unique, totally ordered key for ``item`` under ``field``."""
+    ident = str(item.get("id"))
+    if field == "level":
+        return (LEVEL_ORDER.get(item.get("level"), len(LEVEL_ORDER)), ident)
+    if field == "id":
+        return ("", ident)
+    return (str(item.get(field) or "").casefold(), ident)
+
+
+class CatalogIndex:
+    """Facet postings, facet counts and sorted keys over catalog entries."""
+
+    def __init__(self, items: Iterable[Dict[str, Any]] = ()):
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._postings: Dict[str, Dict[str, Set[str]]] = {f: defaultdict(set) for f in FACET_FIELDS}
+        self._counts: Dict[str, Counter] = {f: Counter() for f in FACET_FIELDS}
+        self._sorted: Dict[str, List[Tuple[Any, str]]] = {f: [] for f in SORT_FIELDS}
+        for item in items:
+            self.upsert(item)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def upsert(self, item: Dict[str, Any]) -> None:
+        """Add an entry, replacing any existing entry with the same id."""
+        ident = str(item.get("id"))
+        if ident in self._items:
+            self.remove(ident)
+        self._items[ident] = item
+        for field in FACET_FIELDS:
+            for value in facet_values(item, field):
+                self._postings[field][value].add(ident)
+                self._counts[field][value] += 1
+        for field in SORT_FIELDS:
+            insort(self._sorted[field], sort_key(item, field))
+
+    def remove(self, ident: str) -> None:
+        """Remove an entry by id; unknown ids are ignored."""
+        item = self._items.pop(ident, None)
+        if item is None:
+            return
+        for field in FACET_FIELDS:
+            for value in facet_values(item, field):
+                postings = self._postings[field][value]
+                postings.discard(ident)
+                if not postings:
+                    del self._postings[field][value]
+                self._counts[field][value] -= 1
+                if self._counts[field][value] <= 0:
+                    del self._counts[field][value]
+        for field in SORT_FIELDS:
+            keys = self._sorted[field]
+            key = sort_key(item, field)
+            i = bisect_left(keys, key)
+            if i < len(keys) and keys[i] == key:
+                del keys[i]
+
+    def facet_counts(self) -> Dict[str, Dict[str, int]]:
+        """Return entry counts per value for every facet field."""
+        return {field: dict(counts) for field, counts in self._counts.items()}
+
+    def _matches(self, filters: Dict[str, List[str]]) -> Optional[Set[str]]:
+        """Ids matching all filtered fields (any value within a field), or None if unfiltered."""
+        result: Optional[Set[str]] = None
+        # intersect the most selective fields first
+        unions = []
+        for field, values in filters.items():
+            if not values:
+                continue
+            postings = self._postings[field]
+            unions.append(set().union(*(postings.get(v, ()) for v in values)))
+        for ids in sorted(unions, key=len):
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+    def query(
+        self,
+        filters: Optional[Dict[str, List[str]]] = None,
+        sort: str = "title",
+        descending: bool = False,
+        after: Optional[List[Any]] = None,
+        limit: int = 20,
+    ) -> Tuple[List[Dict[str, Any]], Optional[List[Any]], int]:
+        """Return one page of entries.
+
+        Args:
+            filters: Facet field to accepted values
+            sort: One of ``SORT_FIELDS``
+            descending: Reverse sort order
+            after: Sort key of the last entry on the previous page
+            limit: Maximum number of entries to return
+
+        Returns:
+            Tuple of (entries, sort key to continue after or None, total matches)
+        """
+        matches = self._matches(filters or {})
+        total = len(self._items) if matches is None else len(matches)
+
+        if matches is not None and len(matches) <= _DIRECT_SORT_RATIO * len(self._items):
+            keys = sorted(sort_key(self._items[i], sort) for i in matches)
+            matches = None
+        else:
+            keys = self._sorted[sort]
+
+        start = tuple(after) if after is not None else None
+        if descending:
+            pos = (bisect_left(keys, start) if start is not None else len(keys)) - 1
+            step = -1
+        else:
+            pos = bisect_right(keys, start) if start is not None else 0
+            step = 1
+
+        page: List[Tuple[Any, str]] = []
+        while 0 <= pos < len(keys) and len(page) < limit + 1:
+            key = keys[pos]
+            if matches is None or key[1] in matches:
+                page.append(key)
+            pos += step
+
+        next_key = list(page[limit - 1]) if len(page) > limit else None
+        return [self._items[key[1]] for key in page[:limit]], next_key, total
@@ -0,0 +1,190 @@
+"""
+Versioned changelog for the roadmap catalog.
+
+Every catalog build compares the content hash of each entry against the
+previous build and, when anything changed, bumps the catalog version and
+appends a changelog record of added, changed and removed ids. Clients keep
+the version they last synced and ask for the delta since then, so an
+up-to-date client downloads a few bytes and a content change only ships the
+entries that actually changed.
+
+Changelog document (``data/catalog_changelog.json``, also embedded in the
+catalog bundle)::
+
+    {
+      "version": 3,
+      "entries": {"<id>": "<content hash>", ...},
+      "history": [
+        {"version": 3, "added": [...], "changed": [...], "removed": [...]},
+        ...
+      ]
+    }
+"""
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..utils.serialization import dumps, loads
+from .catalog_bundle import content_digest, list_item
+
+logger = logging.getLogger(__name__)
+
+# Number of versions kept in the history; older clients get a full snapshot
+CHANGELOG_MAX_VERSIONS = int(os.getenv("CATALOG_CHANGELOG_MAX_VERSIONS", "100"))
+
+
+def _source_payload(detail: bytes) -> bytes:
+    """The detail payload without its rendered HTML.
+
+    The HTML depends on whether (and which version of) ``markdown`` renders
+    it, so hashing it would bump the version on a different environment
+    with an unchanged catalog; the markdown source it is rendered from is
+    in the payload already.
+    """
+    entry = loads(detail)
+    entry.pop("html", None)
+    return dumps(entry)
+
+
+def payload_hashes(payloads: List[Tuple[Dict[str, Any], bytes]]) -> Dict[str, str]:
+    """Map catalog ids to the hex content hash of their list metadata and markdown source."""
+    return {
+        str(item.get("id")): content_digest(dumps(list_item(item)) + _source_payload(detail)).hex()
+        for item, detail in payloads
+    }
+
+
+def load_changelog(path: Path) -> Dict[str, Any]:
+    """Load a changelog document, returning an empty one if it doesn't exist."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"version": 0, "entries": {}, "history": []}
+
+
+def save_changelog(changelog: Dict[str, Any], path: Path) -> None:
+    """Atomically write a changelog document."""
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(changelog, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp_path, path)
+
+
+def record_version(changelog: Dict[str, Any], hashes: Dict[str, str]) -> Dict[str, Any]:
+    """Return the changelog with a new version appended if ``hashes`` differ.
+
+    Args:
+        changelog: Current changelog document
+        hashes: Content hash per catalog id for the catalog being built
+
+    Returns:
+        Updated changelog (the same object when nothing changed)
+    """
+    previous = changelog.get("entries", {})
+    added = sorted(k for k in hashes if k not in previous)
+    removed = sorted(k for k in previous if k not in hashes)
+    changed = sorted(k for k in hashes if k in previous and previous[k] != hashes[k])
+    if not (added or removed or changed):
+        return changelog
+
+    version = changelog.get("version", 0) + 1
+    history = changelog.get("history", []) + [{
+        "version": version,
+        "added": added,
+        "changed": changed,
+        "removed": removed,
+    }]
+    logger.info(
+        "Catalog version %d: %d added, %d changed, %d removed",
+        version, len(added), len(changed), len(removed),
+    )
+    return {
+        "version": version,
+        "entries": dict(hashes),
+        "history": history[-CHANGELOG_MAX_VERSIONS:],
+    }
+
+
+class CatalogDelta:
+    """Computes and memoizes sync deltas against one catalog version.
+
+    The set of distinct answers is bounded by the history length, so each
+    serialized delta is computed once and then served as bytes.
+    """
+
+    def __init__(self, changelog: Dict[str, Any], metadata: List[Dict[str, Any]]):
+        self.version: int = changelog.get("version", 0)
+        self._hashes: Dict[str, str] = changelog.get("entries", {})
+        self._history: List[Dict[str, Any]] = changelog.get("history", [])
+        self._items = {str(item.get("id")): list_item(item) for item in metadata}
+        self._memo: Dict[Optional[int], bytes] = {}
+
+    def items(self) -> List[Dict[str, Any]]:
+        """Return list metadata for every entry in the current version."""
+        return list(self._items.values())
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        return {**self._items.get(key, {"id": key}), "hash": self._hashes.get(key)}
+
+    def _oldest_base(self) -> int:
+        """Oldest version we can still diff against."""
+        if not self._history:
+            return self.version
+        return self._history[0]["version"] - 1
+
+    def delta(self, since: Optional[int]) -> Dict[str, Any]:
+        """Return added/changed/removed entries between ``since`` and the current version.
+
+        A full snapshot (``full: true``) is returned when ``since`` is missing,
+        newer than the current version or older than the retained history.
+        """
+        if since is None or since > self.version or since < self._oldest_base():
+            return {
+                "version": self.version,
+                "full": True,
+                "added": [self._entry(k) for k in self._items],
+                "changed": [],
+                "removed": [],
+            }
+
+        # first operation seen per id after `since` tells whether it existed then
+        first_op: Dict[str, str] = {}
+        for record in self._history:
+            if record["version"] <= since:
+                continue
+            for op in ("added", "changed", "removed"):
+                for key in record[op]:
+                    first_op.setdefault(key, op)
+
+        added, changed, removed = [], [], []
+        for key, op in first_op.items():
+            existed = op != "added"
+            present = key in self._hashes
+            if present and existed:
+                changed.append(key)
+            elif present:
+                added.append(key)
+            elif existed:
+                removed.append(key)
+
+        return {
+            "version": self.version,
+            "full": False,
+            "added": [self._entry(k) for k in sorted(added)],
+            "changed": [self._entry(k) for k in sorted(changed)],
+            "removed": sorted(removed),
+        }
+
+    def delta_bytes(self, since: Optional[int]) -> bytes:
+        """Return the serialized delta, computing it once per distinct ``since``."""
+        if since is not None and (since > self.version or since < self._oldest_base()):
+            since = None
+        body = self._memo.get(since)
+        if body is None:
+            body = self._memo[since] = dumps(self.delta(since))
+        return body
@@ -0,0 +1,99 @@
+"""
+Bounded prompt context for chat sessions.
+
+A turn's context is a rolling summary of everything older than the last
+``CHAT_CONTEXT_MESSAGES`` messages, followed by those messages verbatim.
+Messages that drop out of the verbatim window are folded into the summary,
+which is capped at ``CHAT_SUMMARY_MAX_TOKENS``; the whole context is capped
+at ``CHAT_CONTEXT_MAX_TOKENS``. Prompt size per turn therefore stays bounded
+however long the conversation runs.
+
+Summaries are extractive (the gist of each folded message, oldest dropped
+first, the opening line kept), so folding is cheap and never needs another
+model call. The summary is persisted on the ``ChatSession`` row after the
+response has been sent (see ``chat_sessions.SessionWindowCache.refresh_summary``).
+"""
+import math
+import os
+import re
+from typing import Dict, List, Optional
+
+CHAT_CONTEXT_MAX_TOKENS = int(os.getenv("CHAT_CONTEXT_MAX_TOKENS", "1500"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "400"))
+
+# Rough average for English text with Gemini/GPT-style tokenizers
+_CHARS_PER_TOKEN = 4
+# Role label and separators added per message
+_MESSAGE_OVERHEAD_TOKENS = 4
+# Characters of a folded message kept in the summary
+_SUMMARY_LINE_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the token count of ``text`` without a tokenizer."""
+    return math.ceil(len(text) / _CHARS_PER_TOKEN) if text else 0
+
+
+def estimate_messages_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m.get("content") or "") + _MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def _gist(text: str) -> str:
+    """First sentence of ``text``, capped at ``_SUMMARY_LINE_CHARS``."""
+    text = " ".join(text.split())
+    first = _SENTENCE_END.split(text, 1)[0]
+    if len(first) > _SUMMARY_LINE_CHARS:
+        first = first[:_SUMMARY_LINE_CHARS - 3].rstrip() + "..."
+    return first
+
+
+def fold_summary(summary: Optional[str], turns: List[Dict[str, str]], max_tokens: int = CHAT_SUMMARY_MAX_TOKENS) -> str:
+    """Fold ``turns`` (oldest first) into ``summary`` and trim it to ``max_tokens``.
+
+    The first line (how the conversation started) is kept; the oldest of
+    the remaining lines are dropped first.
+    """
+    lines = summary.splitlines() if summary else []
+    for turn in turns:
+        content = turn.get("content") or ""
+        if content:
+            lines.append(f"- {turn.get('role', 'user')}: {_gist(content)}")
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        del lines[1]
+    text = "\n".join(lines)
+    if estimate_tokens(text) > max_tokens:
+        text = text[:max_tokens * _CHARS_PER_TOKEN]
+    return text
+
+
+def build_context(
+    summary: Optional[str],
+    pending: List[Dict[str, str]],
+    turns: List[Dict[str, str]],
+    max_tokens: int = CHAT_CONTEXT_MAX_TOKENS,
+) -> List[Dict[str, str]]:
+    """Assemble the context messages for a turn.
+
+    Args:
+        summary: Persisted rolling summary of folded messages
+        pending: Messages that left the verbatim window but aren't in ``summary`` yet
+        turns: The most recent messages, verbatim (oldest first)
+        max_tokens: Budget for the whole context
+
+    Returns:
+        ``{"role", "content"}`` messages, oldest first
+    """
+    folded = fold_summary(summary, pending) if pending else (summary or "")
+    head = [{"role": "summary", "content": folded}] if folded else []
+    recent = list(turns)
+    # drop the oldest verbatim messages first, but always keep the latest exchange
+    while len(recent) > 2 and estimate_messages_tokens(head + recent) > max_tokens:
+        folded = fold_summary(folded, recent[:1])
+        head = [{"role": "summary", "content": folded}]
+        recent = recent[1:]
+    if estimate_messages_tokens(head + recent) > max_tokens and head:
+        budget = max(0, max_tokens - estimate_messages_tokens(recent) - _MESSAGE_OVERHEAD_TOKENS)
+        head = [{"role": "summary", "content": fold_summary(folded, [], max_tokens=budget)}] if budget else []
+    return head + recent
@@ -0,0 +1,250 @@
+"""
+Server-side chat sessions: recent-turn windows kept in memory.
+
+Each chat turn needs the last few messages of its session as context. Each
+worker keeps those turns for recently active sessions in a bounded LRU,
+so a turn in an active conversation needs no database read. On a miss the
+window is loaded with a few indexed queries on ``(session_id, timestamp)``.
+
+Messages that leave the window are folded into the session's rolling
+summary (see ``chat_context``) by ``refresh_summary``, which runs after the
+response is sent and persists the summary on the ``ChatSession`` row.
+
+Workers on the same host invalidate each other's windows through a
+``VersionTable`` (see ``profile_cache``): every turn bumps the session's
+counter, and a window is only used while the counter still matches. Turns
+are persisted through the write-behind queue, so a window reloaded right
+after another worker's turn may miss it for up to ``WRITE_BEHIND_INTERVAL``.
+"""
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import func, select, update
+
+from ..models import ChatMessage, ChatSession, User
+from .chat_context import build_context, fold_summary
+from .profile_cache import VersionTable
+
+logger = logging.getLogger(__name__)
+
+CHAT_CONTEXT_MESSAGES = int(os.getenv("CHAT_CONTEXT_MESSAGES", "6"))
+CHAT_SESSION_WINDOW_SIZE = int(os.getenv("CHAT_SESSION_WINDOW_SIZE", "2000"))
+CHAT_SESSION_VERSION_FILE = Path(os.getenv(
+    "CHAT_SESSION_VERSION_FILE",
+    str(Path(__file__).resolve().parents[2] / "data" / ".chat_versions"),
+))
+CHAT_SESSION_VERSION_SLOTS = int(os.getenv("CHAT_SESSION_VERSION_SLOTS", "65536"))
+
+# Characters of an earlier answer's explanation repeated as context
+_ANSWER_CONTEXT_CHARS = 600
+
+
+@dataclass
+class SessionWindow:
+    """Owner, rolling summary and most recent messages of one chat session."""
+    session_id: int
+    clerk_id: str
+    version: int
+    turns: Deque[Dict[str, str]] = field(default_factory=lambda: deque(maxlen=CHAT_CONTEXT_MESSAGES))
+    summary: str = ""
+    summarized: int = 0  # messages covered by ``summary``
+    pending: List[Dict[str, str]] = field(default_factory=list)  # left ``turns``, not yet in ``summary``
+
+    def context(self) -> List[Dict[str, str]]:
+        """Context messages for the next turn, within the token budget."""
+        return build_context(self.summary, self.pending, list(self.turns))
+
+
+def render_turn(role: str, content: str) -> Dict[str, str]:
+    """Reduce a stored message to the text repeated as context.
+
+    Assistant messages are stored as the JSON answer; only the title and the
+    start of the explanation are carried forward.
+    """
+    if role == "assistant":
+        try:
+            answer = json.loads(content)
+        except ValueError:
+            answer = None
+        if isinstance(answer, dict):
+            explanation = str(answer.get("explanation") or "")[:_ANSWER_CONTEXT_CHARS]
+            content = f"{answer.get('title') or ''}: {explanation}".strip(": ")
+    return {"role": role, "content": content}
+
+
+class SessionWindowCache:
+    """Bounded LRU of ``SessionWindow``s, validated against a ``VersionTable``."""
+
+    def __init__(self, versions: VersionTable, max_size: int = CHAT_SESSION_WINDOW_SIZE):
+        self.versions = versions
+        self.max_size = max_size
+        self._entries: "OrderedDict[int, SessionWindow]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "summary_refreshes": 0}
+
+    def _get(self, session_id: int, clerk_id: str) -> Optional[SessionWindow]:
+        with self._lock:
+            window = self._entries.get(session_id)
+            if window is None:
+                self._stats["misses"] += 1
+                return None
+            if window.version != self.versions.get(str(session_id)):
+                del self._entries[session_id]
+                self._stats["stale"] += 1
+                self._stats["misses"] += 1
+                return None
+            if window.clerk_id != clerk_id:
+                # not this user's session; let the database lookup decide
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(session_id)
+            self._stats["hits"] += 1
+            return window
+
+    def _put(self, window: SessionWindow) -> None:
+        with self._lock:
+            self._entries[window.session_id] = window
+            self._entries.move_to_end(window.session_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    async def get(self, db, clerk_id: str, session_id: int) -> SessionWindow:
+        """Return the session's window, loading it from the database on a miss.
+
+        Raises:
+            HTTPException: 404 if the session doesn't exist or isn't ``clerk_id``'s
+        """
+        window = self._get(session_id, clerk_id)
+        if window is not None:
+            return window
+
+        version = self.versions.get(str(session_id))
+        row = (await db.execute(
+            select(ChatSession.summary, ChatSession.summarized_messages)
+            .join(User, User.id == ChatSession.user_id)
+            .where(ChatSession.id == session_id, User.clerk_id == clerk_id)
+        )).first()
+        if row is None:
+            raise HTTPException(status_code=404, detail="Chat session not found")
+        summary, summarized = row[0] or "", row[1] or 0
+        total = await db.scalar(select(func.count(ChatMessage.id)).where(ChatMessage.session_id == session_id))
+        rows = (await db.execute(
+            select(ChatMessage.role, ChatMessage.content)
+            .where(ChatMessage.session_id == session_id)
+            .order_by(ChatMessage.timestamp.desc(), ChatMessage.id.desc())
+            .limit(CHAT_CONTEXT_MESSAGES)
+        )).all()
+        recent = [render_turn(role, content) for role, content in reversed(rows)]
+        # the summary may already cover some of the recent messages...
+        recent = recent[max(0, len(recent) - max(0, total - summarized)):]
+        # ...or lag behind them; older messages it doesn't cover yet are folded later
+        gap = total - len(recent) - summarized
+        pending = []
+        if gap > 0:
+            gap_rows = (await db.execute(
+                select(ChatMessage.role, ChatMessage.content)
+                .where(ChatMessage.session_id == session_id)
+                .order_by(ChatMessage.timestamp, ChatMessage.id)
+                .offset(summarized)
+                .limit(gap)
+            )).all()
+            pending = [render_turn(role, content) for role, content in gap_rows]
+
+        window = SessionWindow(
+            session_id=session_id, clerk_id=clerk_id, version=version,
+            summary=summary, summarized=summarized, pending=pending,
+        )
+        window.turns.extend(recent)
+        self._put(window)
+        return window
+
+    def create(self, session_id: int, clerk_id: str) -> None:
+        """Register a new, empty session so its first turn needs no lookup."""
+        self._put(SessionWindow(session_id=session_id, clerk_id=clerk_id, version=self.versions.get(str(session_id))))
+
+    def append(self, window: SessionWindow, messages: List[Dict[str, str]]) -> bool:
+        """Record new messages (already rendered) and invalidate other workers' copies.
+
+        Returns:
+            True if older messages left the window and the summary needs a refresh
+        """
+        with self._lock:
+            overflow = len(window.turns) + len(messages) - CHAT_CONTEXT_MESSAGES
+            for _ in range(max(0, overflow)):
+                window.pending.append(window.turns.popleft())
+            window.turns.extend(messages)
+            window.version = self.versions.bump(str(window.session_id))
+            return bool(window.pending)
+
+    async def refresh_summary(self, window: SessionWindow) -> None:
+        """Fold the window's pending messages into its summary and persist it.
+
+        Meant to run after the response has been sent (e.g. as a background task).
+        """
+        with self._lock:
+            pending = list(window.pending)
+            base = window.summary
+        if not pending:
+            return
+        summary = fold_summary(base, pending)
+        with self._lock:
+            # concurrent turns only ever append to pending
+            del window.pending[:len(pending)]
+            window.summary = summary
+            window.summarized += len(pending)
+            summarized = window.summarized
+            self._stats["summary_refreshes"] += 1
+
+        try:
+            from .. import database
+
+            database.get_async_engine()
+            async with database.AsyncSessionLocal() as db:
+                await db.execute(
+                    update(ChatSession)
+                    .where(ChatSession.id == window.session_id)
+                    .values(summary=summary, summarized_messages=summarized)
+                )
+                await db.commit()
+        except Exception as e:
+            # the in-memory window stays correct; a reload re-folds from the last persisted summary
+            logger.warning("Failed to persist summary for chat session %s: %s", window.session_id, e)
+
+    def discard(self, session_id: int) -> None:
+        self.versions.bump(str(session_id))
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats.update(
+                size=len(self._entries),
+                max_size=self.max_size,
+                context_messages=CHAT_CONTEXT_MESSAGES,
+                hit_rate=round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            )
+            return stats
+
+
+_windows: Optional[SessionWindowCache] = None
+_windows_lock = threading.Lock()
+
+
+def get_session_windows() -> SessionWindowCache:
+    """Return the process-wide session window cache."""
+    global _windows
+    if _windows is None:
+        with _windows_lock:
+            if _windows is None:
+                _windows = SessionWindowCache(VersionTable(CHAT_SESSION_VERSION_FILE, CHAT_SESSION_VERSION_SLOTS))
+    return _windows
@@ -0,0 +1,290 @@
+"""
+Local verification of Clerk session tokens.
+
+Clerk session tokens are short-lived RS256 JWTs. Instead of asking Clerk
+about every request, tokens are verified locally against Clerk's signing
+keys:
+
+- ``JWKSCache`` holds the keys (by ``kid``). It is filled at startup and
+  refreshed by a background task every ``CLERK_JWKS_REFRESH_INTERVAL``
+  seconds; a token signed with an unknown key triggers an early refresh
+  (at most once per ``CLERK_JWKS_MIN_REFRESH_INTERVAL``) and is rejected
+  meanwhile, so no request ever waits on the network. With ``CLERK_JWT_KEY``
+  set (the PEM public key from the Clerk dashboard) nothing is fetched.
+- ``VerifiedTokenCache`` remembers verified tokens until they expire, so a
+  client reusing its token costs a dict lookup instead of a signature check.
+
+Keys come from ``CLERK_JWKS_URL``, or from the Backend API
+(``https://api.clerk.com/v1/jwks``) when only ``CLERK_SECRET_KEY`` is set.
+"""
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import urllib.request
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ..utils.lazy_imports import is_available, optional_module
+
+# PyJWT (and cryptography behind it) is imported on first use; see lazy_imports
+_has_jwt = is_available("jwt")
+
+logger = logging.getLogger(__name__)
+
+CLERK_SECRET_KEY = os.getenv("CLERK_SECRET_KEY")
+CLERK_JWT_KEY = os.getenv("CLERK_JWT_KEY") or os.getenv("JWT_KEY")
+CLERK_JWKS_URL = os.getenv("CLERK_JWKS_URL") or ("https://api.clerk.com/v1/jwks" if CLERK_SECRET_KEY else None)
+CLERK_AUTHORIZED_PARTIES = [p.strip() for p in os.getenv("CLERK_AUTHORIZED_PARTIES", "").split(",") if p.strip()]
+CLERK_JWKS_REFRESH_INTERVAL = float(os.getenv("CLERK_JWKS_REFRESH_INTERVAL", "3600"))  # seconds
+CLERK_JWKS_MIN_REFRESH_INTERVAL = float(os.getenv("CLERK_JWKS_MIN_REFRESH_INTERVAL", "60"))  # seconds
+CLERK_TOKEN_CACHE_SIZE = int(os.getenv("CLERK_TOKEN_CACHE_SIZE", "10000"))
+CLERK_JWT_LEEWAY = float(os.getenv("CLERK_JWT_LEEWAY", "5"))  # seconds of clock skew tolerated
+
+_ALGORITHMS = ["RS256"]
+_FETCH_TIMEOUT = 5.0  # seconds
+
+
+class AuthError(Exception):
+    """Raised when a token is missing, malformed, expired or not trusted."""
+
+
+def _rsa_algorithm():
+    algorithms = optional_module("jwt.algorithms")
+    return algorithms.RSAAlgorithm(algorithms.RSAAlgorithm.SHA256)
+
+
+class JWKSCache:
+    """Signing keys by ``kid``, refreshed in the background."""
+
+    def __init__(
+        self,
+        url: Optional[str] = CLERK_JWKS_URL,
+        secret_key: Optional[str] = CLERK_SECRET_KEY,
+        static_pem: Optional[str] = CLERK_JWT_KEY,
+        refresh_interval: float = CLERK_JWKS_REFRESH_INTERVAL,
+        min_refresh_interval: float = CLERK_JWKS_MIN_REFRESH_INTERVAL,
+    ):
+        self.url = url
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self._secret_key = secret_key
+        self._static = _rsa_algorithm().prepare_key(static_pem) if static_pem and _has_jwt else None
+        self._keys: Dict[str, Any] = {}
+        self._last_attempt = 0.0
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._pending: Optional[asyncio.Future] = None
+        self._stats = {"refreshes": 0, "failed_refreshes": 0, "unknown_kid": 0, "last_refresh": None}
+
+    @property
+    def configured(self) -> bool:
+        return self._static is not None or bool(self.url)
+
+    def get(self, kid: Optional[str]) -> Optional[Any]:
+        """Return the public key for ``kid``; an unknown kid schedules a refresh."""
+        if self._static is not None:
+            return self._static
+        key = self._keys.get(kid)
+        if key is None:
+            self._stats["unknown_kid"] += 1
+            self._schedule_refresh()
+        return key
+
+    def _fetch(self) -> Dict[str, Any]:
+        request = urllib.request.Request(self.url, headers={"Accept": "application/json"})
+        if self._secret_key:
+            request.add_header("Authorization", f"Bearer {self._secret_key}")
+        with urllib.request.urlopen(request, timeout=_FETCH_TIMEOUT) as resp:
+            document = json.loads(resp.read())
+        keys = {}
+        for jwk in document.get("keys", []):
+            if jwk.get("kty") == "RSA" and jwk.get("kid"):
+                keys[jwk["kid"]] = _rsa_algorithm().from_jwk(jwk)
+        return keys
+
+    def refresh(self) -> bool:
+        """Fetch the key set (blocking). Keeps the previous keys on failure."""
+        if self._static is not None or not self.url:
+            return True
+        with self._lock:
+            self._last_attempt = time.monotonic()
+        try:
+            keys = self._fetch()
+        except Exception as e:
+            self._stats["failed_refreshes"] += 1
+            logger.warning("Failed to refresh Clerk JWKS from %s: %s", self.url, e)
+            return False
+        if not keys:
+            self._stats["failed_refreshes"] += 1
+            logger.warning("Clerk JWKS from %s contained no RSA keys", self.url)
+            return False
+        self._keys = keys
+        self._stats["refreshes"] += 1
+        self._stats["last_refresh"] = time.time()
+        return True
+
+    def _schedule_refresh(self) -> None:
+        with self._lock:
+            if self._pending is not None and not self._pending.done():
+                return
+            if time.monotonic() - self._last_attempt < self.min_refresh_interval:
+                return
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return
+            self._last_attempt = time.monotonic()
+            self._pending = loop.create_task(run_in_threadpool(self.refresh))
+
+    async def start(self) -> None:
+        """Load the keys and start the periodic refresh on the running event loop."""
+        if self._task is not None or self._static is not None or not self.url:
+            return
+        await run_in_threadpool(self.refresh)
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await run_in_threadpool(self.refresh)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self._stats,
+            "source": "static" if self._static is not None else self.url,
+            "keys": 1 if self._static is not None else len(self._keys),
+        }
+
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified tokens, each kept until its ``exp``."""
+
+    def __init__(self, max_size: int = CLERK_TOKEN_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    def get(self, token: str, now: float) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            expires_at, claims = entry
+            if now >= expires_at:
+                del self._entries[token]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(token)
+            self._stats["hits"] += 1
+            return claims
+
+    def put(self, token: str, expires_at: float, claims: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[token] = (expires_at, claims)
+            self._entries.move_to_end(token)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats.update(
+                size=len(self._entries),
+                max_size=self.max_size,
+                hit_rate=round(stats["hits"] / lookups, 4) if lookups else 0.0,
+            )
+            return stats
+
+
+class ClerkVerifier:
+    """Verifies Clerk session tokens against cached keys."""
+
+    def __init__(
+        self,
+        jwks: Optional[JWKSCache] = None,
+        tokens: Optional[VerifiedTokenCache] = None,
+        authorized_parties: Optional[List[str]] = None,
+        leeway: float = CLERK_JWT_LEEWAY,
+    ):
+        self.jwks = jwks or JWKSCache()
+        self.tokens = tokens or VerifiedTokenCache()
+        self.authorized_parties = CLERK_AUTHORIZED_PARTIES if authorized_parties is None else authorized_parties
+        self.leeway = leeway
+
+    @property
+    def configured(self) -> bool:
+        return _has_jwt and self.jwks.configured
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token's claims.
+
+        Raises:
+            AuthError: If the token isn't a valid, unexpired Clerk session token
+        """
+        now = time.time()
+        claims = self.tokens.get(token, now)
+        if claims is not None:
+            return claims
+
+        jwt = optional_module("jwt")
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError:
+            raise AuthError("Malformed token")
+        if header.get("alg") not in _ALGORITHMS:
+            raise AuthError("Unsupported token algorithm")
+        key = self.jwks.get(header.get("kid"))
+        if key is None:
+            raise AuthError("Unknown signing key")
+        try:
+            claims = jwt.decode(
+                token, key, algorithms=_ALGORITHMS, leeway=self.leeway,
+                options={"require": ["exp", "iat", "sub"], "verify_aud": False},
+            )
+        except jwt.PyJWTError as e:
+            raise AuthError(f"Invalid token: {e}")
+        if self.authorized_parties and claims.get("azp") not in self.authorized_parties:
+            raise AuthError("Token issued for an unauthorized party")
+
+        self.tokens.put(token, claims["exp"] + self.leeway, claims)
+        return claims
+
+    def stats(self) -> Dict[str, Any]:
+        return {"configured": self.configured, "jwks": self.jwks.stats(), "tokens": self.tokens.stats()}
+
+
+_verifier: Optional[ClerkVerifier] = None
+_verifier_lock = threading.Lock()
+
+
+def get_clerk_verifier() -> ClerkVerifier:
+    """Return the process-wide token verifier."""
+    global _verifier
+    if _verifier is None:
+        with _verifier_lock:
+            if _verifier is None:
+                if not _has_jwt:
+                    logger.warning("PyJWT is not installed; Clerk token verification is disabled")
+                _verifier = ClerkVerifier()
+    return _verifier
@@ -0,0 +1,288 @@
+"""
+Offline "curated match" for AI prompts.
+
+Many prompts sent to ``/api/ai/generate`` only ask for a roadmap the curated
+catalog (``data/roadmaps.json`` + ``docs/roadmaps/*.md``) already covers.
+This module vectorizes the catalog once as TF-IDF weighted character n-grams
+(NumPy arrays) and scores an incoming prompt against every entry with a
+single gather and matrix-vector product. When the best match is confident
+enough, and the prompt is only a request for that roadmap, the caller
+answers from a precomputed ``AIResponse``-shaped record instead of calling
+the model.
+
+The intent check keeps surface-similar questions away from canned answers:
+every word of the prompt must be request phrasing ("how do I become",
+"roadmap for") or name the matched entry (its title, id or tags, allowing
+typos). "How do I move from frontend to backend?" or "Compare React and Vue
+for frontend" leave words over and go to the model.
+"""
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from difflib import SequenceMatcher
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote_plus
+
+try:
+    import numpy as np
+    _has_numpy = True
+except ImportError:
+    np = None
+    _has_numpy = False
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+DATA_DIR = BASE_DIR / "data"
+DOCS_DIR = BASE_DIR / "docs" / "roadmaps"
+
+CURATED_MATCH_ENABLED = os.getenv("CURATED_MATCH_ENABLED", "1") == "1"
+# Minimum cosine similarity for the best entry
+CURATED_MATCH_THRESHOLD = float(os.getenv("CURATED_MATCH_THRESHOLD", "0.45"))
+# Minimum lead of the best entry over the runner-up, to avoid ambiguous answers
+CURATED_MATCH_MARGIN = float(os.getenv("CURATED_MATCH_MARGIN", "0.1"))
+# Looser threshold (and no margin) used when generation is shed under load:
+# the closest curated roadmap beats no answer
+CURATED_MATCH_SHED_THRESHOLD = float(os.getenv("CURATED_MATCH_SHED_THRESHOLD", "0.25"))
+
+NGRAM_SIZES = (3, 4)
+
+_TOKEN_RE = re.compile(r"[a-z0-9+#]+")
+
+# Words that carry no signal about *which* roadmap a prompt asks for
+_QUERY_STOPWORDS = frozenset("""
+    a an the for to of in on and or me my i im want need how do become becoming
+    give generate create show make please roadmap roadmaps path career careers
+    guide plan learning learn comprehensive complete what is as be with
+    developer engineer developers engineers development engineering
+    get getting into start started starting beginner beginners steps step
+    would like can should i'm am are there about tell
+""".split())
+
+# Minimum similarity for a misspelled word to count as naming the entry
+_TYPO_SIMILARITY = 0.8
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _ngrams(tokens: List[str]) -> Counter:
+    counts: Counter = Counter()
+    for token in tokens:
+        padded = f" {token} "
+        for n in NGRAM_SIZES:
+            for i in range(len(padded) - n + 1):
+                counts[padded[i:i + n]] += 1
+    return counts
+
+
+def _doc_sections(doc: str) -> Tuple[List[str], List[str]]:
+    """Split a roadmap doc into prose paragraphs and bullet-list topics."""
+    paragraphs: List[str] = []
+    topics: List[str] = []
+    for line in doc.splitlines():
+        line = line.strip()
+        if not line or line.startswith("#") or line.lower().startswith("source:"):
+            continue
+        if line.startswith(("- ", "* ")):
+            topics.append(line[2:].strip())
+        else:
+            paragraphs.append(line)
+    return paragraphs, topics
+
+
+def build_record(item: Dict[str, Any], doc: str) -> Dict[str, Any]:
+    """Build an ``AIResponse``-shaped answer from a curated catalog entry."""
+    title = item.get("title") or item.get("id")
+    paragraphs, topics = _doc_sections(doc)
+
+    explanation = " ".join(paragraphs) or item.get("summary") or ""
+    if topics:
+        explanation += "\n\nCore topics: " + "; ".join(topics) + "."
+
+    resources = []
+    if item.get("source"):
+        resources.append({"title": f"{title} Roadmap", "url": item["source"], "type": "article"})
+    resources.append({
+        "title": f"{title} video courses",
+        "url": "https://www.youtube.com/results?search_query=" + quote_plus(f"{title} roadmap"),
+        "type": "youtube",
+    })
+
+    return {
+        "title": title,
+        "explanation": explanation,
+        "average_salary": item.get("average_salary") or "Varies by region and seniority",
+        "job_openings": item.get("job_openings") or "Steady demand; check current listings in your region",
+        "youtube_video_recommendation": "https://www.youtube.com/results?search_query="
+                                        + quote_plus(f"{title} career"),
+        "learning_resources": resources,
+        "source": "curated",
+    }
+
+
+class CuratedMatcher:
+    """TF-IDF character n-gram matcher over the curated catalog."""
+
+    def __init__(self, entries: List[Tuple[Dict[str, Any], str]]):
+        """
+        Args:
+            entries: ``(catalog item, doc markdown)`` pairs
+        """
+        self.records = [build_record(item, doc) for item, doc in entries]
+
+        doc_counts = []
+        self._names: List[frozenset] = []
+        for item, doc in entries:
+            # title, id and tags only: summaries and docs mention neighbouring
+            # roadmaps ("frontend and backend") and blur the match
+            text = " ".join(
+                [item.get("title") or ""] * 2
+                + [str(item.get("id") or "").replace("-", " ")]
+                + [str(tag).replace("-", " ") for tag in item.get("tags") or []]
+            )
+            tokens = _tokens(text)
+            doc_counts.append(_ngrams(tokens))
+            self._names.append(frozenset(tokens))
+
+        vocab: Dict[str, int] = {}
+        df: Counter = Counter()
+        for counts in doc_counts:
+            df.update(counts.keys())
+            for gram in counts:
+                vocab.setdefault(gram, len(vocab))
+
+        n_docs = len(entries)
+        self._vocab = vocab
+        self._idf = np.ones(len(vocab), dtype=np.float32)
+        for gram, col in vocab.items():
+            self._idf[col] = math.log((1 + n_docs) / (1 + df[gram])) + 1
+        # unseen n-grams are as rare as they get
+        self._oov_idf = math.log(1 + n_docs) + 1
+
+        matrix = np.zeros((n_docs, len(vocab)), dtype=np.float32)
+        for row, counts in enumerate(doc_counts):
+            for gram, tf in counts.items():
+                matrix[row, vocab[gram]] = 1 + math.log(tf)
+        matrix *= self._idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        # column-major so a prompt's n-gram columns are gathered contiguously
+        self._matrix = np.asfortranarray(matrix / norms)
+
+    def scores(self, prompt: str) -> "np.ndarray":
+        """Return the cosine similarity of ``prompt`` to every catalog entry."""
+        tokens = [t for t in _tokens(prompt) if t not in _QUERY_STOPWORDS]
+        counts = _ngrams(tokens)
+        if not counts:
+            return np.zeros(len(self.records), dtype=np.float32)
+
+        cols, weights = [], []
+        oov_sq = 0.0
+        for gram, tf in counts.items():
+            w = 1 + math.log(tf)
+            col = self._vocab.get(gram)
+            if col is None:
+                oov_sq += (w * self._oov_idf) ** 2
+            else:
+                cols.append(col)
+                weights.append(w)
+        if not cols:
+            return np.zeros(len(self.records), dtype=np.float32)
+
+        q = np.asarray(weights, dtype=np.float32) * self._idf[cols]
+        norm = math.sqrt(float(q @ q) + oov_sq)
+        return (self._matrix[:, cols] @ q) / norm
+
+    def is_request_for(self, prompt: str, row: int) -> bool:
+        """Whether ``prompt`` only asks for the roadmap of entry ``row``.
+
+        True when every word is request phrasing or names the entry (its
+        title, id or tags, allowing typos); anything else means the prompt
+        asks a different question about the career.
+        """
+        names = self._names[row]
+        for token in _tokens(prompt):
+            if token in _QUERY_STOPWORDS or token in names:
+                continue
+            if len(token) >= 4 and any(
+                SequenceMatcher(None, token, name).ratio() >= _TYPO_SIMILARITY for name in names
+            ):
+                continue
+            return False
+        return True
+
+    def match(
+        self,
+        prompt: str,
+        threshold: float = CURATED_MATCH_THRESHOLD,
+        margin: float = CURATED_MATCH_MARGIN,
+    ) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return ``(record, score)`` for a confident match of a roadmap request, else None."""
+        if not self.records:
+            return None
+        scores = self.scores(prompt)
+        best = int(scores.argmax())
+        top = float(scores[best])
+        runner_up = float(np.partition(scores, -2)[-2]) if len(scores) > 1 else 0.0
+        if top < threshold or top - runner_up < margin:
+            return None
+        if not self.is_request_for(prompt, best):
+            return None
+        return self.records[best], top
+
+
+@lru_cache(maxsize=1)
+def get_matcher() -> Optional[CuratedMatcher]:
+    """Build the matcher from the curated catalog once per process.
+
+    Returns None when NumPy is unavailable or the catalog can't be loaded.
+    """
+    if not _has_numpy:
+        logger.warning("numpy is not installed; curated matching is disabled")
+        return None
+    try:
+        with open(DATA_DIR / "roadmaps.json", "r", encoding="utf-8") as f:
+            metadata = json.load(f)
+    except Exception as e:
+        logger.warning("Failed to load catalog for curated matching: %s", e)
+        return None
+
+    entries = []
+    for item in metadata:
+        doc_file = DOCS_DIR / Path(item.get("doc") or f"{item.get('id')}.md").name
+        try:
+            doc = doc_file.read_text(encoding="utf-8")
+        except OSError:
+            doc = ""
+        entries.append((item, doc))
+    return CuratedMatcher(entries)
+
+
+def match_prompt(prompt: str, relaxed: bool = False) -> Optional[Dict[str, Any]]:
+    """Return a curated ``AIResponse`` record for ``prompt``, or None to use the model.
+
+    With ``relaxed`` (generation was shed), the best entry above
+    ``CURATED_MATCH_SHED_THRESHOLD`` is accepted even if it isn't a clear
+    winner. Either way the prompt must be a request for that roadmap.
+    """
+    if not CURATED_MATCH_ENABLED:
+        return None
+    matcher = get_matcher()
+    if matcher is None:
+        return None
+    if relaxed:
+        result = matcher.match(prompt, threshold=CURATED_MATCH_SHED_THRESHOLD, margin=0.0)
+    else:
+        result = matcher.match(prompt)
+    if result is None:
+        return None
+    record, score = result
+    logger.debug("Curated match %s (score %.3f)", record["title"], score)
+    return record
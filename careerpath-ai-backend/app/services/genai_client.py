@@ -0,0 +1,147 @@
+"""
+Process-wide Google GenAI client over a shared, instrumented connection pool.
+
+One ``genai.Client`` serves every thread of the worker. It is built on an
+``httpx.Client`` we own (the SDK's client is thread-safe and pools
+connections), so generations reuse keep-alive connections instead of each
+threadpool thread paying its own TCP and TLS handshakes. HTTP/2 is used when
+the ``h2`` package is installed, multiplexing concurrent generations over
+a single connection.
+
+Every request carries an httpcore trace hook that counts requests, newly
+opened connections and TLS handshakes; ``stats()`` reports them along with
+the derived reuse rate (see ``/debug/ai-status``).
+
+Env vars:
+
+- ``GENAI_MAX_CONNECTIONS`` (default ``20``): connection limit of the pool.
+- ``GENAI_MAX_KEEPALIVE`` (default ``10``): idle connections kept open.
+- ``GENAI_KEEPALIVE_EXPIRY`` (default ``120``): seconds an idle connection is kept.
+- ``GENAI_HTTP2`` (default ``1``): negotiate HTTP/2 when ``h2`` is available.
+- ``GENAI_TIMEOUT`` (default ``60``): per-request timeout in seconds.
+"""
+import logging
+import os
+import threading
+from typing import Any, Dict, Optional
+
+from ..utils.lazy_imports import is_available, optional_module
+
+logger = logging.getLogger(__name__)
+
+GENAI_MAX_CONNECTIONS = int(os.getenv("GENAI_MAX_CONNECTIONS", "20"))
+GENAI_MAX_KEEPALIVE = int(os.getenv("GENAI_MAX_KEEPALIVE", "10"))
+GENAI_KEEPALIVE_EXPIRY = float(os.getenv("GENAI_KEEPALIVE_EXPIRY", "120"))  # seconds
+GENAI_HTTP2 = os.getenv("GENAI_HTTP2", "1") == "1"
+GENAI_TIMEOUT = float(os.getenv("GENAI_TIMEOUT", "60"))  # seconds
+
+
+class ConnectionStats:
+    """Counts requests, new connections and TLS handshakes from httpcore trace events."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = {"requests": 0, "connections_opened": 0, "tls_handshakes": 0, "failed_requests": 0}
+
+    def _incr(self, name: str) -> None:
+        with self._lock:
+            self._counts[name] += 1
+
+    def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        if event_name == "connection.connect_tcp.complete":
+            self._incr("connections_opened")
+        elif event_name == "connection.start_tls.complete":
+            self._incr("tls_handshakes")
+
+    def on_request(self, request) -> None:
+        """httpx request hook: count the request and attach the trace hook."""
+        self._incr("requests")
+        request.extensions["trace"] = self.trace
+
+    def on_response(self, response) -> None:
+        if response.status_code >= 500:
+            self._incr("failed_requests")
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+        requests = counts["requests"]
+        counts["reused_connections"] = max(0, requests - counts["connections_opened"])
+        counts["reuse_rate"] = round(counts["reused_connections"] / requests, 4) if requests else 0.0
+        return counts
+
+
+class GenAIClient:
+    """A ``genai.Client`` plus the pooled ``httpx.Client`` it sends through."""
+
+    def __init__(self, api_key: str):
+        genai = optional_module("google.genai")
+        httpx = optional_module("httpx")
+        self.http2 = GENAI_HTTP2 and is_available("h2")
+        self.connections = ConnectionStats()
+        self.http = httpx.Client(
+            http2=self.http2,
+            timeout=GENAI_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=GENAI_MAX_CONNECTIONS,
+                max_keepalive_connections=GENAI_MAX_KEEPALIVE,
+                keepalive_expiry=GENAI_KEEPALIVE_EXPIRY,
+            ),
+            event_hooks={"request": [self.connections.on_request], "response": [self.connections.on_response]},
+        )
+        self.client = genai.Client(api_key=api_key, http_options=genai.types.HttpOptions(httpx_client=self.http))
+
+    def close(self) -> None:
+        self.http.close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **self.connections.snapshot(),
+            "http2": self.http2,
+            "max_connections": GENAI_MAX_CONNECTIONS,
+            "max_keepalive": GENAI_MAX_KEEPALIVE,
+        }
+
+
+_client: Optional[GenAIClient] = None
+_client_lock = threading.Lock()
+
+
+def get_genai_client() -> GenAIClient:
+    """Return the process-wide client, creating it on first use.
+
+    ``GEMINI_API_KEY`` is read at call time (not import time), so a key set
+    after startup is picked up by the first call that finds it.
+
+    Raises:
+        ValueError: If ``GEMINI_API_KEY`` is not set
+        RuntimeError: If google-genai is not installed
+    """
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                api_key = os.getenv("GEMINI_API_KEY")
+                if not api_key:
+                    raise ValueError("GEMINI_API_KEY environment variable not set")
+                if not is_available("google.genai"):
+                    raise RuntimeError("google-genai is not installed")
+                _client = GenAIClient(api_key)
+                logger.info(
+                    "GenAI client created (http2=%s, max_connections=%d)", _client.http2, GENAI_MAX_CONNECTIONS
+                )
+    return _client
+
+
+def genai_client_stats() -> Optional[Dict[str, Any]]:
+    """Connection stats of the process-wide client, or None if it wasn't created."""
+    return _client.stats() if _client is not None else None
+
+
+def close_genai_client() -> None:
+    """Close the pooled connections. Call this on app shutdown."""
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
@@ -0,0 +1,211 @@
+"""
+Content-addressed storage for saved roadmap payloads (``career_data``).
+
+A payload is serialized as canonical JSON (sorted keys, compact separators),
+hashed with SHA-256 and stored once, zlib-compressed, in ``roadmap_payloads``.
+``roadmaps.payload_hash`` points at it, so the same generation saved by many
+users (or saved twice with keys in a different order) takes one row. Each
+payload row carries a reference count: saving increments it with a single
+upsert, deleting a roadmap decrements it and removes the row at zero.
+
+Payloads are immutable, so decoded payloads are kept in a small per-process
+LRU keyed by hash without any invalidation.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import delete, func, select, update
+
+from ..models import Roadmap, RoadmapPayload
+
+logger = logging.getLogger(__name__)
+
+ROADMAP_PAYLOAD_CACHE_SIZE = int(os.getenv("ROADMAP_PAYLOAD_CACHE_SIZE", "256"))
+ROADMAP_PAYLOAD_COMPRESS_LEVEL = int(os.getenv("ROADMAP_PAYLOAD_COMPRESS_LEVEL", "6"))
+
+
+def encode_payload(data: Dict[str, Any]) -> Tuple[str, bytes, int]:
+    """Return ``(hash, compressed blob, uncompressed size)`` for a payload."""
+    raw = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, ROADMAP_PAYLOAD_COMPRESS_LEVEL), len(raw)
+
+
+def decode_payload(blob: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(blob))
+
+
+class PayloadCache:
+    """Bounded LRU of decoded payloads. Callers must not mutate returned dicts."""
+
+    def __init__(self, max_size: int = ROADMAP_PAYLOAD_CACHE_SIZE):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, payload_hash: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            data = self._entries.get(payload_hash)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(payload_hash)
+            self.hits += 1
+            return data
+
+    def put(self, payload_hash: str, data: Dict[str, Any]) -> None:
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[payload_hash] = data
+            self._entries.move_to_end(payload_hash)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+payload_cache = PayloadCache()
+
+
+def _upsert(dialect_name: str):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    return insert
+
+
+async def put_payload(db, data: Dict[str, Any]) -> str:
+    """Store a payload (or take another reference to it) and return its hash.
+
+    Runs in the caller's transaction; the caller commits.
+    """
+    payload_hash, blob, size = encode_payload(data)
+    insert = _upsert(db.bind.dialect.name)
+    stmt = insert(RoadmapPayload).values(hash=payload_hash, data=blob, size=size, refcount=1)
+    # a single statement, so concurrent saves of the same content can't race
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RoadmapPayload.hash],
+        set_={"refcount": RoadmapPayload.refcount + 1},
+    )
+    await db.execute(stmt)
+    payload_cache.put(payload_hash, data)
+    return payload_hash
+
+
+def put_payloads(db, payloads: List[Dict[str, Any]]) -> List[str]:
+    """Bulk version of ``put_payload`` for a synchronous session.
+
+    One executemany upsert with a row per distinct payload, taking as many
+    references as the batch holds copies. A statement must not hit the same
+    row twice (PostgreSQL rejects "ON CONFLICT DO UPDATE command cannot
+    affect row a second time"), so duplicates are grouped first. Returns
+    the hashes in input order.
+    """
+    if not payloads:
+        return []
+    encoded = [encode_payload(data) for data in payloads]
+    rows: Dict[str, Dict[str, Any]] = {}
+    now = datetime.utcnow()
+    for h, blob, size in encoded:
+        if h in rows:
+            rows[h]["refcount"] += 1
+        else:
+            rows[h] = {"hash": h, "data": blob, "size": size, "refcount": 1, "created_at": now}
+    insert = _upsert(db.get_bind().dialect.name)
+    stmt = insert(RoadmapPayload)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RoadmapPayload.hash],
+        set_={"refcount": RoadmapPayload.refcount + stmt.excluded.refcount},
+    )
+    # a fixed row order keeps concurrent flushes from deadlocking on each other
+    db.execute(stmt, [rows[h] for h in sorted(rows)])
+    for (h, _, _), data in zip(encoded, payloads):
+        payload_cache.put(h, data)
+    return [h for h, _, _ in encoded]
+
+
+async def release_payload(db, payload_hash: Optional[str]) -> None:
+    """Drop one reference to a payload, deleting it when none remain."""
+    if payload_hash is None:
+        return
+    await db.execute(
+        update(RoadmapPayload)
+        .where(RoadmapPayload.hash == payload_hash)
+        .values(refcount=RoadmapPayload.refcount - 1)
+    )
+    await db.execute(
+        delete(RoadmapPayload).where(RoadmapPayload.hash == payload_hash, RoadmapPayload.refcount <= 0)
+    )
+
+
+async def load_payload(db, payload_hash: str) -> Optional[Dict[str, Any]]:
+    """Return a decoded payload, from the LRU when possible."""
+    data = payload_cache.get(payload_hash)
+    if data is not None:
+        return data
+    blob = await db.scalar(select(RoadmapPayload.data).where(RoadmapPayload.hash == payload_hash))
+    if blob is None:
+        return None
+    data = decode_payload(blob)
+    payload_cache.put(payload_hash, data)
+    return data
+
+
+async def career_data_for(db, roadmap: Roadmap) -> Dict[str, Any]:
+    """Return a roadmap's career_data, whether stored inline or by hash."""
+    if roadmap.payload_hash is None:
+        return roadmap.career_data or {}
+    data = await load_payload(db, roadmap.payload_hash)
+    if data is None:
+        logger.error("Roadmap %s references missing payload %s", roadmap.id, roadmap.payload_hash)
+        return {}
+    return data
+
+
+def recount_payloads(db) -> Dict[str, int]:
+    """Recompute reference counts from ``roadmaps`` and delete unreferenced payloads.
+
+    Reference counts drift when roadmaps are removed without going through
+    ``release_payload`` (e.g. a user deleted with ``ON DELETE CASCADE``).
+    Takes a synchronous session; the caller commits.
+    """
+    refs = (
+        select(func.count(Roadmap.id))
+        .where(Roadmap.payload_hash == RoadmapPayload.hash)
+        .scalar_subquery()
+    )
+    updated = db.execute(update(RoadmapPayload).values(refcount=refs)).rowcount
+    deleted = db.execute(delete(RoadmapPayload).where(RoadmapPayload.refcount <= 0)).rowcount
+    return {"payloads": updated, "deleted": deleted}
+
+
+def payload_storage_stats(db) -> Dict[str, Any]:
+    """Row count, raw vs. compressed bytes and references for the payload table (sync session)."""
+    count, raw, stored, refs = db.execute(
+        select(
+            func.count(RoadmapPayload.hash),
+            func.coalesce(func.sum(RoadmapPayload.size), 0),
+            func.coalesce(func.sum(func.length(RoadmapPayload.data)), 0),
+            func.coalesce(func.sum(RoadmapPayload.refcount), 0),
+        )
+    ).one()
+    return {"payloads": count, "references": refs, "raw_bytes": raw, "stored_bytes": stored}
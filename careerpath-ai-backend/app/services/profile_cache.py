@@ -0,0 +1,195 @@
+"""
+Read-through cache in front of the profile store.
+
+Each worker keeps a bounded LRU of serialized ``GET /api/users/{id}``
+response bodies, so a hit is a dict lookup plus sending ready-made bytes.
+Writes only invalidate; the next read loads the stored body and fills the
+cache.
+
+Workers on the same host invalidate each other through a shared version
+table: a small mmapped file of 64-bit counters, one slot per hash bucket of
+user ids. A write bumps the user's slot; a cached entry is only served while
+the slot still holds the version it was read at. Checking costs one memory
+read and no syscall. Slot collisions merely cause an extra miss. A TTL
+bounds staleness for writers the counters can't see (e.g. another host
+writing to a shared database).
+"""
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+PROFILE_CACHE_ENABLED = os.getenv("PROFILE_CACHE_ENABLED", "1") == "1"
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+PROFILE_CACHE_VERSION_FILE = Path(os.getenv(
+    "PROFILE_CACHE_VERSION_FILE",
+    str(Path(__file__).resolve().parents[2] / "data" / ".profile_versions"),
+))
+PROFILE_CACHE_VERSION_SLOTS = int(os.getenv("PROFILE_CACHE_VERSION_SLOTS", "65536"))
+
+_SLOT = struct.Struct("<Q")
+
+
+class VersionTable:
+    """Per-bucket version counters shared by all processes on the host."""
+
+    def __init__(self, path: Path, slots: int):
+        self.slots = slots
+        self._local: Optional[Dict[int, int]] = None
+        self._fd = -1
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+            size = slots * _SLOT.size
+            if os.fstat(self._fd).st_size < size:
+                os.ftruncate(self._fd, size)
+            self._mm = mmap.mmap(self._fd, size)
+        except OSError as e:
+            logger.warning(
+                "Shared profile version table unavailable (%s); invalidation is per-process only", e
+            )
+            self._local = {}
+
+    def _slot(self, user_id: str) -> int:
+        return zlib.crc32(user_id.encode("utf-8")) % self.slots
+
+    def get(self, user_id: str) -> int:
+        slot = self._slot(user_id)
+        if self._local is not None:
+            return self._local.get(slot, 0)
+        return _SLOT.unpack_from(self._mm, slot * _SLOT.size)[0]
+
+    def bump(self, user_id: str) -> int:
+        """Increment the user's version and return the new value."""
+        slot = self._slot(user_id)
+        if self._local is not None:
+            self._local[slot] = self._local.get(slot, 0) + 1
+            return self._local[slot]
+        offset = slot * _SLOT.size
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, _SLOT.size, offset)
+        try:
+            version = _SLOT.unpack_from(self._mm, offset)[0] + 1
+            _SLOT.pack_into(self._mm, offset, version)
+        finally:
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, _SLOT.size, offset)
+        return version
+
+
+class ProfileCache:
+    """Bounded LRU of serialized profile responses, validated against ``VersionTable``."""
+
+    def __init__(self, versions: VersionTable, max_size: int = PROFILE_CACHE_SIZE, ttl: float = PROFILE_CACHE_TTL):
+        self.versions = versions
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[int, float, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "stale": 0,      # dropped because another writer bumped the version
+            "expired": 0,    # dropped because the TTL elapsed
+            "evictions": 0,
+            "writes": 0,
+        }
+        self._hit_age_total = 0.0
+        self._hit_age_max = 0.0
+
+    def get(self, user_id: str) -> Optional[bytes]:
+        """Return the cached response body if it is still current."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            version, stored_at, body = entry
+            if version != self.versions.get(user_id):
+                del self._entries[user_id]
+                self._stats["stale"] += 1
+                self._stats["misses"] += 1
+                return None
+            age = now - stored_at
+            if age >= self.ttl:
+                del self._entries[user_id]
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self._stats["hits"] += 1
+            self._hit_age_total += age
+            self._hit_age_max = max(self._hit_age_max, age)
+            return body
+
+    def version(self, user_id: str) -> int:
+        """Read the current version; call before loading from the store."""
+        return self.versions.get(user_id)
+
+    def fill(self, user_id: str, body: bytes, version: int) -> None:
+        """Store a body loaded from the store at ``version``."""
+        with self._lock:
+            self._entries[user_id] = (version, time.monotonic(), body)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, user_id: str) -> None:
+        """Record a completed store write: invalidate the user's entry in every worker.
+
+        Call after the store write has finished. The written body is not
+        cached: with concurrent writers the request that bumps last need
+        not be the one that wrote last, so only a read issued after the
+        bump knows what the store holds. Any fill that read its version
+        before the bump is stored under the old version and never served.
+        """
+        self.versions.bump(user_id)
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._stats["writes"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            lookups = stats["hits"] + stats["misses"]
+            stats.update(
+                size=len(self._entries),
+                max_size=self.max_size,
+                ttl_seconds=self.ttl,
+                hit_rate=round(stats["hits"] / lookups, 4) if lookups else 0.0,
+                avg_hit_age_seconds=round(self._hit_age_total / stats["hits"], 3) if stats["hits"] else 0.0,
+                max_hit_age_seconds=round(self._hit_age_max, 3),
+            )
+            return stats
+
+
+_cache: Optional[ProfileCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_profile_cache() -> Optional[ProfileCache]:
+    """Return the process-wide profile cache, or None when disabled."""
+    global _cache
+    if not PROFILE_CACHE_ENABLED:
+        return None
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ProfileCache(VersionTable(PROFILE_CACHE_VERSION_FILE, PROFILE_CACHE_VERSION_SLOTS))
+    return _cache
@@ -0,0 +1,265 @@
+"""
+Pluggable storage for user profiles.
+
+``ProfileStore`` is the interface used by ``app/routes/users.py``. Two
+backends are provided:
+
+- ``SQLProfileStore``: one ``Profile`` row per ``User`` (SQLite locally,
+  PostgreSQL in production, whatever ``DATABASE_URL`` points at).
+- ``ShardedFileProfileStore``: one JSON document per user, spread over a
+  two-level hashed directory tree and written atomically (temp file +
+  ``os.replace``), so concurrent writers never produce torn files. It still
+  reads the legacy flat ``data/users/{user_id}.json`` layout and migrates
+  those files on their next write.
+
+Store methods are blocking; async callers use the ``aget``/``aput``
+wrappers, which run them in the threadpool instead of on the event loop.
+
+Select a backend with ``PROFILE_STORE=file|sql`` (default ``file``).
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+PROFILE_STORE = os.getenv("PROFILE_STORE", "file")
+PROFILE_DATA_DIR = Path(os.getenv(
+    "PROFILE_DATA_DIR",
+    str(Path(__file__).resolve().parents[2] / "data" / "users"),
+))
+
+# Clerk ids look like "user_2abc..."; anything else could escape the data dir
+_USER_ID_RE = re.compile(r"^[A-Za-z0-9_\-]{1,255}$")
+
+
+class InvalidUserId(ValueError):
+    """Raised when a user id is not safe to use as a storage key."""
+
+
+def validate_user_id(user_id: str) -> str:
+    if not _USER_ID_RE.match(user_id):
+        raise InvalidUserId(f"Invalid user id: {user_id[:50]!r}")
+    return user_id
+
+
+class ProfileStore(ABC):
+    """Interface for profile storage backends."""
+
+    name = "abstract"
+
+    @abstractmethod
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """Return the stored profile, or None if the user has none."""
+
+    @abstractmethod
+    def put(self, user_id: str, profile: Dict[str, Any]) -> None:
+        """Create or replace a user's profile."""
+
+    @abstractmethod
+    def iter_profiles(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """Yield ``(user_id, profile)`` for every stored profile."""
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return stored profiles for ``user_ids``; users without one are omitted."""
+        found = {}
+        for user_id in user_ids:
+            profile = self.get(user_id)
+            if profile is not None:
+                found[user_id] = profile
+        return found
+
+    def recent_user_ids(self, limit: int) -> List[str]:
+        """Return up to ``limit`` users whose profiles changed most recently.
+
+        Used to prefill caches at startup; backends without a cheap recency
+        order return nothing.
+        """
+        return []
+
+    async def aget(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await run_in_threadpool(self.get, user_id)
+
+    async def aput(self, user_id: str, profile: Dict[str, Any]) -> None:
+        await run_in_threadpool(self.put, user_id, profile)
+
+    async def aget_many(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        return await run_in_threadpool(self.get_many, list(user_ids))
+
+
+class ShardedFileProfileStore(ProfileStore):
+    """JSON documents under ``root/ab/cd/{user_id}.json`` with atomic writes."""
+
+    name = "file"
+
+    def __init__(self, root: Path = PROFILE_DATA_DIR):
+        self.root = Path(root)
+
+    def _path(self, user_id: str) -> Path:
+        digest = hashlib.sha1(user_id.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / digest[2:4] / f"{user_id}.json"
+
+    def _legacy_path(self, user_id: str) -> Path:
+        return self.root / f"{user_id}.json"
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        validate_user_id(user_id)
+        for path in (self._path(user_id), self._legacy_path(user_id)):
+            try:
+                return json.loads(path.read_bytes())
+            except FileNotFoundError:
+                continue
+        return None
+
+    def put(self, user_id: str, profile: Dict[str, Any]) -> None:
+        validate_user_id(user_id)
+        path = self._path(user_id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(profile, indent=2).encode("utf-8"))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, path)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+        # the sharded copy now wins; drop the legacy flat file if there was one
+        try:
+            self._legacy_path(user_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        try:
+            return json.loads(Path(path).read_bytes())
+        except FileNotFoundError:
+            # removed by a concurrent write (legacy file migrated)
+            return None
+
+    def iter_profiles(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        if not self.root.exists():
+            return
+        seen = set()
+        for shard in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            for sub in sorted(p for p in shard.iterdir() if p.is_dir()):
+                with os.scandir(sub) as entries:
+                    for entry in entries:
+                        if entry.name.endswith(".json") and not entry.name.startswith("."):
+                            user_id = entry.name[:-5]
+                            seen.add(user_id)
+                            profile = self._read(entry.path)
+                            if profile is not None:
+                                yield user_id, profile
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".json"):
+                    user_id = entry.name[:-5]
+                    profile = None if user_id in seen else self._read(entry.path)
+                    if profile is not None:
+                        yield user_id, profile
+
+
+class SQLProfileStore(ProfileStore):
+    """Profiles stored as ``Profile`` rows attached to ``User`` (looked up by Clerk id)."""
+
+    name = "sql"
+
+    def __init__(self, session_factory=None):
+        if session_factory is None:
+            from ..database import SessionLocal
+            session_factory = SessionLocal
+        self._session_factory = session_factory
+
+    def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        from ..models import Profile, User
+
+        validate_user_id(user_id)
+        with self._session_factory() as db:
+            return db.query(Profile.data).join(User).filter(User.clerk_id == user_id).scalar()
+
+    def get_many(self, user_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        from ..models import Profile, User
+
+        user_ids = [validate_user_id(u) for u in user_ids]
+        found = {}
+        with self._session_factory() as db:
+            for i in range(0, len(user_ids), 500):
+                rows = (
+                    db.query(User.clerk_id, Profile.data)
+                    .join(Profile)
+                    .filter(User.clerk_id.in_(user_ids[i:i + 500]))
+                )
+                found.update(rows)
+        return found
+
+    def recent_user_ids(self, limit: int) -> List[str]:
+        from ..models import Profile, User
+
+        with self._session_factory() as db:
+            rows = db.query(User.clerk_id).join(Profile).order_by(Profile.updated_at.desc()).limit(limit)
+            return [clerk_id for clerk_id, in rows]
+
+    def put(self, user_id: str, profile: Dict[str, Any]) -> None:
+        from sqlalchemy.exc import IntegrityError
+        from ..models import Profile, User
+
+        validate_user_id(user_id)
+        # a concurrent first write for the same user can race on the unique
+        # clerk_id / user_id constraints; the retry then updates the winner's row
+        for attempt in range(2):
+            with self._session_factory() as db:
+                try:
+                    user = db.query(User).filter(User.clerk_id == user_id).one_or_none()
+                    if user is None:
+                        user = User(clerk_id=user_id)
+                        db.add(user)
+                    if user.profile is None:
+                        user.profile = Profile(data=profile)
+                    else:
+                        user.profile.data = profile
+                    db.commit()
+                    return
+                except IntegrityError:
+                    db.rollback()
+                    if attempt:
+                        raise
+
+    def iter_profiles(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        from ..models import Profile, User
+
+        with self._session_factory() as db:
+            rows = db.query(User.clerk_id, Profile.data).join(Profile).order_by(User.id).yield_per(500)
+            for clerk_id, data in rows:
+                yield clerk_id, data
+
+
+def create_profile_store(kind: str = PROFILE_STORE) -> ProfileStore:
+    """Instantiate a profile store backend by name (``file`` or ``sql``)."""
+    if kind == "file":
+        return ShardedFileProfileStore()
+    if kind == "sql":
+        return SQLProfileStore()
+    raise ValueError(f"Unknown PROFILE_STORE backend: {kind}")
+
+
+@lru_cache(maxsize=1)
+def get_profile_store() -> ProfileStore:
+    """Return the process-wide profile store configured by ``PROFILE_STORE``."""
+    store = create_profile_store()
+    logger.info("Using %s profile store", store.name)
+    return store
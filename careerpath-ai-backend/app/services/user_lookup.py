@@ -0,0 +1,49 @@
+"""
+Map Clerk user ids (used in API paths) to ``users.id`` primary keys.
+
+Roadmaps and chat messages reference ``users.id``; per-user list endpoints
+resolve the id once per request and then filter on it, which is what the
+``(user_id, ...)`` indexes serve.
+"""
+from typing import Optional
+
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from ..models import User
+from .profile_store import InvalidUserId, validate_user_id
+
+
+async def get_user_pk(db, clerk_id: str, create: bool = False) -> Optional[int]:
+    """Return the ``users.id`` for a Clerk id.
+
+    Args:
+        db: Async database session
+        clerk_id: Clerk user id from the request path
+        create: Insert the user if it doesn't exist yet
+
+    Returns:
+        The primary key, or None if the user doesn't exist and ``create`` is False
+
+    Raises:
+        HTTPException: 400 if the id is malformed
+    """
+    try:
+        validate_user_id(clerk_id)
+    except InvalidUserId:
+        raise HTTPException(status_code=400, detail="Invalid user id")
+
+    user_pk = await db.scalar(select(User.id).where(User.clerk_id == clerk_id))
+    if user_pk is not None or not create:
+        return user_pk
+
+    user = User(clerk_id=clerk_id)
+    db.add(user)
+    try:
+        await db.flush()
+    except IntegrityError:
+        # created concurrently by another request
+        await db.rollback()
+        return await db.scalar(select(User.id).where(User.clerk_id == clerk_id))
+    return user.id
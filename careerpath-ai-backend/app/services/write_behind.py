@@ -0,0 +1,403 @@
+"""
+Write-behind persistence for chat turns and saved generations.
+
+``/api/ai/generate`` must not wait on the database, so the request only
+appends records to an in-memory buffer. A background task flushes the
+buffer in bulk (one ``executemany`` per table) once it holds
+``WRITE_BEHIND_BATCH_SIZE`` records or every ``WRITE_BEHIND_INTERVAL``
+seconds, whichever comes first, and drains it on shutdown.
+
+Records carry Clerk user ids; each flush resolves them to ``users.id`` with
+one query (creating missing users), so the request path never touches the
+database. The buffer is bounded: when the database is down long enough to
+fill it, new records are dropped and counted rather than growing memory.
+
+When a batch fails because of its content, it is split in halves and
+retried until the bad records are alone, so the rest of the batch is still
+written; only the records that fail on their own are charged an attempt. A
+record that has failed ``WRITE_BEHIND_MAX_ATTEMPTS`` times is given up on and
+logged as a dead letter (kind, user and time, not the content), so one bad
+record can't block the queue forever. When the database itself is
+unreachable, the batch goes back to the front of the buffer uncharged and
+the flusher backs off exponentially (up to ``WRITE_BEHIND_MAX_BACKOFF``);
+records still failing ``WRITE_BEHIND_RETRY_WINDOW`` seconds after their
+first failure are dead-lettered too. Stopping the flusher mid-write waits
+for that write to settle, so its batch is neither lost nor written twice.
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "1") == "1"
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))
+WRITE_BEHIND_INTERVAL = float(os.getenv("WRITE_BEHIND_INTERVAL", "1.0"))  # seconds
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "20000"))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5"))
+WRITE_BEHIND_MAX_BACKOFF = float(os.getenv("WRITE_BEHIND_MAX_BACKOFF", "30"))  # seconds
+# How long a record is retried after its first failure, however many flushes that takes
+WRITE_BEHIND_RETRY_WINDOW = float(os.getenv("WRITE_BEHIND_RETRY_WINDOW", "600"))  # seconds
+
+# Upper bounds of the flush batch size histogram buckets
+_BATCH_BUCKETS = (1, 10, 50, 100, 500, 1000)
+
+
+def _is_outage(error: BaseException) -> bool:
+    """Whether a write failed because the database is unreachable rather than because of a record."""
+    if isinstance(error, DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (OperationalError, InterfaceError, OSError, TimeoutError))
+
+
+class WriteBehindQueue:
+    """Buffers ``ChatMessage`` and ``Roadmap`` records and writes them in bulk."""
+
+    def __init__(
+        self,
+        session_factory=None,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        interval: float = WRITE_BEHIND_INTERVAL,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+        max_attempts: int = WRITE_BEHIND_MAX_ATTEMPTS,
+        max_backoff: float = WRITE_BEHIND_MAX_BACKOFF,
+        retry_window: float = WRITE_BEHIND_RETRY_WINDOW,
+    ):
+        self._session_factory = session_factory
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.max_backoff = max_backoff
+        self.retry_window = retry_window
+        self._pending: List[Dict[str, Any]] = []
+        self._failures = 0  # consecutive failed flushes
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._stats = {
+            "enqueued": 0,
+            "written": 0,
+            "dropped": 0,
+            "dead_lettered": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "last_flush_ms": 0.0,
+        }
+        self._batch_histogram = {f"<={b}": 0 for b in _BATCH_BUCKETS}
+        self._batch_histogram[f">{_BATCH_BUCKETS[-1]}"] = 0
+
+    # ---- producers (request path) ----
+
+    def _enqueue(self, record: Dict[str, Any]) -> None:
+        if len(self._pending) >= self.max_pending:
+            self._stats["dropped"] += 1
+            return
+        self._pending.append(record)
+        self._stats["enqueued"] += 1
+        # a full batch flushes early, unless the flusher is backing off after failures
+        if len(self._pending) >= self.batch_size and self._wakeup is not None and not self._failures:
+            self._wakeup.set()
+
+    def add_chat_message(
+        self,
+        user_id: str,
+        role: str,
+        content: str,
+        cached: bool = False,
+        generation_time_ms: Optional[float] = None,
+        session_id: Optional[int] = None,
+    ) -> None:
+        """Queue a chat message for ``user_id`` (a Clerk id), optionally in a chat session."""
+        self._enqueue({
+            "kind": "chat",
+            "attempts": 0,
+            "clerk_id": user_id,
+            "session_id": session_id,
+            "role": role,
+            "content": content,
+            "cached": cached,
+            "generation_time_ms": int(generation_time_ms) if generation_time_ms is not None else None,
+            "timestamp": datetime.utcnow(),
+        })
+
+    def add_roadmap(self, user_id: str, title: str, career_data: Dict[str, Any], prompt: Optional[str] = None) -> None:
+        """Queue a generated roadmap to be saved for ``user_id`` (a Clerk id)."""
+        self._enqueue({
+            "kind": "roadmap",
+            "attempts": 0,
+            "clerk_id": user_id,
+            "title": title[:500],
+            "career_data": career_data,
+            "prompt": prompt,
+            "created_at": datetime.utcnow(),
+        })
+
+    # ---- consumer ----
+
+    def start(self) -> None:
+        """Start the background flusher on the running event loop."""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            "Write-behind queue started (batch_size=%d, interval=%.2fs)", self.batch_size, self.interval
+        )
+
+    async def stop(self) -> None:
+        """Stop the flusher and write everything still pending."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._pending:
+            if not await self.flush():
+                lost = len(self._pending)
+                self._pending.clear()
+                self._stats["dropped"] += lost
+                logger.error("Write-behind drain failed; %d records lost", lost)
+                break
+
+    async def _run(self) -> None:
+        while True:
+            timeout = self.interval
+            if self._failures:
+                timeout = min(self.max_backoff, self.interval * 2 ** self._failures)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            while self._pending:
+                if not await self.flush() or len(self._pending) < self.batch_size:
+                    break
+
+    async def flush(self) -> bool:
+        """Write up to one batch of pending records. Returns False if the write failed."""
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch = self._pending[:self.batch_size]
+            if not batch:
+                return True
+            del self._pending[:len(batch)]
+            start = time.perf_counter()
+            written: List[Dict[str, Any]] = []
+            failed: List[Tuple[Dict[str, Any], Exception]] = []
+            write = asyncio.ensure_future(run_in_threadpool(self._write_isolating, batch, written, failed))
+            try:
+                await asyncio.shield(write)
+            except asyncio.CancelledError:
+                # the thread keeps writing; settle the batch before giving up
+                try:
+                    await write
+                except Exception as e:
+                    self._settle(batch, written, failed, start, e)
+                else:
+                    self._settle(batch, written, failed, start)
+                raise
+            except Exception as e:
+                return self._settle(batch, written, failed, start, e)
+            return self._settle(batch, written, failed, start)
+
+    def _write_isolating(
+        self,
+        batch: List[Dict[str, Any]],
+        written: List[Dict[str, Any]],
+        failed: List[Tuple[Dict[str, Any], Exception]],
+    ) -> None:
+        """Write ``batch``, halving it on a record error until the bad records are alone.
+
+        Fills ``written`` and ``failed`` as it goes. An outage is raised
+        as-is: splitting wouldn't help, and every half would fail the same way.
+        """
+        try:
+            self._write(batch)
+        except Exception as e:
+            if _is_outage(e):
+                raise
+            if len(batch) == 1:
+                failed.append((batch[0], e))
+                return
+            mid = len(batch) // 2
+            self._write_isolating(batch[:mid], written, failed)
+            self._write_isolating(batch[mid:], written, failed)
+            return
+        written.extend(batch)
+
+    def _settle(
+        self,
+        batch: List[Dict[str, Any]],
+        written: List[Dict[str, Any]],
+        failed: List[Tuple[Dict[str, Any], Exception]],
+        start: float,
+        outage: Optional[Exception] = None,
+    ) -> bool:
+        """Account for a flush and requeue what wasn't written. Returns False if nothing got through."""
+        if written:
+            self._record_flush(len(written), (time.perf_counter() - start) * 1000)
+        if failed:
+            logger.error("Write-behind could not write %d of %d records", len(failed), len(batch))
+            for record, error in failed:
+                record["attempts"] += 1
+        if outage is not None:
+            logger.error("Write-behind flush of %d records failed: %s", len(batch), outage, exc_info=outage)
+        if outage is None and written:
+            self._requeue(failed)
+            return True
+        self._failures += 1
+        self._stats["failed_flushes"] += 1
+        done = {id(record) for record in written}
+        done.update(id(record) for record, _ in failed)
+        # records the outage kept from being tried aren't charged an attempt
+        untried = [(record, outage) for record in batch if id(record) not in done]
+        self._requeue(failed + untried)
+        return False
+
+    def _requeue(self, records: List[Tuple[Dict[str, Any], Exception]]) -> None:
+        """Put failed records back in front, minus those out of attempts, time or room."""
+        now = time.monotonic()
+        retry = []
+        for record, error in records:
+            record.setdefault("first_failure", now)
+            if record["attempts"] >= self.max_attempts or now - record["first_failure"] >= self.retry_window:
+                self._dead_letter(record, error)
+            else:
+                retry.append(record)
+        room = max(0, self.max_pending - len(self._pending))
+        if len(retry) > room:
+            self._stats["dropped"] += len(retry) - room
+            logger.error("Write-behind buffer full; dropped %d failed records", len(retry) - room)
+        self._pending[:0] = retry[:room]
+
+    def _dead_letter(self, record: Dict[str, Any], error: Exception) -> None:
+        self._stats["dead_lettered"] += 1
+        logger.error(
+            "Write-behind gave up on a %s record for user %s after %d attempts: %s",
+            record["kind"], record["clerk_id"], record["attempts"], error,
+            extra={
+                "dead_letter": {
+                    "kind": record["kind"],
+                    "clerk_id": record["clerk_id"],
+                    "session_id": record.get("session_id"),
+                    "created_at": str(record.get("timestamp") or record.get("created_at")),
+                },
+            },
+        )
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        from ..models import ChatMessage, ChatSession, Roadmap, User
+        from .payload_store import put_payloads
+
+        if self._session_factory is None:
+            from ..database import SessionLocal
+            self._session_factory = SessionLocal
+
+        with self._session_factory() as db:
+            clerk_ids = {r["clerk_id"] for r in batch}
+            user_pks = dict(db.execute(select(User.clerk_id, User.id).where(User.clerk_id.in_(clerk_ids))).all())
+            missing = clerk_ids - user_pks.keys()
+            if missing:
+                db.execute(insert(User), [{"clerk_id": c, "created_at": datetime.utcnow()} for c in missing])
+                user_pks.update(db.execute(select(User.clerk_id, User.id).where(User.clerk_id.in_(missing))).all())
+
+            chats = [r for r in batch if r["kind"] == "chat"]
+            session_ids = {r["session_id"] for r in chats if r["session_id"] is not None}
+            if session_ids:
+                # drop messages for sessions deleted while they were queued
+                live = set(db.scalars(select(ChatSession.id).where(ChatSession.id.in_(session_ids))))
+                chats = [r for r in chats if r["session_id"] is None or r["session_id"] in live]
+                last_activity = {}
+                for r in chats:
+                    if r["session_id"] is not None:
+                        last_activity[r["session_id"]] = r["timestamp"]
+                if last_activity:
+                    db.execute(update(ChatSession), [
+                        {"id": sid, "updated_at": ts} for sid, ts in last_activity.items()
+                    ])
+            if chats:
+                db.execute(insert(ChatMessage), [
+                    {
+                        "user_id": user_pks[r["clerk_id"]],
+                        "session_id": r["session_id"],
+                        "role": r["role"],
+                        "content": r["content"],
+                        "cached": r["cached"],
+                        "generation_time_ms": r["generation_time_ms"],
+                        "timestamp": r["timestamp"],
+                    }
+                    for r in chats
+                ])
+
+            roadmaps = [r for r in batch if r["kind"] == "roadmap"]
+            if roadmaps:
+                hashes = put_payloads(db, [r["career_data"] for r in roadmaps])
+                db.execute(insert(Roadmap), [
+                    {
+                        "user_id": user_pks[r["clerk_id"]],
+                        "title": r["title"],
+                        "payload_hash": payload_hash,
+                        "prompt": r["prompt"],
+                        "is_favorite": False,
+                        "created_at": r["created_at"],
+                        "updated_at": r["created_at"],
+                    }
+                    for r, payload_hash in zip(roadmaps, hashes)
+                ])
+            db.commit()
+
+    def _record_flush(self, size: int, elapsed_ms: float) -> None:
+        self._failures = 0
+        self._stats["flushes"] += 1
+        self._stats["written"] += size
+        self._stats["last_batch_size"] = size
+        self._stats["max_batch_size"] = max(self._stats["max_batch_size"], size)
+        self._stats["last_flush_ms"] = round(elapsed_ms, 2)
+        for bound in _BATCH_BUCKETS:
+            if size <= bound:
+                self._batch_histogram[f"<={bound}"] += 1
+                break
+        else:
+            self._batch_histogram[f">{_BATCH_BUCKETS[-1]}"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        stats = dict(self._stats)
+        stats.update(
+            enabled=True,
+            pending=len(self._pending),
+            batch_size=self.batch_size,
+            interval_seconds=self.interval,
+            max_pending=self.max_pending,
+            max_attempts=self.max_attempts,
+            retry_window_seconds=self.retry_window,
+            consecutive_failures=self._failures,
+            avg_batch_size=round(stats["written"] / stats["flushes"], 2) if stats["flushes"] else 0.0,
+            batch_size_histogram=dict(self._batch_histogram),
+        )
+        return stats
+
+
+_queue: Optional[WriteBehindQueue] = None
+
+
+def get_write_behind() -> Optional[WriteBehindQueue]:
+    """Return the process-wide write-behind queue, or None when disabled."""
+    global _queue
+    if not WRITE_BEHIND_ENABLED:
+        return None
+    if _queue is None:
+        _queue = WriteBehindQueue()
+    return _queue
@@ -0,0 +1,78 @@
+"""
+Sampled, structured access log.
+
+A pure ASGI middleware (no ``BaseHTTPMiddleware`` task overhead) that logs
+one ``app.access`` record per HTTP request with method, path, status,
+duration and client as ``extra`` fields, so the JSON output (see
+``logging_config.py``) can be queried directly. Only a fraction of normal
+requests is logged; slow and failed requests always are.
+
+Env vars:
+
+- ``ACCESS_LOG_SAMPLE_RATE`` (default ``0.1``): share of normal requests logged.
+- ``ACCESS_LOG_SLOW_MS`` (default ``1000``): requests at least this slow are always logged.
+- ``ACCESS_LOG_ERROR_STATUS`` (default ``500``): responses with this status or higher are always logged.
+"""
+import logging
+import os
+import random
+import time
+
+ACCESS_LOG_SAMPLE_RATE = float(os.getenv("ACCESS_LOG_SAMPLE_RATE", "0.1"))
+ACCESS_LOG_SLOW_MS = float(os.getenv("ACCESS_LOG_SLOW_MS", "1000"))
+ACCESS_LOG_ERROR_STATUS = int(os.getenv("ACCESS_LOG_ERROR_STATUS", "500"))
+
+access_logger = logging.getLogger("app.access")
+
+
+class AccessLogMiddleware:
+    def __init__(self, app, sample_rate: float = ACCESS_LOG_SAMPLE_RATE, slow_ms: float = ACCESS_LOG_SLOW_MS):
+        self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            if (
+                status >= ACCESS_LOG_ERROR_STATUS
+                or duration_ms >= self.slow_ms
+                or random.random() < self.sample_rate
+            ):
+                self._log(scope, status, duration_ms)
+
+    def _log(self, scope, status: int, duration_ms: float) -> None:
+        client = scope.get("client")
+        level = logging.WARNING if status >= ACCESS_LOG_ERROR_STATUS else logging.INFO
+        access_logger.log(
+            level,
+            "%s %s %d %.1fms",
+            scope["method"],
+            scope["path"],
+            status,
+            duration_ms,
+            extra={
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status,
+                "duration_ms": round(duration_ms, 2),
+                "client": client[0] if client else None,
+                "slow": duration_ms >= self.slow_ms,
+                "sample_rate": self.sample_rate,
+            },
+        )
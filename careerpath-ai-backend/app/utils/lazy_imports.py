@@ -0,0 +1,61 @@
+"""
+Deferred imports of heavy optional SDKs.
+
+``google.genai``, ``clerk_backend_api``, ``markdown``, ``jwt`` and ``numpy``
+are only needed by some requests, and importing them all at module load
+adds noticeably to a cold start. Modules check availability with
+``is_available`` (a ``find_spec`` lookup, no import) and import with
+``optional_module`` on first use.
+
+``STARTUP_MODE`` picks when the import cost is paid:
+
+- ``lazy`` (default): on the first request that needs the module.
+- ``eager``: in the startup event, before the worker takes traffic
+  (``warm_up``), so no request pays it.
+"""
+import importlib
+import importlib.util
+import logging
+import os
+import time
+from functools import lru_cache
+from types import ModuleType
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+STARTUP_MODE = os.getenv("STARTUP_MODE", "lazy")
+
+DEFERRED_MODULES = ("google.genai", "clerk_backend_api", "markdown", "jwt", "numpy")
+
+
+@lru_cache(maxsize=None)
+def is_available(name: str) -> bool:
+    """Whether ``name`` can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        # a missing parent package (e.g. ``google`` for ``google.genai``)
+        return False
+
+
+@lru_cache(maxsize=None)
+def optional_module(name: str) -> Optional[ModuleType]:
+    """Import ``name`` once, returning None if it isn't installed."""
+    if not is_available(name):
+        return None
+    try:
+        return importlib.import_module(name)
+    except ImportError as e:
+        logger.warning("Failed to import %s: %s", name, e)
+        return None
+
+
+def warm_up(modules: Iterable[str] = DEFERRED_MODULES) -> Dict[str, float]:
+    """Import deferred modules now; returns milliseconds spent per module."""
+    timings = {}
+    for name in modules:
+        start = time.perf_counter()
+        if optional_module(name) is not None:
+            timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    return timings
@@ -0,0 +1,69 @@
+"""
+Opaque cursors for keyset (seek) pagination.
+
+A cursor encodes the sort key of the last row of a page. The next page
+starts strictly after that key, so fetching page N costs the same as page 1
+instead of scanning and discarding N * limit rows.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(value: Any) -> str:
+    """Encode a JSON-serializable sort key as a URL-safe cursor string."""
+    raw = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Any:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        return json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def seek_newest_first(stmt, time_col, id_col, cursor: Optional[str], limit: int):
+    """Apply newest-first keyset pagination to a SQLAlchemy select.
+
+    Rows are ordered by ``(time_col, id_col)`` descending; ``id_col`` breaks
+    ties between rows with the same timestamp. With an index on
+    ``(user_id, time_col)`` the database seeks straight to the cursor
+    position. One extra row is fetched to tell whether a next page exists;
+    pass the results to ``next_page_cursor``.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed
+    """
+    from sqlalchemy import and_, or_
+
+    key = decode_cursor(cursor)
+    if key is not None:
+        try:
+            after_time, after_id = datetime.fromisoformat(key[0]), int(key[1])
+        except (TypeError, ValueError, IndexError, KeyError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        stmt = stmt.where(or_(
+            time_col < after_time,
+            and_(time_col == after_time, id_col < after_id),
+        ))
+    return stmt.order_by(time_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def next_page_cursor(rows: list, limit: int, time_attr: str) -> Tuple[list, Optional[str]]:
+    """Split the ``limit + 1`` rows fetched by ``seek_newest_first`` into (page, next cursor)."""
+    if len(rows) <= limit:
+        return rows, None
+    last = rows[limit - 1]
+    return rows[:limit], encode_cursor([getattr(last, time_attr).isoformat(), last.id])
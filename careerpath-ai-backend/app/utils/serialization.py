@@ -0,0 +1,43 @@
+"""
+JSON serialization shared by responses and pre-serialized caches.
+
+``dumps`` uses orjson when it is installed and falls back to a compact
+stdlib encoding otherwise. Every cache that stores ready-to-send bodies
+(catalog bundle, profile cache, AI response cache) serializes through it,
+and ``FastJSONResponse`` renders ad-hoc dict responses the same way, so a
+body looks the same whether it was cached or freshly produced.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+    _has_orjson = True
+except ImportError:
+    orjson = None
+    _has_orjson = False
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` to compact UTF-8 JSON."""
+    if _has_orjson:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        obj, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: Any) -> Any:
+    """Parse JSON from ``bytes``/``str``."""
+    if _has_orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(JSONResponse):
+    """``JSONResponse`` rendered with ``dumps``; the app's default response class."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -1,24 +1,72 @@
-from fastapi import HTTPException
-from clerk_backend_api import Clerk, AuthenticateRequestOptions
+from fastapi import HTTPException, Request
+from typing import Any, Dict, Optional
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+from ..services.clerk_auth import AuthError, get_clerk_verifier
 
-clerk_sdk = Clerk(bearer_auth=os.getenv("CLERK_SECRET_KEY"))
+# When set, user-scoped routes require a session token whose subject is the user in the path
+CLERK_AUTH_REQUIRED = os.getenv("CLERK_AUTH_REQUIRED", "0") == "1"
 
-def authenticate_and_get_user_details(request):
+
+def get_session_token(request: Request) -> Optional[str]:
+    """Return the Clerk session token from the Authorization header or the ``__session`` cookie."""
+    auth = request.headers.get("authorization")
+    if auth:
+        scheme, _, token = auth.partition(" ")
+        if scheme.lower() != "bearer":
+            return None
+        return token.strip() or None
+    return request.cookies.get("__session")
+
+
+def authenticate_and_get_user_details(request: Request) -> Dict[str, Any]:
+    """Verify the request's Clerk session token locally and return its user.
+
+    Verified tokens are cached until they expire, so a repeated token costs a
+    dict lookup; a new one costs one signature check against cached keys.
+
+    Raises:
+        HTTPException: 401 if the token is missing or invalid, 503 if token
+            verification isn't configured
+    """
+    verifier = get_clerk_verifier()
+    if not verifier.configured:
+        raise HTTPException(status_code=503, detail="Authentication is not configured")
+    token = get_session_token(request)
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing session token", headers={"WWW-Authenticate": "Bearer"})
     try:
-        request_state = clerk_sdk.authenticate_request(
-            request,
-            AuthenticateRequestOptions(
-                authorised_parties = ["http://localhost:5173", "http://localhost:5173"],
-                jwt_key = os.getenv("JWT_KEY")
-            )
-        )
-        if not request_state.is_signed_in:
-            raise HTTPException(status_code=500, detail="Invalid token")
-        user_id = request_state.payload.get("sub")
-        return {"user_id": user_id}
-    except Exception as e:
-        raise HTTPException(status_code = 500, detail="Invalid credentials")
\ No newline at end of file
+        claims = verifier.verify(token)
+    except AuthError as e:
+        raise HTTPException(status_code=401, detail=str(e), headers={"WWW-Authenticate": "Bearer"})
+    return {"user_id": claims["sub"], "session_id": claims.get("sid"), "claims": claims}
+
+
+async def require_user(request: Request) -> str:
+    """Dependency returning the authenticated Clerk user id."""
+    return authenticate_and_get_user_details(request)["user_id"]
+
+
+async def require_owner(user_id: str, request: Request) -> None:
+    """Dependency requiring a session token whose subject is ``user_id``, always.
+
+    For routes exposing private data (chat history), which must not fall back
+    to trusting the path the way ``authorize_user`` does when auth is off.
+
+    Raises:
+        HTTPException: 401/503 as ``authenticate_and_get_user_details``, 403
+            if the token belongs to another user
+    """
+    if authenticate_and_get_user_details(request)["user_id"] != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to access this user's data")
+
+
+async def authorize_user(user_id: str, request: Request) -> None:
+    """Dependency for ``/api/users/{user_id}/...`` routes.
+
+    A no-op unless ``CLERK_AUTH_REQUIRED=1``; then the session token's
+    subject must be ``user_id``.
+    """
+    if not CLERK_AUTH_REQUIRED:
+        return
+    await require_owner(user_id, request)
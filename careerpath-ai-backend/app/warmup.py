@@ -0,0 +1,217 @@
+"""
+Preloaded shared state and per-worker warm-up.
+
+Under gunicorn with ``preload_app`` (see ``gunicorn.conf.py``) the master
+imports the app once and calls ``preload_shared_state`` before forking, so
+read-only state is built a single time and shared copy-on-write by every
+worker:
+
+- the mmapped catalog bundle, its sync delta and browse index (or, without
+  a bundle, the metadata and the rendered docs);
+- the curated-match vectors and the compiled regexes of the answer
+  normalizer and the AI generator;
+- the deferred SDK imports (see ``utils/lazy_imports.py``).
+
+Nothing in there opens sockets or database connections; those must not be
+shared across a fork. Each worker then runs ``warm_up_worker`` from the
+startup event, before it accepts connections: a database pool ping, a
+model client handshake and a prefill of the in-process caches from the
+persistent tier. ``GET /ready`` reports 503 until it has finished, then the
+per-step timings.
+
+Env vars:
+
+- ``WARMUP_ENABLED`` (default ``1``): run the per-worker warm-up.
+- ``WARMUP_MODEL_HANDSHAKE`` (default ``1``): open the model connection
+  (only when ``GEMINI_API_KEY`` is set).
+- ``WARMUP_PREFILL_LIMIT`` (default ``100``): rows loaded per cache.
+- ``WARMUP_STEP_TIMEOUT`` (default ``10``): seconds per step; a step that
+  fails or times out is logged and skipped, it never blocks startup.
+"""
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict
+
+from fastapi import HTTPException
+from sqlalchemy import select, text
+from starlette.concurrency import run_in_threadpool
+
+from .utils.lazy_imports import STARTUP_MODE, warm_up
+
+logger = logging.getLogger(__name__)
+
+WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "1") == "1"
+WARMUP_MODEL_HANDSHAKE = os.getenv("WARMUP_MODEL_HANDSHAKE", "1") == "1"
+WARMUP_PREFILL_LIMIT = int(os.getenv("WARMUP_PREFILL_LIMIT", "100"))
+WARMUP_STEP_TIMEOUT = float(os.getenv("WARMUP_STEP_TIMEOUT", "10"))  # seconds
+
+# Set in the gunicorn master by ``preload_shared_state`` and inherited by forked workers
+_preloaded = False
+
+_state: Dict[str, Any] = {"ready": False, "report": None}
+
+
+def _elapsed_ms(start: float) -> float:
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def preload_shared_state() -> Dict[str, Any]:
+    """Build the read-only state workers share. Safe to call more than once.
+
+    Returns:
+        Milliseconds spent per part (and SDK import timings)
+    """
+    global _preloaded
+    from .routes import roadmaps
+    from .services import ai_generator, answer_normalizer, curated_match  # noqa: F401 - compiles their regexes
+
+    timings: Dict[str, Any] = {}
+
+    timings["imports"] = warm_up()
+
+    start = time.perf_counter()
+    bundle = roadmaps._bundle_loader.get()
+    roadmaps._get_index(bundle)
+    timings["catalog_ms"] = _elapsed_ms(start)
+
+    start = time.perf_counter()
+    if curated_match.CURATED_MATCH_ENABLED:
+        curated_match.get_matcher()
+    timings["curated_match_ms"] = _elapsed_ms(start)
+
+    _preloaded = True
+    return timings
+
+
+async def _ping_database() -> Dict[str, Any]:
+    from .database import get_async_engine
+
+    async with get_async_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return {}
+
+
+async def _model_handshake() -> Dict[str, Any]:
+    if not WARMUP_MODEL_HANDSHAKE or not os.getenv("GEMINI_API_KEY"):
+        return {"skipped": True}
+    from .services.ai_generator import GEMINI_MODEL
+    from .services.genai_client import get_genai_client
+
+    # creates the shared client and opens its first pooled connection
+    client = get_genai_client()
+    await run_in_threadpool(client.client.models.get, model=GEMINI_MODEL)
+    return {"model": GEMINI_MODEL, "connections": client.stats()}
+
+
+async def _prefill_payloads(db) -> int:
+    from .models import RoadmapPayload
+    from .services.payload_store import decode_payload, payload_cache
+
+    rows = (await db.execute(
+        select(RoadmapPayload.hash, RoadmapPayload.data)
+        .order_by(RoadmapPayload.refcount.desc())
+        .limit(min(WARMUP_PREFILL_LIMIT, payload_cache.max_size))
+    )).all()
+    # least shared first, so the most shared end up most recently used
+    for payload_hash, blob in reversed(rows):
+        payload_cache.put(payload_hash, decode_payload(blob))
+    return len(rows)
+
+
+async def _prefill_chat_windows(db) -> int:
+    from .models import ChatSession, User
+    from .services.chat_sessions import get_session_windows
+
+    windows = get_session_windows()
+    rows = (await db.execute(
+        select(ChatSession.id, User.clerk_id)
+        .join(User, User.id == ChatSession.user_id)
+        .order_by(ChatSession.updated_at.desc())
+        .limit(min(WARMUP_PREFILL_LIMIT, windows.max_size))
+    )).all()
+    loaded = 0
+    for session_id, clerk_id in reversed(rows):
+        try:
+            await windows.get(db, clerk_id, session_id)
+            loaded += 1
+        except HTTPException:
+            # deleted since the listing
+            continue
+    return loaded
+
+
+async def _prefill_profiles() -> int:
+    from .services.profile_cache import get_profile_cache
+    from .services.profile_store import get_profile_store
+    from .utils.serialization import dumps
+
+    cache = get_profile_cache()
+    if cache is None:
+        return 0
+    store = get_profile_store()
+    user_ids = await run_in_threadpool(store.recent_user_ids, min(WARMUP_PREFILL_LIMIT, cache.max_size))
+    # versions are read before loading, as on a regular miss
+    versions = {user_id: cache.version(user_id) for user_id in user_ids}
+    found = await store.aget_many(user_ids)
+    for user_id in reversed(user_ids):
+        if user_id in found:
+            cache.fill(user_id, dumps({"userId": user_id, "profile": found[user_id]}), versions[user_id])
+    return len(found)
+
+
+async def _prefill_caches() -> Dict[str, Any]:
+    from . import database
+
+    database.get_async_engine()
+    async with database.AsyncSessionLocal() as db:
+        payloads = await _prefill_payloads(db)
+        chat_windows = await _prefill_chat_windows(db)
+    return {"payloads": payloads, "chat_windows": chat_windows, "profiles": await _prefill_profiles()}
+
+
+async def _run_step(name: str, step: Callable[[], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+    start = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(step(), WARMUP_STEP_TIMEOUT)
+        result = {"ok": True, **result}
+    except asyncio.TimeoutError:
+        logger.warning("Warm-up step %s timed out after %.1fs", name, WARMUP_STEP_TIMEOUT)
+        result = {"ok": False, "error": "timeout"}
+    except Exception as e:
+        logger.warning("Warm-up step %s failed: %s", name, e)
+        result = {"ok": False, "error": str(e)}
+    result["ms"] = _elapsed_ms(start)
+    return result
+
+
+async def warm_up_worker() -> Dict[str, Any]:
+    """Warm this worker up before it takes traffic and mark it ready.
+
+    Shared state is built here too when it wasn't preloaded and
+    ``STARTUP_MODE=eager``; in lazy mode without preload it is left to the
+    first request that needs it.
+
+    Returns:
+        The readiness report served by ``/ready``
+    """
+    start = time.perf_counter()
+    report: Dict[str, Any] = {"preloaded": _preloaded, "steps": {}}
+    if WARMUP_ENABLED:
+        steps = report["steps"]
+        if not _preloaded and STARTUP_MODE == "eager":
+            async def shared_state():
+                return await run_in_threadpool(preload_shared_state)
+            steps["shared_state"] = await _run_step("shared_state", shared_state)
+        steps["database"] = await _run_step("database", _ping_database)
+        steps["model_client"] = await _run_step("model_client", _model_handshake)
+        steps["cache_prefill"] = await _run_step("cache_prefill", _prefill_caches)
+    report["ms"] = _elapsed_ms(start)
+    _state.update(ready=True, report=report)
+    return report
+
+
+def readiness() -> Dict[str, Any]:
+    """``{"ready": bool, "report": dict or None}`` for this worker."""
+    return dict(_state)
@@ -0,0 +1,53 @@
+"""
+Gunicorn settings for the API (``gunicorn -c gunicorn.conf.py app.app:app``).
+
+By default the app is preloaded: the master imports it and builds the
+read-only shared state (``app/warmup.py``) once, then forks the workers,
+which share those pages copy-on-write. Each worker warms up (DB ping, model
+handshake, cache prefill) in its startup event before accepting
+connections. ``GUNICORN_PRELOAD=0`` makes every worker import and build
+everything itself, as before.
+"""
+import gc
+import os
+
+# BLAS thread pools started in the master don't survive fork(); the curated
+# matcher only does small matrix-vector products anyway
+os.environ.setdefault("OPENBLAS_NUM_THREADS", "1")
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8080')}"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+# warm-up runs before a worker heartbeats; leave room for slow steps
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+# proxies trusted to set the client address (request.client) via X-Forwarded-For.
+# Platforms whose proxy addresses aren't known up front (Render) can leave
+# this alone: admission.fairness_key reads the proxy's X-Forwarded-For entry
+# for connections from private addresses
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+accesslog = "-" if os.getenv("GUNICORN_ACCESS_LOG", "0") == "1" else None
+
+
+def when_ready(server):
+    """Runs in the master before the first fork."""
+    if not preload_app:
+        return
+    from app.warmup import preload_shared_state
+
+    timings = preload_shared_state()
+    server.log.info("Preloaded shared state: %s", timings)
+    # keep the collector from touching (and so copying) the preloaded objects in workers
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master; the worker opens its own."""
+    if not preload_app:
+        return
+    from app.database import engine
+
+    engine.dispose(close=False)
@@ -0,0 +1,95 @@
+"""Initial schema: users, user_profiles, roadmaps, chat_messages
+
+Databases created before migrations existed (via `create_all`) already have
+some or all of these tables, so each table is only created when missing.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    existing = set(sa.inspect(op.get_bind()).get_table_names())
+
+    if "users" not in existing:
+        op.create_table(
+            "users",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("clerk_id", sa.String(length=255), nullable=False),
+            sa.Column("email", sa.String(length=255), nullable=True),
+            sa.Column("username", sa.String(length=100), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.Column("is_active", sa.Boolean(), nullable=True),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_users_id", "users", ["id"])
+        op.create_index("ix_users_clerk_id", "users", ["clerk_id"], unique=True)
+        op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    if "user_profiles" not in existing:
+        op.create_table(
+            "user_profiles",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("data", sa.JSON(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+            sa.UniqueConstraint("user_id"),
+        )
+        op.create_index("ix_user_profiles_id", "user_profiles", ["id"])
+
+    if "roadmaps" not in existing:
+        op.create_table(
+            "roadmaps",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=500), nullable=False),
+            sa.Column("career_type", sa.String(length=200), nullable=True),
+            sa.Column("career_data", sa.JSON(), nullable=False),
+            sa.Column("prompt", sa.Text(), nullable=True),
+            sa.Column("is_favorite", sa.Boolean(), nullable=True),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_roadmaps_id", "roadmaps", ["id"])
+
+    if "chat_messages" not in existing:
+        op.create_table(
+            "chat_messages",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("role", sa.String(length=20), nullable=False),
+            sa.Column("content", sa.Text(), nullable=False),
+            sa.Column("cached", sa.Boolean(), nullable=True),
+            sa.Column("generation_time_ms", sa.Integer(), nullable=True),
+            sa.Column("timestamp", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+        op.create_index("ix_chat_messages_id", "chat_messages", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("chat_messages")
+    op.drop_table("roadmaps")
+    op.drop_table("user_profiles")
+    op.drop_table("users")
@@ -0,0 +1,44 @@
+"""Composite (user_id, time) indexes for saved roadmaps and chat history
+
+Both list APIs filter on user_id and seek on the timestamp, so one composite
+index per table serves the filter, the ordering and the keyset predicate.
+Its user_id prefix also covers plain user_id lookups (e.g. cascading
+deletes), so no separate single-column index is added.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, Sequence[str], None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+_INDEXES = (
+    ("ix_roadmaps_user_id_created_at", "roadmaps", ["user_id", "created_at"]),
+    ("ix_chat_messages_user_id_timestamp", "chat_messages", ["user_id", "timestamp"]),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    for name, table, columns in _INDEXES:
+        # tables created by the create_all fallback already carry the index
+        if name not in {ix["name"] for ix in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_chat_messages_user_id_timestamp", table_name="chat_messages")
+    op.drop_index("ix_roadmaps_user_id_created_at", table_name="roadmaps")
@@ -0,0 +1,132 @@
+"""Content-addressed roadmap payloads
+
+Adds ``roadmap_payloads`` (sha256 of canonical JSON -> zlib blob, refcount)
+and ``roadmaps.payload_hash``, makes ``roadmaps.career_data`` nullable and
+moves existing inline career_data into the payload table. Databases built
+by the ``create_all`` fallback may already have any of these; only what is
+missing is added.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 00:00:00
+
+"""
+import hashlib
+import json
+import zlib
+from collections import Counter
+from datetime import datetime
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_roadmaps = sa.table(
+    "roadmaps",
+    sa.column("id", sa.Integer),
+    sa.column("career_data", sa.JSON),
+    sa.column("payload_hash", sa.String),
+)
+_payloads = sa.table(
+    "roadmap_payloads",
+    sa.column("hash", sa.String),
+    sa.column("data", sa.LargeBinary),
+    sa.column("size", sa.Integer),
+    sa.column("refcount", sa.Integer),
+    sa.column("created_at", sa.DateTime),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    bind = op.get_bind()
+    inspector = sa.inspect(bind)
+    # the create_all fallback may already have built any of this; only add what is missing
+    if not inspector.has_table("roadmap_payloads"):
+        op.create_table(
+            "roadmap_payloads",
+            sa.Column("hash", sa.String(length=64), nullable=False),
+            sa.Column("data", sa.LargeBinary(), nullable=False),
+            sa.Column("size", sa.Integer(), nullable=False),
+            sa.Column("refcount", sa.Integer(), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.PrimaryKeyConstraint("hash"),
+        )
+    columns = {c["name"]: c for c in inspector.get_columns("roadmaps")}
+    indexes = {ix["name"] for ix in inspector.get_indexes("roadmaps")}
+    has_fk = any(fk["referred_table"] == "roadmap_payloads" for fk in inspector.get_foreign_keys("roadmaps"))
+    with op.batch_alter_table("roadmaps") as batch_op:
+        if "payload_hash" not in columns:
+            batch_op.add_column(sa.Column("payload_hash", sa.String(length=64), nullable=True))
+        if not columns["career_data"]["nullable"]:
+            batch_op.alter_column("career_data", existing_type=sa.JSON(), nullable=True)
+        if "ix_roadmaps_payload_hash" not in indexes:
+            batch_op.create_index("ix_roadmaps_payload_hash", ["payload_hash"])
+        if not has_fk:
+            batch_op.create_foreign_key(
+                "fk_roadmaps_payload_hash", "roadmap_payloads", ["payload_hash"], ["hash"]
+            )
+
+    # move inline payloads; same encoding as app/services/payload_store.py
+    blobs = {}
+    refs = Counter()
+    moved = []
+    rows = bind.execute(
+        sa.select(_roadmaps.c.id, _roadmaps.c.career_data).where(_roadmaps.c.career_data.isnot(None))
+    )
+    for roadmap_id, data in rows:
+        raw = json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        digest = hashlib.sha256(raw).hexdigest()
+        if digest not in blobs:
+            blobs[digest] = (zlib.compress(raw, 6), len(raw))
+        refs[digest] += 1
+        moved.append((roadmap_id, digest))
+
+    # payloads already stored (by the app, on a create_all database) gain references
+    stored = {h for (h,) in bind.execute(sa.select(_payloads.c.hash).where(_payloads.c.hash.in_(list(blobs))))}
+    for digest in stored:
+        bind.execute(
+            _payloads.update()
+            .where(_payloads.c.hash == digest)
+            .values(refcount=_payloads.c.refcount + refs[digest])
+        )
+    new = [h for h in blobs if h not in stored]
+    if new:
+        op.bulk_insert(_payloads, [
+            {"hash": h, "data": blobs[h][0], "size": blobs[h][1], "refcount": refs[h], "created_at": datetime.utcnow()}
+            for h in new
+        ])
+    for roadmap_id, digest in moved:
+        bind.execute(
+            _roadmaps.update()
+            .where(_roadmaps.c.id == roadmap_id)
+            .values(payload_hash=digest, career_data=sa.null())
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.select(_roadmaps.c.id, _payloads.c.data)
+        .join(_payloads, _payloads.c.hash == _roadmaps.c.payload_hash)
+    ).all()
+    for roadmap_id, blob in rows:
+        bind.execute(
+            _roadmaps.update()
+            .where(_roadmaps.c.id == roadmap_id)
+            .values(career_data=json.loads(zlib.decompress(blob)))
+        )
+    with op.batch_alter_table("roadmaps") as batch_op:
+        batch_op.drop_constraint("fk_roadmaps_payload_hash", type_="foreignkey")
+        batch_op.drop_index("ix_roadmaps_payload_hash")
+        batch_op.drop_column("payload_hash")
+        batch_op.alter_column("career_data", existing_type=sa.JSON(), nullable=False)
+    op.drop_table("roadmap_payloads")
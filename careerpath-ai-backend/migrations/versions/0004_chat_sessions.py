@@ -0,0 +1,69 @@
+"""Chat sessions
+
+Adds ``chat_sessions`` and ``chat_messages.session_id``. Existing messages
+keep a NULL session (they predate sessions). Databases built by the
+``create_all`` fallback may already have either; only what is missing is
+added.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    inspector = sa.inspect(op.get_bind())
+    # the create_all fallback may already have built any of this; only add what is missing
+    if not inspector.has_table("chat_sessions"):
+        op.create_table(
+            "chat_sessions",
+            sa.Column("id", sa.Integer(), nullable=False),
+            sa.Column("user_id", sa.Integer(), nullable=False),
+            sa.Column("title", sa.String(length=200), nullable=False),
+            sa.Column("created_at", sa.DateTime(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=False),
+            sa.ForeignKeyConstraint(["user_id"], ["users.id"], ondelete="CASCADE"),
+            sa.PrimaryKeyConstraint("id"),
+        )
+    session_indexes = {ix["name"] for ix in inspector.get_indexes("chat_sessions")}
+    if "ix_chat_sessions_id" not in session_indexes:
+        op.create_index("ix_chat_sessions_id", "chat_sessions", ["id"])
+    if "ix_chat_sessions_user_id_updated_at" not in session_indexes:
+        op.create_index("ix_chat_sessions_user_id_updated_at", "chat_sessions", ["user_id", "updated_at"])
+
+    columns = {c["name"] for c in inspector.get_columns("chat_messages")}
+    indexes = {ix["name"] for ix in inspector.get_indexes("chat_messages")}
+    has_fk = any(fk["referred_table"] == "chat_sessions" for fk in inspector.get_foreign_keys("chat_messages"))
+    with op.batch_alter_table("chat_messages") as batch_op:
+        if "session_id" not in columns:
+            batch_op.add_column(sa.Column("session_id", sa.Integer(), nullable=True))
+        if "ix_chat_messages_session_id_timestamp" not in indexes:
+            batch_op.create_index("ix_chat_messages_session_id_timestamp", ["session_id", "timestamp"])
+        if not has_fk:
+            batch_op.create_foreign_key(
+                "fk_chat_messages_session_id", "chat_sessions", ["session_id"], ["id"], ondelete="CASCADE"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("chat_messages") as batch_op:
+        batch_op.drop_constraint("fk_chat_messages_session_id", type_="foreignkey")
+        batch_op.drop_index("ix_chat_messages_session_id_timestamp")
+        batch_op.drop_column("session_id")
+    op.drop_index("ix_chat_sessions_user_id_updated_at", table_name="chat_sessions")
+    op.drop_index("ix_chat_sessions_id", table_name="chat_sessions")
+    op.drop_table("chat_sessions")
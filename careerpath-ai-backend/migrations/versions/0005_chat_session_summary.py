@@ -0,0 +1,36 @@
+"""Rolling summary on chat sessions
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0005"
+down_revision: Union[str, Sequence[str], None] = "0004"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the create_all fallback may already have added the columns
+    columns = {c["name"] for c in sa.inspect(op.get_bind()).get_columns("chat_sessions")}
+    with op.batch_alter_table("chat_sessions") as batch_op:
+        if "summary" not in columns:
+            batch_op.add_column(sa.Column("summary", sa.Text(), nullable=True))
+        if "summarized_messages" not in columns:
+            batch_op.add_column(sa.Column("summarized_messages", sa.Integer(), server_default="0", nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table("chat_sessions") as batch_op:
+        batch_op.drop_column("summarized_messages")
+        batch_op.drop_column("summary")
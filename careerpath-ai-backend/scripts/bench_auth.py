@@ -0,0 +1,106 @@
+"""Benchmark local Clerk session token verification.
+
+Usage:
+  python -m scripts.bench_auth [--tokens 200] [--requests 20000]
+
+Serves a JWKS document for a freshly generated RSA key from a local HTTP
+server standing in for Clerk, points ``ClerkVerifier`` at it and times
+verification of signed session tokens: the first sighting of a token
+(one signature check against the cached keys) and repeats (a lookup in
+the verified-token cache). Reports how many times the stand-in was hit,
+which should be exactly once, at startup.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jwt.algorithms import RSAAlgorithm
+
+from app.services.clerk_auth import AuthError, ClerkVerifier, JWKSCache, VerifiedTokenCache
+
+KID = "ins_bench"
+
+
+def _serve_jwks(public_key):
+    jwk = json.loads(RSAAlgorithm.to_jwk(public_key))
+    jwk.update(kid=KID, use="sig", alg="RS256")
+    document = json.dumps({"keys": [jwk]}).encode()
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(document)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/.well-known/jwks.json", hits
+
+
+def _token(private_key, user, ttl=60):
+    now = int(time.time())
+    claims = {"sub": user, "sid": f"sess_{user}", "iat": now, "nbf": now - 5, "exp": now + ttl,
+              "azp": "http://localhost:5173"}
+    return jwt.encode(claims, private_key, algorithm="RS256", headers={"kid": KID})
+
+
+def _time(verifier, tokens):
+    latencies = []
+    for token in tokens:
+        t = time.perf_counter()
+        verifier.verify(token)
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    return statistics.median(latencies) * 1e6, latencies[int(len(latencies) * 0.99) - 1] * 1e6
+
+
+async def _run(args):
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    server, url, hits = _serve_jwks(private_key.public_key())
+    jwks = JWKSCache(url=url, secret_key=None, static_pem=None)
+    verifier = ClerkVerifier(jwks=jwks, tokens=VerifiedTokenCache(), authorized_parties=["http://localhost:5173"])
+    await jwks.start()
+
+    tokens = [_token(private_key, f"user_{i}") for i in range(args.tokens)]
+    print(f"{'path':12} {'p50 us':>9} {'p99 us':>9}")
+    p50, p99 = _time(verifier, tokens)
+    print(f"{'signature':12} {p50:9.2f} {p99:9.2f}")
+    p50, p99 = _time(verifier, random.choices(tokens, k=args.requests))
+    print(f"{'cached':12} {p50:9.2f} {p99:9.2f}")
+
+    for name, token in (("expired", _token(private_key, "user_x", ttl=-60)),
+                        ("foreign key", _token(rsa.generate_private_key(public_exponent=65537, key_size=2048), "user_y"))):
+        try:
+            verifier.verify(token)
+            raise SystemExit(f"{name} token was accepted")
+        except AuthError:
+            pass
+
+    await jwks.stop()
+    server.shutdown()
+    print(f"JWKS fetches: {len(hits)}")
+    print(verifier.stats()["tokens"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=20000)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Benchmark monolithic against decomposed AI generation on the stub backend.
+
+Usage:
+  python -m scripts.bench_generation_modes [--prompts 12] [--concurrency 4]
+      [--first-token-ms 400] [--ms-per-char 0.4]
+
+Runs the same prompts through ``generate_career_path_with_ai`` in both
+modes against the offline stub model (``AI_BACKEND=stub``, see
+``app/services/ai_stub.py``), whose latency is a fixed time to first token
+plus a per-character cost. Each mode is run twice:
+
+- ``cold``: empty part cache, every part is generated.
+- ``reworded``: the same careers asked differently, so decomposed mode can
+  reuse cached parts across prompts.
+
+Prints p50/p95/max latency and throughput per mode and pass.
+"""
+import argparse
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+_CAREERS = [
+    "data scientist", "frontend developer", "nurse practitioner", "product manager",
+    "cloud architect", "ux designer", "civil engineer", "cybersecurity analyst",
+    "machine learning engineer", "technical writer", "devops engineer", "financial analyst",
+]
+
+
+def _prompts(n, reworded=False):
+    template = "Tell me about becoming a {}" if reworded else "{} career roadmap"
+    return [template.format(_CAREERS[i % len(_CAREERS)]) for i in range(n)]
+
+
+def _run(generate, mode, prompts, concurrency):
+    def one(prompt):
+        start = time.perf_counter()
+        generate(prompt, mode=mode)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = sorted(pool.map(one, prompts))
+    wall = time.perf_counter() - start
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000,
+        "max": latencies[-1] * 1000,
+        "rps": len(prompts) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--prompts", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--first-token-ms", type=float, default=400)
+    parser.add_argument("--ms-per-char", type=float, default=0.4)
+    args = parser.parse_args()
+
+    # configure the stub before the generator reads its settings
+    os.environ["AI_BACKEND"] = "stub"
+    os.environ["AI_STUB_FIRST_TOKEN_MS"] = str(args.first_token_ms)
+    os.environ["AI_STUB_MS_PER_CHAR"] = str(args.ms_per_char)
+    from app.services.ai_generator import generate_career_path_with_ai, part_cache
+
+    print(f"{'mode':12} {'pass':9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'req/s':>7}")
+    for mode in ("monolithic", "decomposed"):
+        part_cache.clear()
+        for label, reworded in (("cold", False), ("reworded", True)):
+            r = _run(generate_career_path_with_ai, mode, _prompts(args.prompts, reworded), args.concurrency)
+            print(f"{mode:12} {label:9} {r['p50']:8.1f} {r['p95']:8.1f} {r['max']:8.1f} {r['rps']:7.2f}")
+
+
+if __name__ == "__main__":
+    main()
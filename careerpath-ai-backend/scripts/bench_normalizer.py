@@ -0,0 +1,90 @@
+"""Benchmark normalization and validation of parsed model output.
+
+Usage:
+  python -m scripts.bench_normalizer [--iterations 20000] [--resources 8]
+
+Times the compiled ``normalize_answer`` against the previous path: a
+recursive snake_case rewrite of the whole tree, a second walk for
+required fields and resource URLs, then ``AIResponse`` validation. Both
+run on the same camelCase payload and must produce the same answer.
+"""
+import argparse
+import re
+import statistics
+import time
+
+from app.schemas import AIResponse
+from app.services.answer_normalizer import normalize_answer
+
+
+def _payload(resources):
+    return {
+        "Title": "Data Engineer",
+        "explanation": "Data engineers build and run the pipelines that move data. " * 6,
+        "averageSalary": "$95,000 - $140,000",
+        "jobOpenings": "High demand across industries",
+        "youtubeVideoRecommendation": "https://www.youtube.com/watch?v=abc123",
+        "learningResources": [
+            {"Title": f"Resource {i}", "URL": f"https://example.com/r/{i}", "Type": "course"}
+            for i in range(resources)
+        ],
+        "relatedCareers": [{"careerName": "Analytics Engineer", "skillOverlap": {"SQL": 0.9, "Python": 0.7}}],
+    }
+
+
+def _legacy_normalize(parsed):
+    def to_snake(s):
+        s = re.sub(r'([a-z0-9])([A-Z])', r'\1_\2', s)
+        return re.sub(r"[^0-9a-zA-Z]+", "_", s.strip()).lower().strip('_')
+
+    def recurse(obj):
+        if isinstance(obj, dict):
+            return {to_snake(k): recurse(v) for k, v in obj.items()}
+        if isinstance(obj, list):
+            return [recurse(i) for i in obj]
+        return obj
+
+    normalized = recurse(parsed)
+    if "learning_resources" in normalized:
+        if not isinstance(normalized["learning_resources"], list):
+            normalized["learning_resources"] = [normalized["learning_resources"]]
+    else:
+        normalized["learning_resources"] = []
+    required = ["title", "explanation", "average_salary", "job_openings", "youtube_video_recommendation"]
+    missing = [r for r in required if r not in normalized or not normalized[r]]
+    if missing:
+        raise ValueError(f"Missing required fields from model output: {missing}")
+    for resource in normalized.get("learning_resources", []):
+        if isinstance(resource, dict) and resource.get("url"):
+            re.match(r'https?://', resource["url"], re.IGNORECASE)
+    return AIResponse.model_validate(normalized).model_dump()
+
+
+def _time(fn, payload, iterations):
+    latencies = []
+    for _ in range(iterations):
+        t = time.perf_counter()
+        fn(payload)
+        latencies.append(time.perf_counter() - t)
+    latencies.sort()
+    return statistics.median(latencies) * 1e6, latencies[int(len(latencies) * 0.99) - 1] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--resources", type=int, default=8)
+    args = parser.parse_args()
+
+    payload = _payload(args.resources)
+    if normalize_answer(payload) != _legacy_normalize(payload):
+        raise SystemExit("compiled and legacy paths disagree")
+
+    print(f"{'path':10} {'p50 us':>9} {'p99 us':>9}")
+    for name, fn in (("legacy", _legacy_normalize), ("compiled", normalize_answer)):
+        p50, p99 = _time(fn, payload, args.iterations)
+        print(f"{name:10} {p50:9.2f} {p99:9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark profile store backends.
+
+Usage:
+  python -m scripts.bench_profile_store [--users 2000] [--reads 10000]
+
+Runs each backend against a throwaway location (a temp directory for the
+file backend, a temp SQLite database for the sql backend) and prints write
+and read throughput with p50/p99 latencies.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.models import Base
+from app.services.profile_store import ShardedFileProfileStore, SQLProfileStore
+
+
+def _profile(i):
+    return {
+        "fullName": f"User {i}",
+        "firstName": "User",
+        "lastName": str(i),
+        "email": f"user{i}@example.com",
+        "location": "Accra, Ghana",
+        "joined": "2025-01-01",
+    }
+
+
+def _timed(fn, args_list):
+    latencies = []
+    start = time.perf_counter()
+    for args in args_list:
+        t = time.perf_counter()
+        fn(*args)
+        latencies.append(time.perf_counter() - t)
+    total = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "ops_per_sec": len(latencies) / total,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def _report(name, op, stats):
+    print(f"{name:6} {op:6} {stats['ops_per_sec']:10.0f} ops/s   "
+          f"p50 {stats['p50_ms']:7.3f} ms   p99 {stats['p99_ms']:7.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--reads", type=int, default=10000)
+    args = parser.parse_args()
+
+    ids = [f"user_{i:08d}" for i in range(args.users)]
+    reads = [(random.choice(ids),) for _ in range(args.reads)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        Base.metadata.create_all(bind=engine)
+        stores = [
+            ShardedFileProfileStore(Path(tmp) / "users"),
+            SQLProfileStore(sessionmaker(bind=engine)),
+        ]
+        for store in stores:
+            _report(store.name, "put", _timed(store.put, [(u, _profile(i)) for i, u in enumerate(ids)]))
+            _report(store.name, "get", _timed(store.get, reads))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""Benchmark the saved-roadmap list query against payload size.
+
+Usage:
+  python -m scripts.bench_roadmap_list [--roadmaps 500] [--pages 500] [--limit 20]
+
+For each payload size, fills a temp SQLite database with one user's
+roadmaps whose ``career_data`` is roughly that large, then times list pages
+with the projected query used by ``GET /api/users/{user_id}/roadmaps`` and
+with a naive ``select(Roadmap)`` that loads whole rows. Projected latency
+should stay flat as payloads grow; the naive query grows with them.
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+
+from app.models.models import Base, Roadmap, User
+from app.routes.saved_roadmaps import list_query
+from app.schemas import RoadmapListResponse
+from app.utils.pagination import next_page_cursor, seek_newest_first
+
+PAYLOAD_SIZES = (1_000, 10_000, 100_000)
+
+
+def _career_data(size):
+    steps = [{"title": f"Step {i}", "detail": "x" * 80} for i in range(max(1, size // 110))]
+    return {"title": "Backend Developer", "explanation": "...", "steps": steps}
+
+
+def _fill(engine, n, payload_size):
+    with Session(engine) as db:
+        user = User(clerk_id="user_bench")
+        db.add(user)
+        db.flush()
+        data = _career_data(payload_size)
+        start = datetime(2025, 1, 1)
+        db.add_all(
+            Roadmap(user_id=user.id, title=f"Roadmap {i}", career_type="backend",
+                    career_data=data, prompt="backend roadmap",
+                    created_at=start + timedelta(minutes=i))
+            for i in range(n)
+        )
+        db.commit()
+        return user.id
+
+
+def _naive_query(user_pk, cursor, limit):
+    return seek_newest_first(
+        select(Roadmap).where(Roadmap.user_id == user_pk), Roadmap.created_at, Roadmap.id, cursor, limit
+    )
+
+
+def _time_pages(engine, build, scalars, user_pk, pages, limit):
+    # walk pages from random depths so both early and deep cursors are measured
+    with Session(engine) as db:
+        cursors = [None]
+        while len(cursors) < pages:
+            result = db.execute(build(user_pk, cursors[-1], limit))
+            rows = result.scalars().all() if scalars else result.all()
+            _, cursor = next_page_cursor(rows, limit, "created_at")
+            cursors.append(cursor)
+            if cursor is None:
+                cursors.append(None)
+
+        latencies = []
+        for cursor in random.choices(cursors, k=pages):
+            t = time.perf_counter()
+            result = db.execute(build(user_pk, cursor, limit))
+            rows = result.scalars().all() if scalars else result.all()
+            page, _ = next_page_cursor(rows, limit, "created_at")
+            [RoadmapListResponse.model_validate(row) for row in page]
+            latencies.append(time.perf_counter() - t)
+            db.expunge_all()
+    latencies.sort()
+    return statistics.median(latencies) * 1000, latencies[int(len(latencies) * 0.99) - 1] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--roadmaps", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=500)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'payload':>10} {'query':10} {'p50 ms':>9} {'p99 ms':>9}")
+    for size in PAYLOAD_SIZES:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+            Base.metadata.create_all(bind=engine)
+            user_pk = _fill(engine, args.roadmaps, size)
+            for name, build, scalars in (("projected", list_query, False), ("naive", _naive_query, True)):
+                p50, p99 = _time_pages(engine, build, scalars, user_pk, args.pages, args.limit)
+                print(f"{size:>10} {name:10} {p50:9.3f} {p99:9.3f}")
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Compile `data/roadmaps.json` and the roadmap docs into a catalog bundle.
+
+Usage:
+  python -m scripts.build_catalog_bundle [--out data/catalog.bundle]
+
+The catalog changelog (`data/catalog_changelog.json`) is updated first: when
+any entry's content hash changed, the catalog version is bumped. Commit the
+updated changelog together with the catalog change.
+
+The bundle is written to a temporary file and atomically moved into place,
+so it is safe to run against a live deployment: workers pick up the new
+bundle on their next check (see CATALOG_BUNDLE_CHECK_INTERVAL).
+"""
+import argparse
+import json
+from pathlib import Path
+
+from app.services.catalog_bundle import build_bundle, render_payloads
+from app.services.catalog_sync import load_changelog, payload_hashes, record_version, save_changelog
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DATA_DIR = BASE_DIR / "data"
+DOCS_DIR = BASE_DIR / "docs" / "roadmaps"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--metadata", default=str(DATA_DIR / "roadmaps.json"))
+    parser.add_argument("--docs", default=str(DOCS_DIR))
+    parser.add_argument("--changelog", default=str(DATA_DIR / "catalog_changelog.json"))
+    parser.add_argument("--out", default=str(DATA_DIR / "catalog.bundle"))
+    args = parser.parse_args()
+
+    with open(args.metadata, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    try:
+        import markdown
+        render_html = markdown.markdown
+    except ImportError:
+        print("markdown is not installed; bundle will contain no rendered HTML")
+        render_html = None
+
+    payloads = render_payloads(metadata, Path(args.docs), render_html)
+
+    previous = load_changelog(Path(args.changelog))
+    changelog = record_version(previous, payload_hashes(payloads))
+    if changelog is not previous:
+        save_changelog(changelog, Path(args.changelog))
+    print(f"Catalog version {changelog['version']}")
+
+    stats = build_bundle(payloads, Path(args.out), changelog)
+    print(f"Wrote {stats['entries']} entries ({stats['bytes']} bytes) to {stats['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Copy user profiles from one profile store backend to another.
+
+Usage:
+  python -m scripts.migrate_profiles --source file --target sql
+  python -m scripts.migrate_profiles --source file --target file   # legacy flat files -> sharded layout
+
+The file backend reads from PROFILE_DATA_DIR (default data/users) and the sql
+backend from DATABASE_URL. Profiles are streamed one at a time, so the
+migration runs in constant memory; re-running it is safe (puts overwrite).
+"""
+import argparse
+
+from app.database import create_tables
+from app.services.profile_store import create_profile_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", choices=["file", "sql"], default="file")
+    parser.add_argument("--target", choices=["file", "sql"], default="sql")
+    args = parser.parse_args()
+
+    if "sql" in (args.source, args.target):
+        create_tables()
+
+    source = create_profile_store(args.source)
+    target = create_profile_store(args.target)
+
+    # materialize ids first when migrating in place, since puts rewrite the tree we iterate
+    profiles = source.iter_profiles()
+    if args.source == args.target:
+        profiles = list(profiles)
+
+    migrated = 0
+    for user_id, profile in profiles:
+        target.put(user_id, profile)
+        migrated += 1
+        if migrated % 1000 == 0:
+            print(f"  {migrated} profiles migrated...")
+
+    print(f"Migrated {migrated} profiles from {args.source} to {args.target}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Repair roadmap payload reference counts and report payload storage.
+
+Usage:
+  python -m scripts.recount_roadmap_payloads [--dry-run]
+
+Reference counts in roadmap_payloads drift when roadmaps are deleted by a
+cascade (e.g. deleting a user) instead of through the API. This recomputes
+them from the roadmaps table (DATABASE_URL) and deletes payloads nothing
+references any more.
+"""
+import argparse
+
+from app.database import SessionLocal, create_tables
+from app.services.payload_store import payload_storage_stats, recount_payloads
+
+
+def _report(label, stats):
+    ratio = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0.0
+    print(f"{label:7} {stats['payloads']} payloads, {stats['references']} references, "
+          f"{stats['raw_bytes']} bytes raw -> {stats['stored_bytes']} bytes stored ({ratio:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dry-run", action="store_true", help="Report without committing")
+    args = parser.parse_args()
+
+    create_tables()
+    with SessionLocal() as db:
+        _report("before", payload_storage_stats(db))
+        result = recount_payloads(db)
+        _report("after", payload_storage_stats(db))
+        if args.dry_run:
+            db.rollback()
+            print("Dry run: no changes committed")
+        else:
+            db.commit()
+            print(f"Recounted {result['payloads']} payloads, deleted {result['deleted']} unreferenced")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""Profile and budget the API's cold start.
+
+Usage:
+  python -m scripts.startup_profile report [--top 25]
+  python -m scripts.startup_profile bench [--runs 5] [--budget-ms 2500] [--mode lazy|eager]
+
+``report`` runs ``python -X importtime -c "import app.app"`` in a fresh
+interpreter and prints the slowest modules by cumulative and self time,
+plus which of the deferred SDKs (see ``app/utils/lazy_imports.py``) were
+imported at module load anyway.
+
+``bench`` starts fresh interpreters that import the app and run its
+startup event against a throwaway SQLite database, and prints the import
+and startup times. It exits non-zero when the median cold start exceeds
+the budget (``--budget-ms``, default ``STARTUP_BUDGET_MS`` or 2500), so it
+can gate a deploy or CI job.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from app.utils.lazy_imports import DEFERRED_MODULES
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_CHILD = """
+import asyncio, json, time
+t0 = time.perf_counter()
+import app.app as main
+t1 = time.perf_counter()
+asyncio.run(main._startup())
+t2 = time.perf_counter()
+asyncio.run(main._shutdown())
+print(json.dumps({"import_ms": (t1 - t0) * 1000, "startup_ms": (t2 - t1) * 1000}))
+"""
+
+
+def _env(tmp: Path, mode: str = None):
+    env = dict(os.environ)
+    env.update(
+        PYTHONPATH=str(BACKEND_DIR),
+        DATABASE_URL=f"sqlite:///{tmp / 'startup.db'}",
+        MIGRATION_LOCK_FILE=str(tmp / "migrate.lock"),
+        PROFILE_CACHE_VERSION_FILE=str(tmp / "profile_versions"),
+        CHAT_SESSION_VERSION_FILE=str(tmp / "chat_versions"),
+        PROFILE_DATA_DIR=str(tmp / "users"),
+    )
+    if mode:
+        env["STARTUP_MODE"] = mode
+    return env
+
+
+def _parse_importtime(stderr: str):
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((name.strip(), int(self_us), int(cumulative_us), len(name) - len(name.lstrip())))
+    return rows
+
+
+def report(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import app.app"],
+            cwd=BACKEND_DIR, env=_env(Path(tmp)), capture_output=True, text=True,
+        )
+    if proc.returncode != 0:
+        sys.exit(proc.stderr[-2000:])
+    rows = _parse_importtime(proc.stderr)
+    total, depth = next(((cum, d) for name, _, cum, d in rows if name == "app.app"), (0, 0))
+
+    print(f"Total import time of app.app: {total / 1000:.1f} ms\n")
+    print(f"Slowest direct imports of app.app (cumulative), top {args.top}:")
+    direct = [r for r in rows if r[3] == depth + 2]
+    for name, _, cum, _ in sorted(direct, key=lambda r: -r[2])[:args.top]:
+        print(f"  {cum / 1000:9.1f} ms  {name}")
+    print(f"\nSlowest modules (self), top {args.top}:")
+    for name, own, _, _ in sorted(rows, key=lambda r: -r[1])[:args.top]:
+        print(f"  {own / 1000:9.1f} ms  {name}")
+
+    imported = {name for name, *_ in rows}
+    eager = [m for m in DEFERRED_MODULES if m in imported]
+    print("\nDeferred SDKs imported at module load:", ", ".join(eager) if eager else "none")
+
+
+def bench(args):
+    results = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            proc = subprocess.run(
+                [sys.executable, "-c", _CHILD],
+                cwd=BACKEND_DIR, env=_env(Path(tmp), args.mode), capture_output=True, text=True,
+            )
+        if proc.returncode != 0:
+            sys.exit(proc.stderr[-2000:])
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    print(f"{'run':>4} {'import ms':>10} {'startup ms':>11} {'total ms':>9}")
+    totals = []
+    for i, r in enumerate(results, 1):
+        total = r["import_ms"] + r["startup_ms"]
+        totals.append(total)
+        print(f"{i:>4} {r['import_ms']:10.1f} {r['startup_ms']:11.1f} {total:9.1f}")
+    median = statistics.median(totals)
+    print(f"\nmedian cold start: {median:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if median > args.budget_ms:
+        print("FAIL: cold start exceeds budget")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_report = sub.add_parser("report", help="import-time report")
+    p_report.add_argument("--top", type=int, default=25)
+    p_bench = sub.add_parser("bench", help="cold-start benchmark with a budget")
+    p_bench.add_argument("--runs", type=int, default=5)
+    p_bench.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "2500")))
+    p_bench.add_argument("--mode", choices=("lazy", "eager"), default=None)
+    args = parser.parse_args()
+    if args.command == "report":
+        report(args)
+    else:
+        bench(args)
+
+
+if __name__ == "__main__":
+    main()
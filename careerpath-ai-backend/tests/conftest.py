@@ -0,0 +1,69 @@
+"""Shared fixtures: a local HTTP server standing in for Clerk's JWKS endpoint."""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+jwt = pytest.importorskip("jwt")
+rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+from jwt.algorithms import RSAAlgorithm  # noqa: E402
+
+
+class LocalJWKS:
+    """Serves a JWKS document for keys it generates, and signs tokens with them."""
+
+    def __init__(self):
+        self.keys = {}
+        self.hits = 0
+        self.rotate("ins_1")
+        jwks = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                jwks.hits += 1
+                body = jwks.document()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self._server.server_port}/.well-known/jwks.json"
+
+    def rotate(self, kid: str) -> None:
+        """Publish a new signing key under ``kid``, replacing the old ones."""
+        self.keys = {kid: rsa.generate_private_key(public_exponent=65537, key_size=2048)}
+        self.kid = kid
+
+    def document(self) -> bytes:
+        keys = []
+        for kid, private_key in self.keys.items():
+            jwk = json.loads(RSAAlgorithm.to_jwk(private_key.public_key()))
+            jwk.update(kid=kid, use="sig", alg="RS256")
+            keys.append(jwk)
+        return json.dumps({"keys": keys}).encode()
+
+    def token(self, sub: str = "user_1", ttl: int = 60, kid: str = None, private_key=None, **claims) -> str:
+        now = int(time.time())
+        payload = {"sub": sub, "sid": f"sess_{sub}", "iat": now - 1, "nbf": now - 1, "exp": now + ttl, **claims}
+        kid = kid or self.kid
+        key = private_key or self.keys[self.kid]
+        return jwt.encode(payload, key, algorithm="RS256", headers={"kid": kid})
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def local_jwks():
+    jwks = LocalJWKS()
+    yield jwks
+    jwks.close()
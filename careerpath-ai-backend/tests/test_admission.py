@@ -0,0 +1,27 @@
+"""Queue keys for admission control."""
+from starlette.requests import Request
+
+from app.services.admission import fairness_key
+
+
+def _request(client, forwarded=None):
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "headers": headers, "client": (client, 443)})
+
+
+def test_verified_user_wins():
+    assert fairness_key(_request("10.0.0.5", "1.2.3.4"), "user_1") == "user:user_1"
+
+
+def test_direct_connection_ignores_forwarded_header():
+    assert fairness_key(_request("8.8.8.8")) == "ip:8.8.8.8"
+    assert fairness_key(_request("8.8.8.8", "1.2.3.4")) == "ip:8.8.8.8"
+
+
+def test_platform_proxy_uses_the_address_it_recorded():
+    # behind a proxy on a private address, anonymous callers get their own keys
+    assert fairness_key(_request("10.0.0.5", "198.51.100.1")) == "ip:198.51.100.1"
+    assert fairness_key(_request("10.0.0.5", "198.51.100.2")) == "ip:198.51.100.2"
+    # entries the client prepended are not trusted
+    assert fairness_key(_request("10.0.0.5", "1.2.3.4, 198.51.100.1")) == "ip:198.51.100.1"
+    assert fairness_key(_request("10.0.0.5")) == "ip:10.0.0.5"
@@ -0,0 +1,70 @@
+"""Part cache keys and decomposed generation on the offline stub model."""
+import json
+
+import pytest
+
+from app.services import ai_generator, ai_stub
+from app.services.ai_generator import PartCache
+
+
+@pytest.fixture
+def stub_model(monkeypatch):
+    monkeypatch.setattr(ai_generator, "AI_BACKEND", "stub")
+    monkeypatch.setattr(ai_stub, "AI_STUB_FIRST_TOKEN_MS", 0)
+    monkeypatch.setattr(ai_stub, "AI_STUB_MS_PER_CHAR", 0)
+    monkeypatch.setattr(ai_generator, "part_cache", PartCache())
+    return ai_generator.part_cache
+
+
+def test_signature_ignores_filler():
+    assert PartCache.signature("data scientist career roadmap") == PartCache.signature(
+        "Tell me about becoming a Data Scientist"
+    )
+
+
+@pytest.mark.parametrize("first, second", [
+    ("switch from nursing to software engineering", "switch from software engineering to nursing"),
+    ("move from teaching into product management", "move from product management into teaching"),
+    ("data engineer vs data scientist", "data scientist vs data engineer"),
+])
+def test_signature_keeps_word_order(first, second):
+    assert PartCache.signature(first) != PartCache.signature(second)
+
+
+def test_reordered_prompts_do_not_share_parts(stub_model):
+    first = ai_generator.generate_career_path_with_ai(
+        "switch from nursing to software engineering", mode="decomposed"
+    )
+    second = ai_generator.generate_career_path_with_ai(
+        "switch from software engineering to nursing", mode="decomposed"
+    )
+
+    assert first["title"] != second["title"]
+    assert first["explanation"] != second["explanation"]
+    assert all(part["hits"] == 0 for part in stub_model.stats()["parts"].values())
+
+
+def test_reworded_prompt_reuses_parts(stub_model):
+    first = ai_generator.generate_career_path_with_ai("data scientist career roadmap", mode="decomposed")
+    second = ai_generator.generate_career_path_with_ai("Tell me about becoming a data scientist", mode="decomposed")
+
+    assert first["title"] == second["title"]
+    assert all(part["hits"] == 1 for part in stub_model.stats()["parts"].values())
+
+
+def test_camel_case_part_keys_are_kept(stub_model, monkeypatch):
+    call_model = ai_generator._call_model
+
+    def camel_case_model(prompt):
+        parsed = ai_generator._parse_model_output(call_model(prompt))
+        return json.dumps({
+            "".join(w if i == 0 else w.title() for i, w in enumerate(k.split("_"))): v
+            for k, v in parsed.items()
+        })
+
+    monkeypatch.setattr(ai_generator, "_call_model", camel_case_model)
+    result = ai_generator.generate_career_path_with_ai("data scientist career roadmap", mode="decomposed")
+
+    assert result["average_salary"] and result["job_openings"]
+    assert result["youtube_video_recommendation"] and result["learning_resources"]
+    assert all(part["misses"] == 1 for part in stub_model.stats()["parts"].values())
@@ -0,0 +1,27 @@
+"""Catalog content hashes."""
+import json
+from pathlib import Path
+
+from app.services.catalog_bundle import render_payloads
+from app.services.catalog_sync import load_changelog, payload_hashes
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+
+
+def _metadata():
+    with open(BASE_DIR / "data" / "roadmaps.json", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_hashes_do_not_depend_on_the_html_renderer():
+    docs = BASE_DIR / "docs" / "roadmaps"
+    unrendered = payload_hashes(render_payloads(_metadata(), docs, None))
+    rendered = payload_hashes(render_payloads(_metadata(), docs, lambda text: f"<p>{text}</p>"))
+
+    assert unrendered == rendered
+
+
+def test_committed_changelog_matches_catalog():
+    hashes = payload_hashes(render_payloads(_metadata(), BASE_DIR / "docs" / "roadmaps", None))
+
+    assert load_changelog(BASE_DIR / "data" / "catalog_changelog.json")["entries"] == hashes
@@ -0,0 +1,136 @@
+"""Local Clerk session token verification against a stand-in JWKS endpoint."""
+import asyncio
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.services import clerk_auth
+from app.services.clerk_auth import AuthError, ClerkVerifier, JWKSCache, VerifiedTokenCache
+from app.utils import utils
+
+rsa = pytest.importorskip("cryptography.hazmat.primitives.asymmetric.rsa")
+
+
+def _verifier(local_jwks, **jwks_options):
+    jwks = JWKSCache(url=local_jwks.url, secret_key=None, static_pem=None, **jwks_options)
+    jwks.refresh()
+    return ClerkVerifier(jwks=jwks, tokens=VerifiedTokenCache(), authorized_parties=[], leeway=0)
+
+
+def test_valid_token(local_jwks):
+    verifier = _verifier(local_jwks)
+    token = local_jwks.token("user_1")
+
+    assert verifier.verify(token)["sub"] == "user_1"
+    # the repeat is served from the verified-token cache
+    assert verifier.verify(token)["sub"] == "user_1"
+    assert verifier.tokens.stats()["hits"] == 1
+    assert local_jwks.hits == 1
+
+
+def test_expired_token(local_jwks):
+    verifier = _verifier(local_jwks)
+
+    with pytest.raises(AuthError, match="expired"):
+        verifier.verify(local_jwks.token("user_1", ttl=-10))
+
+
+def test_wrong_signature(local_jwks):
+    verifier = _verifier(local_jwks)
+    other = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    with pytest.raises(AuthError, match="Invalid token"):
+        verifier.verify(local_jwks.token("user_1", private_key=other))
+
+
+def test_unknown_kid_is_rejected(local_jwks):
+    verifier = _verifier(local_jwks)
+
+    with pytest.raises(AuthError, match="Unknown signing key"):
+        verifier.verify(local_jwks.token("user_1", kid="ins_unknown"))
+    assert verifier.jwks.stats()["unknown_kid"] == 1
+    # outside an event loop nothing is fetched on the request path
+    assert local_jwks.hits == 1
+
+
+def test_key_rotation_refetches_jwks(local_jwks):
+    async def scenario():
+        verifier = _verifier(local_jwks, min_refresh_interval=0)
+        local_jwks.rotate("ins_2")
+        token = local_jwks.token("user_1")
+
+        # the new kid is unknown: rejected, and a refresh is scheduled
+        with pytest.raises(AuthError, match="Unknown signing key"):
+            verifier.verify(token)
+        await verifier.jwks._pending
+        assert local_jwks.hits == 2
+
+        assert verifier.verify(token)["sub"] == "user_1"
+        assert verifier.jwks.stats()["refreshes"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_unknown_kid_refresh_is_rate_limited(local_jwks):
+    async def scenario():
+        verifier = _verifier(local_jwks, min_refresh_interval=3600)
+        for _ in range(3):
+            with pytest.raises(AuthError):
+                verifier.verify(local_jwks.token("user_1", kid="ins_unknown"))
+        assert verifier.jwks._pending is None
+        assert local_jwks.hits == 1
+
+    asyncio.run(scenario())
+
+
+@pytest.fixture
+def user_app(local_jwks, monkeypatch):
+    """An ``authorize_user`` and a ``require_owner`` route, verifying against the local JWKS."""
+    monkeypatch.setattr(clerk_auth, "_verifier", _verifier(local_jwks))
+    app = FastAPI()
+
+    @app.get("/api/users/{user_id}/ping", dependencies=[Depends(utils.authorize_user)])
+    async def ping(user_id: str):
+        return {"user_id": user_id}
+
+    @app.get("/api/users/{user_id}/private", dependencies=[Depends(utils.require_owner)])
+    async def private(user_id: str):
+        return {"user_id": user_id}
+
+    return TestClient(app)
+
+
+def test_auth_not_required(user_app, monkeypatch):
+    monkeypatch.setattr(utils, "CLERK_AUTH_REQUIRED", False)
+
+    assert user_app.get("/api/users/user_1/ping").status_code == 200
+
+
+def test_auth_required(user_app, local_jwks, monkeypatch):
+    monkeypatch.setattr(utils, "CLERK_AUTH_REQUIRED", True)
+
+    def get(token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return user_app.get("/api/users/user_1/ping", headers=headers).status_code
+
+    assert get() == 401
+    assert get("not-a-jwt") == 401
+    assert get(local_jwks.token("user_1", ttl=-10)) == 401
+    assert get(local_jwks.token("user_2")) == 403
+    assert get(local_jwks.token("user_1")) == 200
+    # the session cookie works as well as the header
+    user_app.cookies.set("__session", local_jwks.token("user_1"))
+    assert user_app.get("/api/users/user_1/ping").status_code == 200
+
+
+def test_owner_required_without_auth_flag(user_app, local_jwks, monkeypatch):
+    monkeypatch.setattr(utils, "CLERK_AUTH_REQUIRED", False)
+
+    def get(token=None):
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        return user_app.get("/api/users/user_1/private", headers=headers).status_code
+
+    assert get() == 401
+    assert get(local_jwks.token("user_2")) == 403
+    assert get(local_jwks.token("user_1")) == 200
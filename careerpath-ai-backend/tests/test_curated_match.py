@@ -0,0 +1,40 @@
+"""Curated matching only answers prompts that ask for a catalog roadmap."""
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.services import curated_match  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    m = curated_match.get_matcher()
+    assert m is not None
+    return m
+
+
+@pytest.mark.parametrize("prompt, title", [
+    ("frontend developer roadmap", "Frontend Developer"),
+    ("How do I become a frontend developer?", "Frontend Developer"),
+    ("roadmap for backend development", "Backend Developer"),
+    ("I want to become a data scientist", "AI & Data Scientist"),
+    ("Give me a roadmap for full stack web development", "Full Stack Developer"),
+    ("fronted developer roadmap", "Frontend Developer"),
+])
+def test_roadmap_requests_match(matcher, prompt, title):
+    result = matcher.match(prompt)
+    assert result is not None
+    assert result[0]["title"] == title
+
+
+@pytest.mark.parametrize("prompt", [
+    "How do I move from frontend to backend?",
+    "Compare React and Vue for frontend",
+    "What does a backend developer earn?",
+    "Is frontend dying?",
+    "switch from devops to data science",
+])
+def test_near_misses_go_to_the_model(matcher, prompt):
+    assert matcher.match(prompt) is None
+    # not even when generation is shed
+    assert matcher.match(prompt, threshold=curated_match.CURATED_MATCH_SHED_THRESHOLD, margin=0.0) is None
@@ -0,0 +1,34 @@
+"""Deferred formatting in the queue-based logging pipeline."""
+import logging
+import queue
+
+from app.logging_config import _DeferredQueueHandler
+
+
+def _enqueue(msg, *args):
+    records = queue.SimpleQueue()
+    logger = logging.Logger("test")
+    logger.addHandler(_DeferredQueueHandler(records))
+    logger.warning(msg, *args)
+    return records.get_nowait()
+
+
+def test_scalar_args_are_formatted_later():
+    record = _enqueue("user %s waited %.1f s", "user_1", 2.5)
+    assert record.args == ("user_1", 2.5)
+    assert record.getMessage() == "user user_1 waited 2.5 s"
+
+
+def test_mutable_args_are_snapshotted():
+    tags = ["python"]
+    record = _enqueue("tags %s", tags)
+    tags.append("sql")
+    assert record.args is None
+    assert record.getMessage() == "tags ['python']"
+
+
+def test_mapping_args_are_snapshotted():
+    state = {"pending": 1, "seen": ["a"]}
+    record = _enqueue("%(pending)d pending, seen %(seen)s", state)
+    state["seen"].append("b")
+    assert record.getMessage() == "1 pending, seen ['a']"
@@ -0,0 +1,53 @@
+"""Bulk payload upserts from the write-behind flush."""
+import pytest
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app.models import Base, RoadmapPayload
+from app.services.payload_store import encode_payload, put_payloads
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("INSERT INTO roadmap_payloads"):
+            statements.append(parameters)
+
+    with Session(engine) as session:
+        session.statements = statements
+        yield session
+    engine.dispose()
+
+
+def _refcounts(db):
+    return dict(db.execute(select(RoadmapPayload.hash, RoadmapPayload.refcount)).all())
+
+
+def test_duplicate_payloads_in_one_batch(db):
+    payload = {"title": "Data Scientist", "explanation": "..."}
+    hashes = put_payloads(db, [payload, {"title": "Other"}, dict(reversed(payload.items()))])
+    db.commit()
+
+    assert hashes[0] == hashes[2]
+    assert _refcounts(db) == {hashes[0]: 2, hashes[1]: 1}
+    # one row per hash in the statement: PostgreSQL rejects a row hit twice
+    assert db.statements
+    for parameters in db.statements:
+        rows = parameters if isinstance(parameters, list) else [parameters]
+        flat = [v for row in rows for v in row if v in hashes]
+        assert sorted(flat) == sorted(set(hashes))
+
+
+def test_existing_payload_gains_references(db):
+    payload = {"title": "Data Scientist"}
+    put_payloads(db, [payload])
+    db.commit()
+    put_payloads(db, [payload, payload, payload])
+    db.commit()
+
+    assert _refcounts(db) == {encode_payload(payload)[0]: 4}
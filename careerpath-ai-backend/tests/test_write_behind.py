@@ -0,0 +1,71 @@
+"""Write-behind flushes: isolating bad records and riding out outages."""
+import asyncio
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.models import Base, ChatMessage
+from app.services.write_behind import WriteBehindQueue
+
+
+@pytest.fixture
+def session_factory(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'write_behind.db'}")
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine)
+    engine.dispose()
+
+
+def _messages(session_factory):
+    with session_factory() as db:
+        return db.scalar(select(func.count(ChatMessage.id)))
+
+
+def _fill(queue, good=7):
+    for i in range(good):
+        queue.add_chat_message("user_1", "user", f"message {i}")
+    # a payload json can't encode fails the whole batch it's in
+    queue.add_roadmap("user_1", "Bad", {"tags": {"not", "json"}})
+
+
+def test_bad_record_does_not_sink_its_batch(session_factory):
+    queue = WriteBehindQueue(session_factory, batch_size=50, max_attempts=2)
+    _fill(queue)
+
+    assert asyncio.run(queue.flush()) is True
+    assert _messages(session_factory) == 7
+    assert [r["kind"] for r in queue._pending] == ["roadmap"]
+    assert queue._pending[0]["attempts"] == 1
+
+    assert asyncio.run(queue.flush()) is False
+    assert queue._pending == []
+    assert queue.stats()["dead_lettered"] == 1
+
+
+def test_outage_is_not_charged_as_attempts(session_factory):
+    def unreachable():
+        raise OperationalError("connect", {}, ConnectionRefusedError())
+
+    queue = WriteBehindQueue(unreachable, batch_size=50, max_attempts=1)
+    _fill(queue)
+    for _ in range(3):
+        assert asyncio.run(queue.flush()) is False
+    assert len(queue._pending) == 8
+    assert all(r["attempts"] == 0 for r in queue._pending)
+
+    queue._session_factory = session_factory
+    assert asyncio.run(queue.flush()) is True
+    assert _messages(session_factory) == 7
+
+
+def test_retry_window_bounds_an_outage():
+    def unreachable():
+        raise OperationalError("connect", {}, ConnectionRefusedError())
+
+    queue = WriteBehindQueue(unreachable, retry_window=0)
+    _fill(queue, good=3)
+    assert asyncio.run(queue.flush()) is False
+    assert queue._pending == []
+    assert queue.stats()["dead_lettered"] == 4